@@ -27,6 +27,7 @@
 
 # <pep8 compliant>
 
+from .src import handlers
 from .src import operators
 from .src import panels
 from .src import preferences
@@ -52,9 +53,11 @@ def register():
     panels.register()
     preferences.register()
     properties.register()
+    handlers.register()
 
 
 def unregister():
+    handlers.unregister()
     operators.unregister()
     panels.unregister()
     preferences.unregister()
@@ -0,0 +1,268 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+# GPLv3 License
+#
+# ColorRampConverter
+# Copyright (C) 2022-2026, Mark Elek, David Elek
+#
+# ColorRampConverter is a Blender addon that generates
+# custom node groups from color ramp nodes,
+# making a few parameters more accessible.
+#
+# This file is a part of ColorRampConverter.
+# ColorRampConverter is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# ColorRampConverter is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ColorRampConverter. If not, see <http://www.gnu.org/licenses/>.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# <pep8 compliant>
+
+# Measure the Cycles (CPU) render time of a material with color ramps,
+# with the color ramps kept, converted to node groups, baked to lookup textures or converted to OSL scripts:
+#
+#   blender --background --factory-startup --python benchmarks/render.py -- --ramps 8 --stops 16 --repeat 3
+
+import argparse
+import importlib
+import importlib.util
+import os
+import random
+import statistics
+import sys
+import time
+
+import bpy
+
+ADDON_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# the name the addon preferences are registered under
+MODULE_NAME = 'color-ramp-converter'
+TARGETS = ('COLOR_RAMP', 'NODE_GROUP', 'LUT', 'OSL')
+
+
+class Reporter:
+    """
+    Stands in for the operator the conversion functions report to
+    """
+
+    def report(self, level, message):
+        print(f'  {", ".join(sorted(level))}: {message}')
+
+
+def get_args():
+    """
+    Parse the arguments passed to the script after '--'
+
+    :return: The parsed arguments
+    :rtype: argparse.Namespace
+    """
+    argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+    parser = argparse.ArgumentParser(description="Color ramp render benchmark")
+    parser.add_argument('--ramps', type=int, default=8,
+                        help="Number of color ramps in the material")
+    parser.add_argument('--stops', type=int, default=16,
+                        help="Number of stops of each color ramp")
+    parser.add_argument('--resolution', type=int, default=256,
+                        help="Width and height of the rendered image")
+    parser.add_argument('--samples', type=int, default=16,
+                        help="Cycles samples per pixel")
+    parser.add_argument('--repeat', type=int, default=3,
+                        help="Number of renders of each target")
+    parser.add_argument('--targets', default=','.join(TARGETS),
+                        help=f"Comma separated targets to render, of {', '.join(TARGETS)}")
+    return parser.parse_args(argv)
+
+
+def enable_addon():
+    """
+    Import and register the addon from the repository, the directory name doesn't have to be a valid module name
+
+    :return: The addon module
+    :rtype: module
+    """
+    spec = importlib.util.spec_from_file_location(
+        MODULE_NAME, os.path.join(ADDON_DIR, '__init__.py'),
+        submodule_search_locations=[ADDON_DIR])
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[MODULE_NAME] = module
+    spec.loader.exec_module(module)
+    module.register()
+
+    # what enabling the addon in the preferences does, so the addon preferences exist
+    bpy.context.preferences.addons.new().module = MODULE_NAME
+    return module
+
+
+def clear_data():
+    """
+    Remove the datablocks created by the previous target
+    """
+    bpy.data.batch_remove([*bpy.data.objects, *bpy.data.meshes, *bpy.data.cameras,
+                           *bpy.data.materials, *bpy.data.node_groups, *bpy.data.images, *bpy.data.texts])
+
+
+def setup_scene(args):
+    """
+    Create a camera looking at a plane, rendered with Cycles on the CPU
+
+    :param args: The benchmark arguments
+    :type args: argparse.Namespace
+    :return: The plane
+    :rtype: bpy.types.Object
+    """
+    clear_data()
+    scene = bpy.context.scene
+
+    scene.render.engine = 'CYCLES'
+    scene.cycles.device = 'CPU'
+    scene.cycles.samples = args.samples
+    scene.cycles.use_denoising = False
+    scene.render.resolution_x = args.resolution
+    scene.render.resolution_y = args.resolution
+    scene.render.resolution_percentage = 100
+
+    bpy.ops.mesh.primitive_plane_add(size=2.0)
+    plane = bpy.context.active_object
+
+    bpy.ops.object.camera_add(location=(0.0, 0.0, 2.0))
+    camera = bpy.context.active_object
+    camera.data.type = 'ORTHO'
+    camera.data.ortho_scale = 2.0
+    scene.camera = camera
+    return plane
+
+
+def create_material(plane, ramp_count, stop_count, seed=0):
+    """
+    Create the material of the plane, color ramps of random stops driven by the x coordinate are added up
+
+    :param plane: The plane to assign the material to
+    :type plane: bpy.types.Object
+    :param ramp_count: The number of color ramps
+    :type ramp_count: int
+    :param stop_count: The number of stops of each color ramp
+    :type stop_count: int
+    :param seed: The seed of the random stops, defaults to 0
+    :type seed: int, optional
+    :return: The node tree of the material and its color ramps
+    :rtype: tuple (bpy.types.ShaderNodeTree, list of bpy.types.ShaderNodeValToRGB)
+    """
+    rng = random.Random(seed)
+
+    material = bpy.data.materials.new('ColorRampBenchmark')
+    material.use_nodes = True
+    plane.data.materials.clear()
+    plane.data.materials.append(material)
+
+    node_tree = material.node_tree
+    nodes = node_tree.nodes
+    links = node_tree.links
+    nodes.clear()
+
+    coordinates = nodes.new('ShaderNodeTexCoord')
+    separate = nodes.new('ShaderNodeSeparateXYZ')
+    links.new(coordinates.outputs['Generated'], separate.inputs[0])
+
+    color_ramps = []
+    previous_output = None
+    for i in range(ramp_count):
+        color_ramp = nodes.new('ShaderNodeValToRGB')
+        color_ramp.location = (0.0, -300.0 * i)
+        elements = color_ramp.color_ramp.elements
+        while len(elements) < stop_count:
+            elements.new(0.0)
+        for element in elements:
+            element.position = rng.random()
+            element.color = (rng.random(), rng.random(), rng.random(), 1.0)
+        links.new(separate.outputs[i % 3], color_ramp.inputs['Fac'])
+        color_ramps.append(color_ramp)
+
+        if previous_output is None:
+            previous_output = color_ramp.outputs['Color']
+            continue
+        add = nodes.new('ShaderNodeMix')
+        add.data_type = 'RGBA'
+        add.blend_type = 'ADD'
+        add.inputs['Factor'].default_value = 1.0 / ramp_count
+        add.location = (300.0, -300.0 * i)
+        links.new(previous_output, add.inputs[6])
+        links.new(color_ramp.outputs['Color'], add.inputs[7])
+        previous_output = add.outputs[2]
+
+    emission = nodes.new('ShaderNodeEmission')
+    output = nodes.new('ShaderNodeOutputMaterial')
+    links.new(previous_output, emission.inputs['Color'])
+    links.new(emission.outputs[0], output.inputs['Surface'])
+    return node_tree, color_ramps
+
+
+def convert_color_ramps(target, node_tree, color_ramps):
+    """
+    Convert the color ramps of the material to the benchmarked target
+
+    :param target: The target to convert to
+    :type target: str in ['COLOR_RAMP', 'NODE_GROUP', 'LUT', 'OSL']
+    :param node_tree: The node tree of the material
+    :type node_tree: bpy.types.ShaderNodeTree
+    :param color_ramps: The color ramps to convert
+    :type color_ramps: list of bpy.types.ShaderNodeValToRGB
+    """
+    scene = bpy.context.scene
+    scene.cycles.shading_system = target == 'OSL'
+
+    if target == 'NODE_GROUP':
+        functions = importlib.import_module(f'{MODULE_NAME}.src.functions')
+        functions.convert_color_ramps(Reporter(), bpy.context, color_ramps, node_tree)
+    elif target == 'LUT':
+        lut = importlib.import_module(f'{MODULE_NAME}.src.lut')
+        for color_ramp in color_ramps:
+            lut.bake_node(color_ramp, node_tree, int(scene.lut_resolution))
+    elif target == 'OSL':
+        osl = importlib.import_module(f'{MODULE_NAME}.src.osl')
+        for color_ramp in color_ramps:
+            if osl.convert_to_osl_node(color_ramp, node_tree) is None:
+                raise RuntimeError('The OSL script could not be compiled')
+
+
+def main():
+    args = get_args()
+    # reset before enabling the addon, loading the factory settings resets the preferences too
+    bpy.ops.wm.read_factory_settings(use_empty=True)
+    enable_addon()
+
+    results = []
+    for target in args.targets.split(','):
+        plane = setup_scene(args)
+        node_tree, color_ramps = create_material(plane, args.ramps, args.stops)
+        convert_color_ramps(target, node_tree, color_ramps)
+
+        # the first render compiles the shaders (and OSL scripts)
+        start_time = time.perf_counter()
+        bpy.ops.render.render()
+        first_time = time.perf_counter() - start_time
+
+        render_times = []
+        for _ in range(args.repeat):
+            start_time = time.perf_counter()
+            bpy.ops.render.render()
+            render_times.append(time.perf_counter() - start_time)
+
+        results.append((target, first_time, statistics.median(render_times)))
+
+    print(f'ColorRampConverter render, {args.ramps} color ramp(s) of {args.stops} stops, '
+          f'{args.resolution}x{args.resolution} px, {args.samples} samples, {args.repeat} render(s)')
+    for target, first_time, median_time in results:
+        print(f'  {target:<12} first {first_time*1000:9.1f} ms, median {median_time*1000:9.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
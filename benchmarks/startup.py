@@ -0,0 +1,123 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+# GPLv3 License
+#
+# ColorRampConverter
+# Copyright (C) 2022-2026, Mark Elek, David Elek
+#
+# ColorRampConverter is a Blender addon that generates
+# custom node groups from color ramp nodes,
+# making a few parameters more accessible.
+#
+# This file is a part of ColorRampConverter.
+# ColorRampConverter is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# ColorRampConverter is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ColorRampConverter. If not, see <http://www.gnu.org/licenses/>.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# <pep8 compliant>
+
+# Measure the import and registration time of the addon in background mode:
+#
+#   blender --background --factory-startup --python benchmarks/startup.py -- --repeat 20
+
+import argparse
+import importlib.util
+import os
+import statistics
+import sys
+import time
+
+ADDON_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULE_NAME = 'color_ramp_converter'
+
+
+def get_args():
+    """
+    Parse the arguments passed to the script after '--'
+
+    :return: The parsed arguments
+    :rtype: argparse.Namespace
+    """
+    argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+    parser = argparse.ArgumentParser(description="Addon startup benchmark")
+    parser.add_argument('--repeat', type=int, default=20,
+                        help="Number of import, register and unregister cycles")
+    return parser.parse_args(argv)
+
+
+def import_addon():
+    """
+    Import the addon from the repository, the directory name doesn't have to be a valid module name
+
+    :return: The addon module
+    :rtype: module
+    """
+    spec = importlib.util.spec_from_file_location(
+        MODULE_NAME, os.path.join(ADDON_DIR, '__init__.py'),
+        submodule_search_locations=[ADDON_DIR])
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[MODULE_NAME] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def forget_addon():
+    """
+    Remove the addon modules, so the next cycle imports them again
+    """
+    for name in [name for name in sys.modules
+                 if name == MODULE_NAME or name.startswith(f'{MODULE_NAME}.')]:
+        del sys.modules[name]
+
+
+def main():
+    args = get_args()
+    numpy_preloaded = 'numpy' in sys.modules
+
+    import_times = []
+    register_times = []
+    unregister_times = []
+    loaded_modules = []
+    for _ in range(args.repeat):
+        start_time = time.perf_counter()
+        addon = import_addon()
+        import_times.append(time.perf_counter() - start_time)
+
+        start_time = time.perf_counter()
+        addon.register()
+        register_times.append(time.perf_counter() - start_time)
+
+        loaded_modules = sorted(name[len(MODULE_NAME) + 1:] for name in sys.modules
+                                if name.startswith(f'{MODULE_NAME}.'))
+
+        start_time = time.perf_counter()
+        addon.unregister()
+        unregister_times.append(time.perf_counter() - start_time)
+
+        forget_addon()
+
+    print(f'ColorRampConverter startup, {args.repeat} cycle(s)')
+    print(f'  import      first {import_times[0]*1000:8.2f} ms, '
+          f'median {statistics.median(import_times)*1000:8.2f} ms')
+    print(f'  register    first {register_times[0]*1000:8.2f} ms, '
+          f'median {statistics.median(register_times)*1000:8.2f} ms')
+    print(f'  unregister  first {unregister_times[0]*1000:8.2f} ms, '
+          f'median {statistics.median(unregister_times)*1000:8.2f} ms')
+    print(f'  modules loaded after register: {", ".join(loaded_modules)}')
+    if not numpy_preloaded:
+        print(f'  numpy imported: {"numpy" in sys.modules}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,250 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+# GPLv3 License
+#
+# ColorRampConverter
+# Copyright (C) 2022-2026, Mark Elek, David Elek
+#
+# ColorRampConverter is a Blender addon that generates
+# custom node groups from color ramp nodes,
+# making a few parameters more accessible.
+#
+# This file is a part of ColorRampConverter.
+# ColorRampConverter is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# ColorRampConverter is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ColorRampConverter. If not, see <http://www.gnu.org/licenses/>.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# <pep8 compliant>
+
+# Create converted node groups directly from stop arrays, without color ramp nodes:
+#
+#   positions = np.linspace(0.0, 1.0, 8)                      # (N,) or (M, N) for M ramps
+#   colors = np.random.default_rng().random((1000, 8, 4))     # (N, 4) or (M, N, 4)
+#   node_groups = create_converted_node_groups(material.node_tree, positions, colors)
+
+import bpy
+import hashlib
+import numpy as np
+from .functions import (CONVERTED_METADATA_KEY,
+                        CONVERTED_METADATA_VERSION,
+                        build_compare_node_tree,
+                        build_node_tree_from_data,
+                        get_node_group_capacity,
+                        get_node_group_type,
+                        get_node_tree_input_identifiers,
+                        instantiate_node_group,
+                        set_node_location,
+                        )
+
+# ID property holding the key of shared node trees (see get_or_create_shared_node_tree)
+SHARED_KEY_PROPERTY = 'color_ramp_converter_shared_key'
+
+
+def get_stop_arrays(positions, colors):
+    """
+    Bring stop arrays of one or many ramps to the shape of many ramps, stops in ascending order
+
+    :param positions: The positions of the stops, shared by all ramps if of shape (N,)
+    :type positions: array-like of shape (N,) or (M, N)
+    :param colors: The RGBA colors of the stops
+    :type colors: array-like of shape (N, 4) or (M, N, 4)
+    :return: The sorted positions and colors
+    :rtype: tuple of (numpy.ndarray of shape (M, N), numpy.ndarray of shape (M, N, 4))
+    """
+    positions = np.asarray(positions, dtype=np.float32)
+    colors = np.asarray(colors, dtype=np.float32)
+    if positions.ndim == 1:
+        positions = positions[np.newaxis]
+    if colors.ndim == 2:
+        colors = colors[np.newaxis]
+    if positions.ndim == 2 and len(positions) == 1:
+        positions = np.repeat(positions, len(colors), axis=0)
+
+    if positions.ndim != 2 or colors.shape != positions.shape + (4,):
+        raise ValueError(f'Expected positions of shape (N,) or (M, N) and colors of shape (N, 4) or (M, N, 4), '
+                         f'got {positions.shape} and {colors.shape}')
+    if positions.shape[1] < 2:
+        raise ValueError('A ramp needs at least 2 stops')
+
+    # the node chain expects the stops in order, like the color ramp keeps them
+    order = np.argsort(positions, axis=1, kind='stable')
+    positions = np.take_along_axis(positions, order, axis=1)
+    colors = np.take_along_axis(colors, order[:, :, np.newaxis], axis=1)
+    return positions, colors
+
+
+def get_or_create_shared_node_tree(node_tree, ramp_data, map_range_interpolation, slot_count):
+    """
+    Get the converted node tree shared by the ramps with the same number of slots and settings,
+    build it if it doesn't exist yet. The stops are input values, so one node tree serves any number of ramps
+
+    :param node_tree: The node tree the node groups are used in
+    :type node_tree: bpy.types.NodeTree
+    :param ramp_data: The ramp definition of the first ramp (see functions.get_color_ramp_data)
+    :type ramp_data: dict
+    :param map_range_interpolation: The interpolation type of the map range nodes
+    :type map_range_interpolation: str in ['LINEAR', 'STEPPED', 'SMOOTHSTEP', 'SMOOTHERSTEP']
+    :param slot_count: The number of stop slots
+    :type slot_count: int
+    :return: The shared converted node tree
+    :rtype: bpy.types.NodeTree
+    """
+    # node trees shared by an older version get another key, they are built again
+    key = (f"{CONVERTED_METADATA_VERSION}|{get_node_group_type(node_tree)}|{slot_count}|{map_range_interpolation}|"
+           f"{ramp_data['color_mode']}|{ramp_data['interpolation']}|{ramp_data['hue_interpolation']}")
+    key = hashlib.sha1(key.encode()).hexdigest()
+    node_group_name = f'ConvertedArray{slot_count}_{key[:8]}'
+
+    # looked up by key, a node tree built while a stale one in use had the name gets another name (.001)
+    shared_node_tree = bpy.data.node_groups.get(node_group_name)
+    if shared_node_tree is None or shared_node_tree.get(SHARED_KEY_PROPERTY) != key:
+        shared_node_tree = next((node_group for node_group in bpy.data.node_groups
+                                 if node_group.get(SHARED_KEY_PROPERTY) == key), None)
+    if shared_node_tree is not None:
+        return shared_node_tree
+
+    if ramp_data['interpolation'] == 'CONSTANT':
+        shared_node_tree = build_compare_node_tree(node_group_name, node_tree, ramp_data, slot_count)
+    else:
+        shared_node_tree = build_node_tree_from_data(node_group_name, node_tree, ramp_data,
+                                                     map_range_interpolation, slot_count)
+    shared_node_tree[SHARED_KEY_PROPERTY] = key
+    return shared_node_tree
+
+
+def create_converted_node_groups(node_tree, positions, colors, color_mode='RGB', interpolation='LINEAR',
+                                 hue_interpolation='NEAR', fac=0.5, names=None, map_range_interpolation='LINEAR',
+                                 capacity=0, location=(0.0, 0.0), columns=8, spacing=300.0):
+    """
+    Create converted node groups from stop arrays, one for each ramp.
+    The ramps share converted node trees (one for each number of slots and settings),
+    their stops are written to the inputs of their node groups.
+    Unlike convert_color_ramp, the conversions are not verified (see functions.verify_conversions)
+
+    :param node_tree: The node tree to create the node groups in
+    :type node_tree: bpy.types.NodeTree
+    :param positions: The positions of the stops, shared by all ramps if of shape (N,)
+    :type positions: array-like of shape (N,) or (M, N)
+    :param colors: The RGBA colors of the stops
+    :type colors: array-like of shape (N, 4) or (M, N, 4)
+    :param color_mode: The color mode of the ramps, defaults to 'RGB'
+    :type color_mode: str in ['RGB', 'HSV', 'HSL'], optional
+    :param interpolation: The interpolation of the ramps, defaults to 'LINEAR'
+    :type interpolation: str in ['EASE', 'CARDINAL', 'LINEAR', 'B_SPLINE', 'CONSTANT'], optional
+    :param hue_interpolation: The hue interpolation of the ramps, defaults to 'NEAR'
+    :type hue_interpolation: str in ['NEAR', 'FAR', 'CW', 'CCW'], optional
+    :param fac: The factor of the node groups, defaults to 0.5
+    :type fac: float, optional
+    :param names: The names of the node groups, defaults to 'Array' with a number
+    :type names: list of str, optional
+    :param map_range_interpolation: The interpolation type of the map range nodes, defaults to 'LINEAR'.
+        Constant ramps get greater than math nodes instead (see functions.build_compare_node_tree)
+    :type map_range_interpolation: str in ['LINEAR', 'STEPPED', 'SMOOTHSTEP', 'SMOOTHERSTEP'], optional
+    :param capacity: The number of stop slots (see functions.get_node_group_capacity), defaults to 0
+    :type capacity: int, optional
+    :param location: The location of the first node group
+    :type location: float array of 2 items in [-100000, 100000], default (0.0, 0.0)
+    :param columns: The number of columns to arrange the node groups in, defaults to 8
+    :type columns: int, optional
+    :param spacing: The space between the node groups, defaults to 300.0
+    :type spacing: float, optional
+    :return: The created node groups
+    :rtype: list of bpy.types.NodeGroup
+    """
+    node_group_type = get_node_group_type(node_tree)
+    if interpolation == 'CONSTANT':
+        # the compare layout has no map range nodes
+        map_range_interpolation = 'LINEAR'
+    # compositor map range nodes have no interpolation type
+    if map_range_interpolation != 'LINEAR' and node_group_type == 'Compositor':
+        raise ValueError(f'{map_range_interpolation} map range interpolation is not supported '
+                         f'in compositor node trees')
+
+    positions, colors = get_stop_arrays(positions, colors)
+    ramp_count, stop_count = positions.shape
+    if names is not None and len(names) != ramp_count:
+        raise ValueError(f'Expected {ramp_count} names, got {len(names)}')
+
+    # the shared node tree is built with the stops of the first ramp, it pads its slots itself
+    slot_count = get_node_group_capacity(stop_count, capacity)
+    ramp_data = {
+        'positions': positions[0].tolist(),
+        'colors': colors[0].ravel().tolist(),
+        'color_mode': color_mode,
+        'interpolation': interpolation,
+        'hue_interpolation': hue_interpolation,
+        'fac': fac,
+    }
+    shared_node_tree = get_or_create_shared_node_tree(
+        node_tree, ramp_data, map_range_interpolation, slot_count)
+
+    # padded slots repeat the last stop
+    if slot_count > stop_count:
+        padding = slot_count - stop_count
+        positions = np.concatenate([positions, np.repeat(positions[:, -1:], padding, axis=1)], axis=1)
+        colors = np.concatenate([colors, np.repeat(colors[:, -1:], padding, axis=1)], axis=1)
+
+    # convert to python lists at once, socket values are set one by one
+    # (the inputs mix float and color sockets, foreach_set needs one size)
+    # the metadata record stores socket identifiers, every instance has the inputs of the shared node tree
+    metadata = shared_node_tree[CONVERTED_METADATA_KEY]
+    input_indices = {identifier: index for index, identifier
+                     in enumerate(get_node_tree_input_identifiers(shared_node_tree))}
+    color_inputs = [input_indices[identifier] for identifier in metadata['color_inputs']]
+    position_inputs = [input_indices[identifier] for identifier in metadata['position_inputs']]
+    all_positions = positions.tolist()
+    all_colors = colors.tolist()
+
+    node_groups = []
+    for index in range(ramp_count):
+        name = names[index] if names is not None else f'Array{index + 1}'
+        node_group = instantiate_node_group(shared_node_tree, node_group_type, name, node_tree)
+
+        inputs = node_group.inputs
+        inputs[0].default_value = fac
+        for color_index, color in zip(color_inputs, all_colors[index]):
+            inputs[color_index].default_value = color
+        for position_index, position in zip(position_inputs, all_positions[index]):
+            inputs[position_index].default_value = position
+
+        node_group.color_mode = color_mode
+        node_group.interpolation = interpolation
+        node_group.hue_interpolation = hue_interpolation
+        node_group.is_converted = True
+
+        column = index % columns
+        row = index // columns
+        set_node_location(node_group, (location[0] + column * spacing,
+                                       location[1] - row * spacing))
+        node_groups.append(node_group)
+
+    return node_groups
+
+
+def create_converted_node_group(node_tree, positions, colors, name='Array', **kwargs):
+    """
+    Create a converted node group from the stop arrays of one ramp (see create_converted_node_groups)
+
+    :param node_tree: The node tree to create the node group in
+    :type node_tree: bpy.types.NodeTree
+    :param positions: The positions of the stops
+    :type positions: array-like of shape (N,)
+    :param colors: The RGBA colors of the stops
+    :type colors: array-like of shape (N, 4)
+    :param name: The name of the node group, defaults to 'Array'
+    :type name: str, optional
+    :return: The created node group
+    :rtype: bpy.types.NodeGroup
+    """
+    return create_converted_node_groups(node_tree, positions, colors, names=[name], **kwargs)[0]
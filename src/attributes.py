@@ -0,0 +1,346 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+# GPLv3 License
+#
+# ColorRampConverter
+# Copyright (C) 2022-2026, Mark Elek, David Elek
+#
+# ColorRampConverter is a Blender addon that generates
+# custom node groups from color ramp nodes,
+# making a few parameters more accessible.
+#
+# This file is a part of ColorRampConverter.
+# ColorRampConverter is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# ColorRampConverter is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ColorRampConverter. If not, see <http://www.gnu.org/licenses/>.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# <pep8 compliant>
+
+import numpy as np
+from .evaluator import evaluate_converted_layout, evaluate_ramp_data
+from .functions import (get_all_color_ramp_data,
+                        get_converted_node_group_layout,
+                        get_node_type,
+                        is_fused_node_group,
+                        is_node_group,
+                        remove_node,
+                        set_node_location,
+                        )
+
+# domains of color attributes
+COLOR_DOMAINS = ('POINT', 'CORNER')
+
+# attribute types that can be read as a factor
+FAC_DATA_TYPES = {
+    'FLOAT': np.float32,
+    'INT': np.int32,
+    'INT8': np.int32,
+    'BOOLEAN': np.bool_,
+}
+
+
+def get_vertex_group_weights(obj, vertex_group_name):
+    """
+    Get the weight of each vertex in a vertex group
+
+    :param obj: The mesh object with the vertex group
+    :type obj: bpy.types.Object
+    :param vertex_group_name: The name of the vertex group
+    :type vertex_group_name: str
+    :return: The weight of each vertex, 0 for vertices not in the group
+    :rtype: numpy.ndarray of shape (vertex count,)
+    """
+    group_index = obj.vertex_groups[vertex_group_name].index
+    vertices = obj.data.vertices
+    weights = np.zeros(len(vertices), dtype=np.float32)
+
+    # vertex group weights can't be read in bulk
+    for vertex in vertices:
+        for element in vertex.groups:
+            if element.group == group_index:
+                weights[vertex.index] = element.weight
+                break
+
+    return weights
+
+
+def get_corner_vertices(mesh):
+    """
+    Get the vertex of each face corner
+
+    :param mesh: The mesh
+    :type mesh: bpy.types.Mesh
+    :return: The vertex index of each face corner
+    :rtype: numpy.ndarray of shape (corner count,)
+    """
+    corner_vertices = np.empty(len(mesh.loops), dtype=np.int32)
+    mesh.loops.foreach_get('vertex_index', corner_vertices)
+    return corner_vertices
+
+
+def get_corner_faces(mesh):
+    """
+    Get the face of each face corner
+
+    :param mesh: The mesh
+    :type mesh: bpy.types.Mesh
+    :return: The face index of each face corner
+    :rtype: numpy.ndarray of shape (corner count,)
+    """
+    corner_counts = np.empty(len(mesh.polygons), dtype=np.int32)
+    mesh.polygons.foreach_get('loop_total', corner_counts)
+    # the corners of the faces are stored one face after the other
+    return np.repeat(np.arange(len(corner_counts), dtype=np.int32), corner_counts)
+
+
+def average_corners(values, corner_vertices, vertex_count):
+    """
+    Average the values of the face corners of each vertex
+
+    :param values: The value of each face corner
+    :type values: numpy.ndarray of shape (corner count,)
+    :param corner_vertices: The vertex index of each face corner (see get_corner_vertices)
+    :type corner_vertices: numpy.ndarray of shape (corner count,)
+    :param vertex_count: The number of vertices
+    :type vertex_count: int
+    :return: The value of each vertex, 0 for vertices without faces
+    :rtype: numpy.ndarray of shape (vertex count,)
+    """
+    sums = np.bincount(corner_vertices, weights=values, minlength=vertex_count)
+    counts = np.bincount(corner_vertices, minlength=vertex_count)
+    return (sums / np.maximum(counts, 1)).astype(np.float32)
+
+
+def get_fac_values(obj, source, domain='CORNER'):
+    """
+    Read an attribute or vertex group of a mesh object as the factor of each point or face corner
+
+    :param obj: The mesh object
+    :type obj: bpy.types.Object
+    :param source: The name of a float, integer or boolean attribute (point, face or face corner domain)
+        or of a vertex group
+    :type source: str
+    :param domain: The domain to get the factors of, defaults to 'CORNER'
+    :type domain: str in ['POINT', 'CORNER'], optional
+    :return: The factor of each point or face corner
+    :rtype: numpy.ndarray
+    """
+    mesh = obj.data
+    attribute = mesh.attributes.get(source)
+
+    if attribute is None:
+        if source not in obj.vertex_groups:
+            raise ValueError(f'"{obj.name}" has no attribute or vertex group named "{source}"')
+        values = get_vertex_group_weights(obj, source)
+        source_domain = 'POINT'
+    else:
+        if attribute.data_type not in FAC_DATA_TYPES:
+            raise ValueError(f'The attribute "{source}" of "{obj.name}" is a {attribute.data_type} attribute, '
+                             f'expected one of {", ".join(FAC_DATA_TYPES)}')
+        if attribute.domain not in ('POINT', 'CORNER', 'FACE'):
+            raise ValueError(f'The attribute "{source}" of "{obj.name}" is on the {attribute.domain} domain, '
+                             f'expected a point, face or face corner attribute')
+
+        values = np.empty(len(attribute.data), dtype=FAC_DATA_TYPES[attribute.data_type])
+        attribute.data.foreach_get('value', values)
+        values = values.astype(np.float32)
+        source_domain = attribute.domain
+
+    if source_domain == domain:
+        return values
+    if source_domain == 'FACE':
+        values = values[get_corner_faces(mesh)]
+        if domain == 'CORNER':
+            return values
+
+    corner_vertices = get_corner_vertices(mesh)
+    if domain == 'CORNER':
+        return values[corner_vertices]
+    return average_corners(values, corner_vertices, len(mesh.vertices))
+
+
+def write_color_attribute(mesh, name, colors, domain='CORNER', data_type='FLOAT_COLOR'):
+    """
+    Write colors to a color attribute, (re)create it if needed
+
+    :param mesh: The mesh
+    :type mesh: bpy.types.Mesh
+    :param name: The name of the color attribute
+    :type name: str
+    :param colors: The RGBA (linear) color of each point or face corner
+    :type colors: numpy.ndarray of shape (N, 4)
+    :param domain: The domain of the color attribute, defaults to 'CORNER'
+    :type domain: str in ['POINT', 'CORNER'], optional
+    :param data_type: The type of the color attribute, defaults to 'FLOAT_COLOR'
+    :type data_type: str in ['FLOAT_COLOR', 'BYTE_COLOR'], optional
+    :return: The color attribute
+    :rtype: bpy.types.Attribute
+    """
+    attribute = mesh.color_attributes.get(name)
+    if attribute is not None and (attribute.domain != domain or attribute.data_type != data_type):
+        mesh.color_attributes.remove(attribute)
+        attribute = None
+    if attribute is None:
+        attribute = mesh.color_attributes.new(name, data_type, domain)
+
+    attribute.data.foreach_set('color', colors.ravel())
+    return attribute
+
+
+def get_attribute_names(node, name):
+    """
+    Get the names of the color attributes a node is baked to, one for each output of a fused node group
+
+    :param node: The color ramp, converted or baked node group or OSL script node
+    :type node: bpy.types.Node
+    :param name: The name of the color attribute
+    :type name: str
+    :return: The name and ramp definition of each color attribute
+    :rtype: list of tuples (str, dict)
+    """
+    all_ramp_data = get_all_color_ramp_data(node)
+    if len(all_ramp_data) == 1:
+        return [(name, all_ramp_data[0][1])]
+
+    return [(f'{name}_{ramp_name}', ramp_data) for ramp_name, ramp_data in all_ramp_data]
+
+
+def bake_node_to_attributes(node, objects, source, name, domain='CORNER', data_type='FLOAT_COLOR'):
+    """
+    Evaluate the color ramp of a node on mesh objects and write the colors to color attributes.
+    Converted node groups are evaluated as their nodes render, not as the color ramp they represent.
+    Meshes shared by several objects are baked once
+
+    :param node: The color ramp, converted or baked node group or OSL script node
+    :type node: bpy.types.Node
+    :param objects: The mesh objects to bake
+    :type objects: list of bpy.types.Object
+    :param source: The attribute or vertex group used as the factor (see get_fac_values)
+    :type source: str
+    :param name: The name of the color attribute
+    :type name: str
+    :param domain: The domain of the color attribute, defaults to 'CORNER'
+    :type domain: str in ['POINT', 'CORNER'], optional
+    :param data_type: The type of the color attribute, defaults to 'FLOAT_COLOR'
+    :type data_type: str in ['FLOAT_COLOR', 'BYTE_COLOR'], optional
+    :return: The names of the color attributes, the number of baked meshes and of baked values
+    :rtype: tuple of (list of str, int, int)
+    """
+    attributes = get_attribute_names(node, name)
+
+    if is_node_group(node):
+        # e.g. ease ramps with linear map ranges, or HSV ramps mixed in RGB
+        layout, map_range_interpolation = get_converted_node_group_layout(node)
+
+        def evaluate(ramp_data, fac):
+            return evaluate_converted_layout(ramp_data, fac, layout, map_range_interpolation)
+    else:
+        evaluate = evaluate_ramp_data
+
+    baked_meshes = set()
+    value_count = 0
+    for obj in objects:
+        mesh = obj.data
+        if mesh.as_pointer() in baked_meshes:
+            continue
+        baked_meshes.add(mesh.as_pointer())
+
+        fac = get_fac_values(obj, source, domain)
+        for attribute_name, ramp_data in attributes:
+            write_color_attribute(mesh, attribute_name, evaluate(ramp_data, fac), domain, data_type)
+        value_count += len(fac) * len(attributes)
+        mesh.update()
+
+    return [attribute_name for attribute_name, _ in attributes], len(baked_meshes), value_count
+
+
+def can_replace_with_attribute_nodes(node_tree):
+    """
+    Check if the nodes of a node tree can be replaced with nodes reading color attributes
+
+    :param node_tree: The node tree to check
+    :type node_tree: bpy.types.NodeTree
+    :return: Returns True for shader and geometry node trees, False otherwise
+    :rtype: bool
+    """
+    return get_node_type(node_tree) in ['Shader', 'Geometry']
+
+
+def create_attribute_node(node_tree, attribute_name, location, with_alpha=True):
+    """
+    Create a node reading a color attribute
+
+    :param node_tree: The shader or geometry node tree to create the node in
+    :type node_tree: bpy.types.NodeTree
+    :param attribute_name: The name of the color attribute
+    :type attribute_name: str
+    :param location: The location of the node
+    :type location: tuple of 2 floats
+    :param with_alpha: Add a node for the alpha output in geometry node trees, defaults to True
+    :type with_alpha: bool, optional
+    :return: The color output and the alpha output (None without alpha in geometry node trees)
+    :rtype: tuple (bpy.types.NodeSocket, bpy.types.NodeSocket or None)
+    """
+    if get_node_type(node_tree) == 'Shader':
+        attribute_node = node_tree.nodes.new('ShaderNodeVertexColor')
+        attribute_node.layer_name = attribute_name
+        set_node_location(attribute_node, location)
+        return attribute_node.outputs['Color'], attribute_node.outputs['Alpha']
+
+    attribute_node = node_tree.nodes.new('GeometryNodeInputNamedAttribute')
+    attribute_node.data_type = 'FLOAT_COLOR'
+    attribute_node.inputs['Name'].default_value = attribute_name
+    set_node_location(attribute_node, location)
+    if not with_alpha:
+        return attribute_node.outputs['Attribute'], None
+
+    # the named attribute node has no alpha output
+    separate_node = node_tree.nodes.new('FunctionNodeSeparateColor')
+    set_node_location(separate_node, (location[0] + 200.0, location[1]))
+    node_tree.links.new(attribute_node.outputs['Attribute'], separate_node.inputs[0])
+    return attribute_node.outputs['Attribute'], separate_node.outputs['Alpha']
+
+
+def replace_with_attribute_nodes(node, node_tree, attribute_names):
+    """
+    Replace a baked node with nodes reading its color attributes,
+    color attribute nodes in shader node trees, named attribute nodes in geometry node trees
+
+    :param node: The baked node
+    :type node: bpy.types.Node
+    :param node_tree: The node tree the node is in
+    :type node_tree: bpy.types.NodeTree
+    :param attribute_names: The names of the color attributes of the node (see bake_node_to_attributes)
+    :type attribute_names: list of str
+    :raises ValueError: The node tree can't read color attributes (see can_replace_with_attribute_nodes)
+    """
+    if not can_replace_with_attribute_nodes(node_tree):
+        raise ValueError(f'{node_tree.bl_idname} node trees can\'t read color attributes')
+
+    is_fused = is_fused_node_group(node)
+    for output_index, attribute_name in enumerate(attribute_names):
+        location = (node.location[0], node.location[1] - output_index * 150.0)
+        if is_fused:
+            color_output, _ = create_attribute_node(node_tree, attribute_name, location, with_alpha=False)
+            outputs = [(node.outputs[output_index], color_output)]
+        else:
+            # color and alpha outputs, converted node groups have no alpha output
+            with_alpha = len(node.outputs) > 1 and node.outputs[1].is_linked
+            outputs = zip(node.outputs, create_attribute_node(node_tree, attribute_name, location, with_alpha))
+
+        for output, attribute_output in outputs:
+            for link in output.links:
+                node_tree.links.new(attribute_output, link.to_socket)
+
+    remove_node(node, node_tree)
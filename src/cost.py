@@ -0,0 +1,308 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+# GPLv3 License
+#
+# ColorRampConverter
+# Copyright (C) 2022-2026, Mark Elek, David Elek
+#
+# ColorRampConverter is a Blender addon that generates
+# custom node groups from color ramp nodes,
+# making a few parameters more accessible.
+#
+# This file is a part of ColorRampConverter.
+# ColorRampConverter is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# ColorRampConverter is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ColorRampConverter. If not, see <http://www.gnu.org/licenses/>.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# <pep8 compliant>
+
+import bpy
+from .functions import get_addon_prefs
+from .functions import get_all_node_trees
+from .functions import get_conversion_layout
+from .functions import get_fused_color_ramp_groups
+from .functions import get_node_group_capacity
+from .functions import get_node_group_type
+from .functions import is_color_ramp
+from .functions import is_converter_node_tree
+from .functions import is_valid_node
+from .maintenance import LINK_SIZE
+from .maintenance import NODE_SIZE
+from .maintenance import NODE_TREE_SIZE
+from .maintenance import SOCKET_SIZE
+
+
+# rough size of the compiled Cycles SVM program of a node, in 4 int words.
+# The color ramp bakes its 256 entry lookup table into the program
+SVM_NODE_COSTS = {
+    'MAP_RANGE': 3,
+    'MATH': 1,
+    'MIX': 2,
+    'VALTORGB': 2 + 256,
+}
+
+# rough number of sockets of a node
+NODE_SOCKET_COUNTS = {
+    'MAP_RANGE': 13,
+    'MATH': 4,
+    'MIX': 4,
+    'VALTORGB': 3,
+}
+
+# the counts added up for the node tree and file totals
+COST_KEYS = ('nodes', 'links', 'sockets', 'extra_nodes', 'svm_cost', 'color_ramp_svm_cost', 'estimated_size')
+
+
+def get_conversion_cost(stop_count, layout, slot_count=None, create_extra_nodes=False, output_count=1):
+    """
+    Count what converting a color ramp (or color ramps fused into one node group) adds to the file,
+    without building anything
+
+    :param stop_count: The number of stops of the color ramp
+    :type stop_count: int
+    :param layout: The layout of the node tree the color ramp is converted to
+    :type layout: str in ['MAP_RANGE', 'COMPARE', 'LEGACY_CONSTANT', 'FUSED']
+    :param slot_count: The number of stop slots of the node tree, the stop count if None, defaults to None
+    :type slot_count: int, optional
+    :param create_extra_nodes: Count the extra nodes of the node group, defaults to False
+    :type create_extra_nodes: bool, optional
+    :param output_count: The number of color ramps fused into the node tree, defaults to 1
+    :type output_count: int, optional
+    :return: Nodes ('nodes'), links ('links') and interface sockets ('sockets') of the converted node tree,
+        extra nodes ('extra_nodes'), SVM words of the node tree ('svm_cost') and of the color ramp
+        ('color_ramp_svm_cost') and the estimated size in bytes ('estimated_size')
+    :rtype: dict
+    """
+    if slot_count is None:
+        slot_count = stop_count
+    segment_count = slot_count - 1
+
+    if layout == 'LEGACY_CONSTANT':
+        # a color ramp and a mix node per segment, see link_nodes_v2
+        segment_node = 'VALTORGB'
+        link_count = 4 * segment_count + 1
+        # Fac and a color per stop, Color output
+        socket_count = 1 + slot_count + 1
+    elif layout == 'COMPARE':
+        # a math and a mix node per segment, see build_compare_node_tree
+        segment_node = 'MATH'
+        link_count = 5 * segment_count + 1
+        # Fac, a color and a position per stop, Color output
+        socket_count = 1 + 2 * slot_count + 1
+    else:
+        # a map range node per segment, shared by a mix node per segment of each output,
+        # see link_nodes and build_fused_node_tree
+        segment_node = 'MAP_RANGE'
+        link_count = 5 * segment_count + output_count * (3 * segment_count + 1)
+        # Fac, a position per stop and a color per stop of each output, To Min and To Max, Color outputs
+        socket_count = 1 + slot_count + output_count * slot_count + 2 + output_count
+
+    # group input and output nodes
+    node_count = 2 + segment_count + output_count * segment_count
+    # the group input node has an output for each input socket (and an empty one)
+    node_socket_count = (socket_count + 2
+                         + segment_count * (NODE_SOCKET_COUNTS[segment_node]
+                                            + output_count * NODE_SOCKET_COUNTS['MIX']))
+
+    # group nodes are inlined when compiling, only their inner nodes cost
+    svm_cost = segment_count * (SVM_NODE_COSTS[segment_node] + output_count * SVM_NODE_COSTS['MIX'])
+
+    # padded slots don't get extra nodes
+    extra_node_count = output_count * stop_count if create_extra_nodes else 0
+
+    return {
+        'nodes': node_count,
+        'links': link_count,
+        'sockets': socket_count,
+        'extra_nodes': extra_node_count,
+        'svm_cost': svm_cost,
+        'color_ramp_svm_cost': output_count * SVM_NODE_COSTS['VALTORGB'],
+        'estimated_size': (NODE_TREE_SIZE
+                           + (node_count + extra_node_count) * NODE_SIZE
+                           + node_socket_count * SOCKET_SIZE
+                           + (link_count + extra_node_count) * LINK_SIZE),
+    }
+
+
+def estimate_color_ramp_conversion(color_ramp, node_tree, interpolation_type):
+    """
+    Estimate the conversion of a color ramp with the current settings, without changing anything
+
+    :param color_ramp: The color ramp to estimate the conversion of
+    :type color_ramp: [bpy.types.ShaderNodeValToRGB, bpy.types.CompositeNodeValToRGB]
+    :param node_tree: The node tree the color ramp is in
+    :type node_tree: bpy.types.NodeTree
+    :param interpolation_type: The interpolation type of the map range nodes for non-constant color ramps
+    :type interpolation_type: str in ['LINEAR', 'STEPPED', 'SMOOTHSTEP', 'SMOOTHERSTEP']
+    :return: The name ('name') and node tree ('node_tree') of the color ramp, the layout ('layout'),
+        map range interpolation ('map_range_interpolation'), function building it ('builder'),
+        stops ('stops') and stop slots ('slots') it would get, the number of color ramps ('color_ramps', 1)
+        and its cost (see get_conversion_cost). SVM costs are only counted for shader node trees
+    :rtype: dict
+    """
+    addon_prefs = get_addon_prefs()
+
+    layout, map_range_interpolation = get_conversion_layout(
+        color_ramp, node_tree, interpolation_type)
+
+    stop_count = len(color_ramp.color_ramp.elements)
+    if layout == 'LEGACY_CONSTANT':
+        builder = 'create_node_group_v2'
+        slot_count = stop_count
+    elif layout == 'COMPARE':
+        builder = 'build_compare_node_tree'
+        slot_count = get_node_group_capacity(stop_count, int(addon_prefs.node_group_capacity))
+    else:
+        builder = 'create_node_group'
+        slot_count = get_node_group_capacity(stop_count, int(addon_prefs.node_group_capacity))
+
+    estimate = {
+        'name': color_ramp.name,
+        'node_tree': node_tree.name,
+        'layout': layout,
+        'map_range_interpolation': map_range_interpolation,
+        'builder': builder,
+        'stops': stop_count,
+        'slots': slot_count,
+        'color_ramps': 1,
+    }
+    estimate.update(get_conversion_cost(
+        stop_count, layout, slot_count, addon_prefs.create_extra_nodes))
+
+    # only cycles compiles shader nodes to SVM
+    if get_node_group_type(node_tree) != 'Shader':
+        estimate['svm_cost'] = 0
+        estimate['color_ramp_svm_cost'] = 0
+
+    return estimate
+
+
+def estimate_fused_conversion(color_ramps, node_tree, interpolation_type):
+    """
+    Estimate the conversion of color ramps fused into one node group (see functions.get_fused_color_ramp_groups)
+    with the current settings, without changing anything
+
+    :param color_ramps: The color ramps to estimate the fused conversion of
+    :type color_ramps: list of [bpy.types.ShaderNodeValToRGB, bpy.types.CompositeNodeValToRGB]
+    :param node_tree: The node tree the color ramps are in
+    :type node_tree: bpy.types.NodeTree
+    :param interpolation_type: The interpolation type of the map range nodes for non-constant color ramps
+    :type interpolation_type: str in ['LINEAR', 'STEPPED', 'SMOOTHSTEP', 'SMOOTHERSTEP']
+    :return: The estimate of the fused node group (see estimate_color_ramp_conversion),
+        named after the fused color ramps
+    :rtype: dict
+    """
+    addon_prefs = get_addon_prefs()
+
+    # the color ramps share the layout and the stop positions, fused node trees aren't padded
+    _, map_range_interpolation = get_conversion_layout(
+        color_ramps[0], node_tree, interpolation_type)
+    stop_count = len(color_ramps[0].color_ramp.elements)
+
+    estimate = {
+        'name': ', '.join(color_ramp.name for color_ramp in color_ramps),
+        'node_tree': node_tree.name,
+        'layout': 'FUSED',
+        'map_range_interpolation': map_range_interpolation,
+        'builder': 'build_fused_node_tree',
+        'stops': stop_count,
+        'slots': stop_count,
+        'color_ramps': len(color_ramps),
+    }
+    estimate.update(get_conversion_cost(
+        stop_count, 'FUSED', stop_count, addon_prefs.create_extra_nodes, len(color_ramps)))
+
+    # only cycles compiles shader nodes to SVM
+    if get_node_group_type(node_tree) != 'Shader':
+        estimate['svm_cost'] = 0
+        estimate['color_ramp_svm_cost'] = 0
+
+    return estimate
+
+
+def estimate_conversions(nodes, interpolation_type=None):
+    """
+    Dry run of converting color ramps, estimate each conversion and add them up
+    per node tree and for all of them, without changing anything
+
+    :param nodes: The nodes to estimate the conversion of, nodes other than color ramps are skipped
+    :type nodes: list of bpy.types.Node
+    :param interpolation_type: The interpolation type of the map range nodes for non-constant color ramps,
+        the scene's interpolation type if None, defaults to None
+    :type interpolation_type: str in ['LINEAR', 'STEPPED', 'SMOOTHSTEP', 'SMOOTHERSTEP'], optional
+    :return: The estimate of each color ramp, or of color ramps fused into one node group
+        ('color_ramps', see estimate_color_ramp_conversion and estimate_fused_conversion),
+        the totals of each node tree by name ('node_trees') and the totals of all ('total')
+    :rtype: dict
+    """
+    addon_prefs = get_addon_prefs()
+    if interpolation_type is None:
+        interpolation_type = bpy.context.scene.node_group_interpolation
+
+    # color ramps are converted (and fused) per node tree
+    color_ramps_by_node_tree = {}
+    for node in nodes:
+        if is_color_ramp(node) and is_valid_node(node):
+            color_ramps_by_node_tree.setdefault(node.id_data, []).append(node)
+
+    estimates = []
+    node_tree_totals = {}
+    total = dict.fromkeys(COST_KEYS, 0)
+    total['color_ramps'] = 0
+
+    for node_tree, color_ramps in color_ramps_by_node_tree.items():
+        # the same groups as convert_color_ramps, each fused group builds one node tree
+        if addon_prefs.fuse_color_ramps:
+            color_ramp_groups = get_fused_color_ramp_groups(color_ramps, node_tree, interpolation_type)
+        else:
+            color_ramp_groups = [[color_ramp] for color_ramp in color_ramps]
+
+        for color_ramp_group in color_ramp_groups:
+            if len(color_ramp_group) > 1:
+                estimate = estimate_fused_conversion(color_ramp_group, node_tree, interpolation_type)
+            else:
+                estimate = estimate_color_ramp_conversion(color_ramp_group[0], node_tree, interpolation_type)
+            estimates.append(estimate)
+
+            node_tree_total = node_tree_totals.get(node_tree.name)
+            if node_tree_total is None:
+                node_tree_total = node_tree_totals[node_tree.name] = dict.fromkeys(COST_KEYS, 0)
+                node_tree_total['color_ramps'] = 0
+
+            for totals in (node_tree_total, total):
+                totals['color_ramps'] += estimate['color_ramps']
+                for key in COST_KEYS:
+                    totals[key] += estimate[key]
+
+    return {
+        'color_ramps': estimates,
+        'node_trees': node_tree_totals,
+        'total': total,
+    }
+
+
+def estimate_file_conversions(interpolation_type=None):
+    """
+    Dry run of converting every color ramp of the file (see estimate_conversions)
+
+    :param interpolation_type: The interpolation type of the map range nodes for non-constant color ramps,
+        the scene's interpolation type if None, defaults to None
+    :type interpolation_type: str in ['LINEAR', 'STEPPED', 'SMOOTHSTEP', 'SMOOTHERSTEP'], optional
+    :return: The estimates and totals (see estimate_conversions)
+    :rtype: dict
+    """
+    nodes = [node for node_tree in get_all_node_trees()
+             if not is_converter_node_tree(node_tree)
+             for node in node_tree.nodes]
+    return estimate_conversions(nodes, interpolation_type)
@@ -0,0 +1,539 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+# GPLv3 License
+#
+# ColorRampConverter
+# Copyright (C) 2022-2026, Mark Elek, David Elek
+#
+# ColorRampConverter is a Blender addon that generates
+# custom node groups from color ramp nodes,
+# making a few parameters more accessible.
+#
+# This file is a part of ColorRampConverter.
+# ColorRampConverter is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# ColorRampConverter is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ColorRampConverter. If not, see <http://www.gnu.org/licenses/>.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# <pep8 compliant>
+
+# vectorised color ramp evaluation following blender's color band semantics,
+# doesn't depend on bpy, so it can be used (and tested) outside of blender
+
+import numpy as np
+
+
+# weights of the cardinal spline used by blender's color bands
+CARDINAL_TENSION = 0.71
+
+
+def rgb_to_hsv(rgb):
+    """
+    Convert RGB colors to HSV, the same way blender does
+
+    :param rgb: RGB colors
+    :type rgb: numpy.ndarray of shape (..., 3)
+    :return: HSV colors
+    :rtype: numpy.ndarray of shape (..., 3)
+    """
+    r, g, b = rgb[..., 0], rgb[..., 1], rgb[..., 2]
+
+    swap = g < b
+    g, b = np.where(swap, b, g), np.where(swap, g, b)
+    k = np.where(swap, -1.0, 0.0)
+    min_gb = b
+
+    swap = r < g
+    r, g = np.where(swap, g, r), np.where(swap, r, g)
+    k = np.where(swap, -2.0 / 6.0 - k, k)
+    min_gb = np.where(swap, np.minimum(g, b), min_gb)
+
+    chroma = r - min_gb
+    h = np.abs(k + (g - b) / (6.0 * chroma + 1e-20))
+    s = chroma / (r + 1e-20)
+    return np.stack((h, s, r), axis=-1)
+
+
+def rgb_to_hsl(rgb):
+    """
+    Convert RGB colors to HSL, the same way blender does
+
+    :param rgb: RGB colors
+    :type rgb: numpy.ndarray of shape (..., 3)
+    :return: HSL colors
+    :rtype: numpy.ndarray of shape (..., 3)
+    """
+    r, g, b = rgb[..., 0], rgb[..., 1], rgb[..., 2]
+    cmax = np.maximum(np.maximum(r, g), b)
+    cmin = np.minimum(np.minimum(r, g), b)
+    l = np.minimum(1.0, (cmax + cmin) / 2.0)
+
+    achromatic = cmax == cmin
+    d = np.where(achromatic, 1.0, cmax - cmin)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        s = np.where(l > 0.5, d / (2.0 - cmax - cmin), d / (cmax + cmin))
+        h = np.where(cmax == r, (g - b) / d + np.where(g < b, 6.0, 0.0),
+                     np.where(cmax == g, (b - r) / d + 2.0, (r - g) / d + 4.0))
+
+    h = np.where(achromatic, 0.0, h / 6.0)
+    s = np.where(achromatic, 0.0, s)
+    return np.stack((h, s, l), axis=-1)
+
+
+def hue_to_rgb_weights(h):
+    """
+    Get the (clamped) RGB weights of hues, shared by the HSV and HSL conversions
+
+    :param h: Hues
+    :type h: numpy.ndarray
+    :return: The red, green and blue weights
+    :rtype: tuple of numpy.ndarray
+    """
+    nr = np.clip(np.abs(h * 6.0 - 3.0) - 1.0, 0.0, 1.0)
+    ng = np.clip(2.0 - np.abs(h * 6.0 - 2.0), 0.0, 1.0)
+    nb = np.clip(2.0 - np.abs(h * 6.0 - 4.0), 0.0, 1.0)
+    return nr, ng, nb
+
+
+def hsv_to_rgb(hsv):
+    """
+    Convert HSV colors to RGB, the same way blender does
+
+    :param hsv: HSV colors
+    :type hsv: numpy.ndarray of shape (..., 3)
+    :return: RGB colors
+    :rtype: numpy.ndarray of shape (..., 3)
+    """
+    h, s, v = hsv[..., 0], hsv[..., 1], hsv[..., 2]
+    weights = hue_to_rgb_weights(h)
+    return np.stack([((n - 1.0) * s + 1.0) * v for n in weights], axis=-1)
+
+
+def hsl_to_rgb(hsl):
+    """
+    Convert HSL colors to RGB, the same way blender does
+
+    :param hsl: HSL colors
+    :type hsl: numpy.ndarray of shape (..., 3)
+    :return: RGB colors
+    :rtype: numpy.ndarray of shape (..., 3)
+    """
+    h, s, l = hsl[..., 0], hsl[..., 1], hsl[..., 2]
+    chroma = (1.0 - np.abs(2.0 * l - 1.0)) * s
+    weights = hue_to_rgb_weights(h)
+    return np.stack([(n - 0.5) * chroma + l for n in weights], axis=-1)
+
+
+def interpolate_hue(hue_interpolation, mfac, fac, h1, h2):
+    """
+    Interpolate hues like blender's color bands (h1 weighted by mfac, h2 by fac)
+
+    :param hue_interpolation: The hue interpolation type
+    :type hue_interpolation: str in ['NEAR', 'FAR', 'CW', 'CCW']
+    :param mfac: Weights of the first hues
+    :type mfac: numpy.ndarray
+    :param fac: Weights of the second hues
+    :type fac: numpy.ndarray
+    :param h1: First hues
+    :type h1: numpy.ndarray
+    :param h2: Second hues
+    :type h2: numpy.ndarray
+    :return: Interpolated hues
+    :rtype: numpy.ndarray
+    """
+    def hue_mod(h):
+        return np.where(h < 1.0, h, h - 1.0)
+
+    h1 = hue_mod(h1)
+    h2 = hue_mod(h2)
+    difference = h2 - h1
+
+    if hue_interpolation == 'NEAR':
+        wrap_first = (h1 < h2) & (difference > 0.5)
+        wrap_second = (h1 > h2) & (difference < -0.5)
+    elif hue_interpolation == 'FAR':
+        # do a full loop in hue space if both stops have the same hue
+        wrap_first = (h1 == h2) | ((h1 < h2) & (difference < 0.5))
+        wrap_second = ~wrap_first & (h1 > h2) & (difference > -0.5)
+    elif hue_interpolation == 'CCW':
+        wrap_first = np.zeros_like(h1, dtype=bool)
+        wrap_second = h1 > h2
+    elif hue_interpolation == 'CW':
+        wrap_first = h1 < h2
+        wrap_second = np.zeros_like(h1, dtype=bool)
+    else:
+        raise ValueError(f'Invalid hue interpolation: {hue_interpolation}')
+
+    return np.where(wrap_first, hue_mod(mfac * (h1 + 1.0) + fac * h2),
+                    np.where(wrap_second, hue_mod(mfac * h1 + fac * (h2 + 1.0)),
+                             mfac * h1 + fac * h2))
+
+
+def get_spline_weights(interpolation, t):
+    """
+    Get the weights of the four neighbouring stops of a B-spline or cardinal spline
+
+    :param interpolation: The spline type
+    :type interpolation: str in ['B_SPLINE', 'CARDINAL']
+    :param t: Interpolation factors in [0.0, 1.0]
+    :type t: numpy.ndarray
+    :return: The weights of the four stops, in blender's order
+    :rtype: tuple of numpy.ndarray
+    """
+    t2 = t * t
+    t3 = t2 * t
+
+    if interpolation == 'CARDINAL':
+        fc = CARDINAL_TENSION
+        return (-fc * t3 + 2.0 * fc * t2 - fc * t,
+                (2.0 - fc) * t3 + (fc - 3.0) * t2 + 1.0,
+                (fc - 2.0) * t3 + (3.0 - 2.0 * fc) * t2 + fc * t,
+                fc * t3 - fc * t2)
+
+    return (-1.0 / 6.0 * t3 + 0.5 * t2 - 0.5 * t + 1.0 / 6.0,
+            0.5 * t3 - t2 + 2.0 / 3.0,
+            -0.5 * t3 + 0.5 * t2 + 0.5 * t + 1.0 / 6.0,
+            1.0 / 6.0 * t3)
+
+
+def evaluate(positions, colors, fac, color_mode='RGB', interpolation='LINEAR',
+             hue_interpolation='NEAR'):
+    """
+    Evaluate a color ramp at many factors at once
+
+    :param positions: Positions of the color stops in ascending order
+    :type positions: array-like of shape (N,)
+    :param colors: RGBA colors of the color stops
+    :type colors: array-like of shape (N, 4) or (N*4,)
+    :param fac: The factors to evaluate the color ramp at
+    :type fac: array-like of any shape
+    :param color_mode: The color mode of the color ramp, defaults to 'RGB'
+    :type color_mode: str in ['RGB', 'HSV', 'HSL'], optional
+    :param interpolation: The interpolation of the color ramp, defaults to 'LINEAR'
+    :type interpolation: str in ['EASE', 'CARDINAL', 'LINEAR', 'B_SPLINE', 'CONSTANT'], optional
+    :param hue_interpolation: The hue interpolation of the color ramp, defaults to 'NEAR'
+    :type hue_interpolation: str in ['NEAR', 'FAR', 'CW', 'CCW'], optional
+    :return: The evaluated RGBA colors
+    :rtype: numpy.ndarray of shape fac.shape + (4,)
+    """
+    positions = np.asarray(positions, dtype=np.float32).reshape(-1)
+    colors = np.asarray(colors, dtype=np.float32).reshape(-1, 4)
+    fac = np.asarray(fac, dtype=np.float32)
+    shape = fac.shape
+    fac = fac.reshape(-1)
+    count = len(positions)
+
+    if count == 0:
+        raise ValueError('A color ramp needs at least one color stop')
+    if count == 1:
+        return np.broadcast_to(colors[0], shape + (4,)).copy()
+
+    # only RGB color ramps use the interpolation type, the others interpolate linearly
+    interpolation = interpolation if color_mode == 'RGB' else 'LINEAR'
+
+    # index of the first stop with a position greater than fac
+    a = np.searchsorted(positions, fac, side='right')
+    is_before = a == 0
+    is_after = a == count
+
+    # stops on the right (cbd1) and on the left (cbd2) of fac,
+    # virtual stops at 0.0 and 1.0 before the first and after the last stop
+    right_index = np.minimum(a, count - 1)
+    left_index = np.maximum(a - 1, 0)
+    right_position = np.where(is_after, 1.0, positions[right_index])
+    left_position = np.where(is_before, 0.0, positions[left_index])
+    right_color = colors[right_index]
+    left_color = colors[left_index]
+
+    # factor from the right stop (0.0) to the left stop (1.0)
+    span = left_position - right_position
+    has_span = span != 0.0
+    t = np.where(has_span, (fac - right_position) / np.where(has_span, span, 1.0),
+                 np.where(is_after, 1.0, 0.0))
+
+    if interpolation in ['B_SPLINE', 'CARDINAL']:
+        # the spline uses the neighbouring stops too
+        next_index = np.where(a >= count - 1, right_index, np.minimum(a + 1, count - 1))
+        previous_index = np.where(a < 2, left_index, a - 2)
+
+        t = np.clip(t, 0.0, 1.0)
+        weights = get_spline_weights(interpolation, t)
+        result = (weights[3][:, None] * colors[previous_index]
+                  + weights[2][:, None] * left_color
+                  + weights[1][:, None] * right_color
+                  + weights[0][:, None] * colors[next_index])
+        result = np.clip(result, 0.0, 1.0)
+        return result.astype(np.float32).reshape(shape + (4,))
+
+    if interpolation == 'CONSTANT':
+        result = left_color.copy()
+    else:
+        if interpolation == 'EASE':
+            t2 = t * t
+            t = 3.0 * t2 - 2.0 * t2 * t
+        mfac = 1.0 - t
+
+        if color_mode == 'RGB':
+            result = mfac[:, None] * right_color + t[:, None] * left_color
+        else:
+            to_color_space = rgb_to_hsv if color_mode == 'HSV' else rgb_to_hsl
+            from_color_space = hsv_to_rgb if color_mode == 'HSV' else hsl_to_rgb
+
+            right_converted = to_color_space(right_color[:, :3])
+            left_converted = to_color_space(left_color[:, :3])
+
+            hue = interpolate_hue(hue_interpolation, mfac, t,
+                                  right_converted[:, 0], left_converted[:, 0])
+            mixed = mfac[:, None] * right_converted + t[:, None] * left_converted
+            mixed[:, 0] = hue
+
+            result = np.empty((len(fac), 4), dtype=np.float32)
+            result[:, :3] = from_color_space(mixed)
+            result[:, 3] = mfac * right_color[:, 3] + t * left_color[:, 3]
+
+    # constant color after the last and before the first stop (the first stop takes precedence)
+    result[is_after] = colors[-1]
+    result[fac <= positions[0]] = colors[0]
+    return result.astype(np.float32).reshape(shape + (4,))
+
+
+def evaluate_ramp_data(ramp_data, fac):
+    """
+    Evaluate a ramp definition (see functions.get_color_ramp_data) at many factors at once
+
+    :param ramp_data: The ramp definition to evaluate
+    :type ramp_data: dict
+    :param fac: The factors to evaluate the ramp at
+    :type fac: array-like of any shape
+    :return: The evaluated RGBA colors
+    :rtype: numpy.ndarray of shape fac.shape + (4,)
+    """
+    return evaluate(ramp_data['positions'], ramp_data['colors'], fac,
+                    color_mode=ramp_data['color_mode'],
+                    interpolation=ramp_data['interpolation'],
+                    hue_interpolation=ramp_data['hue_interpolation'])
+
+
+# steps of the map range nodes of constant interpolation node groups (see functions.create_node_group)
+STEPPED_STEPS = 0.0001
+
+# luminance weights used when a color is converted to a float
+LUMINANCE_WEIGHTS = (0.2126, 0.7152, 0.0722)
+
+
+def smoothstep(edge0, edge1, x):
+    """
+    Smooth Hermite interpolation like blender's map range node
+
+    :return: Interpolation factors
+    :rtype: numpy.ndarray
+    """
+    span = np.where(edge1 != edge0, edge1 - edge0, 1.0)
+    t = (x - edge0) / span
+    return np.where(x < edge0, 0.0, np.where(x >= edge1, 1.0, (3.0 - 2.0 * t) * t * t))
+
+
+def smootherstep(edge0, edge1, x):
+    """
+    Smoother Hermite interpolation like blender's map range node
+
+    :return: Interpolation factors
+    :rtype: numpy.ndarray
+    """
+    span = edge1 - edge0
+    t = np.where(span != 0.0, (x - edge0) / np.where(span != 0.0, span, 1.0), 0.0)
+    t = np.clip(t, 0.0, 1.0)
+    return t * t * t * (t * (t * 6.0 - 15.0) + 10.0)
+
+
+def map_range(value, from_min, from_max, interpolation='LINEAR', steps=STEPPED_STEPS):
+    """
+    Map values to [0.0, 1.0] like blender's (clamped) map range node
+
+    :param value: The values to map
+    :type value: numpy.ndarray
+    :param from_min: The lower bound of the input range
+    :type from_min: float
+    :param from_max: The upper bound of the input range
+    :type from_max: float
+    :param interpolation: The interpolation type of the map range node, defaults to 'LINEAR'
+    :type interpolation: str in ['LINEAR', 'STEPPED', 'SMOOTHSTEP', 'SMOOTHERSTEP'], optional
+    :param steps: The number of steps of stepped interpolation, defaults to STEPPED_STEPS
+    :type steps: float, optional
+    :return: The mapped values
+    :rtype: numpy.ndarray
+    """
+    if interpolation == 'SMOOTHSTEP':
+        if from_min > from_max:
+            return 1.0 - smoothstep(from_max, from_min, value)
+        return smoothstep(from_min, from_max, value)
+
+    if interpolation == 'SMOOTHERSTEP':
+        if from_min > from_max:
+            return 1.0 - smootherstep(from_max, from_min, value)
+        return smootherstep(from_min, from_max, value)
+
+    span = from_max - from_min
+    factor = (value - from_min) / span if span != 0.0 else np.zeros_like(value)
+    if interpolation == 'STEPPED':
+        factor = np.floor(factor * (steps + 1.0)) / steps if steps > 0.0 else np.zeros_like(value)
+    return np.clip(factor, 0.0, 1.0)
+
+
+def evaluate_mix_chain(colors, factors):
+    """
+    Evaluate the chain of mix nodes of a converted node group,
+    mix node i mixes color i with the result of mix node i+1 by factor i
+
+    :param colors: RGBA colors of the color stops
+    :type colors: numpy.ndarray of shape (N, 4)
+    :param factors: The factors of the N-1 mix nodes
+    :type factors: list of numpy.ndarray
+    :return: The RGBA result of the first mix node
+    :rtype: numpy.ndarray of shape (M, 4)
+    """
+    result = np.broadcast_to(colors[-1], factors[0].shape + (4,)) if factors else colors[-1:]
+    for i in reversed(range(len(factors))):
+        factor = np.clip(factors[i], 0.0, 1.0)[:, None]
+        result = colors[i] * (1.0 - factor) + result * factor
+    return result
+
+
+def evaluate_map_range_layout(positions, colors, fac, map_range_interpolation='LINEAR'):
+    """
+    Evaluate a map range node based converted node group (see functions.create_node_group)
+
+    :param positions: Positions of the color stops
+    :type positions: array-like of shape (N,)
+    :param colors: RGBA colors of the color stops
+    :type colors: array-like of shape (N, 4) or (N*4,)
+    :param fac: The factors to evaluate the node group at
+    :type fac: array-like of shape (M,)
+    :param map_range_interpolation: The interpolation type of the map range nodes, defaults to 'LINEAR'
+    :type map_range_interpolation: str in ['LINEAR', 'STEPPED', 'SMOOTHSTEP', 'SMOOTHERSTEP'], optional
+    :return: The evaluated RGBA colors
+    :rtype: numpy.ndarray of shape (M, 4)
+    """
+    positions = np.asarray(positions, dtype=np.float64).reshape(-1)
+    colors = np.asarray(colors, dtype=np.float64).reshape(-1, 4)
+    fac = np.asarray(fac, dtype=np.float64).reshape(-1)
+
+    factors = [map_range(fac, positions[i], positions[i + 1], map_range_interpolation)
+               for i in range(len(positions) - 1)]
+    return evaluate_mix_chain(colors, factors).astype(np.float32)
+
+
+def evaluate_compare_layout(positions, colors, fac):
+    """
+    Evaluate a greater than math node based constant interpolation node group
+    (see functions.build_compare_node_tree)
+
+    :param positions: Positions of the color stops
+    :type positions: array-like of shape (N,)
+    :param colors: RGBA colors of the color stops
+    :type colors: array-like of shape (N, 4) or (N*4,)
+    :param fac: The factors to evaluate the node group at
+    :type fac: array-like of shape (M,)
+    :return: The evaluated RGBA colors
+    :rtype: numpy.ndarray of shape (M, 4)
+    """
+    positions = np.asarray(positions, dtype=np.float32).reshape(-1)
+    colors = np.asarray(colors, dtype=np.float64).reshape(-1, 4)
+    fac = np.asarray(fac, dtype=np.float32).reshape(-1)
+
+    # mix node i takes the next stops' color once the factor reaches the next position
+    factors = [(fac >= positions[i + 1]).astype(np.float64) for i in range(len(positions) - 1)]
+    return evaluate_mix_chain(colors, factors).astype(np.float32)
+
+
+def evaluate_legacy_constant_layout(positions, colors, fac, color_mode='RGB',
+                                    hue_interpolation='NEAR'):
+    """
+    Evaluate a color ramp based (legacy) constant interpolation node group
+    (see functions.create_node_group_v2)
+
+    :param positions: Positions of the color stops
+    :type positions: array-like of shape (N,)
+    :param colors: RGBA colors of the color stops
+    :type colors: array-like of shape (N, 4) or (N*4,)
+    :param fac: The factors to evaluate the node group at
+    :type fac: array-like of shape (M,)
+    :param color_mode: The color mode of the inner color ramps, defaults to 'RGB'
+    :type color_mode: str in ['RGB', 'HSV', 'HSL'], optional
+    :param hue_interpolation: The hue interpolation of the inner color ramps, defaults to 'NEAR'
+    :type hue_interpolation: str in ['NEAR', 'FAR', 'CW', 'CCW'], optional
+    :return: The evaluated RGBA colors
+    :rtype: numpy.ndarray of shape (M, 4)
+    """
+    positions = np.asarray(positions, dtype=np.float32).reshape(-1)
+    colors = np.asarray(colors, dtype=np.float64).reshape(-1, 4)
+    fac = np.asarray(fac, dtype=np.float32).reshape(-1)
+
+    # every inner color ramp goes from black at the first position to white at the next position
+    black_white = np.array([[0.0, 0.0, 0.0, 1.0], [1.0, 1.0, 1.0, 1.0]])
+    factors = []
+    for i in range(len(positions) - 1):
+        inner = evaluate([positions[0], positions[i + 1]], black_white, fac,
+                         color_mode, 'CONSTANT', hue_interpolation)
+        factors.append(inner[:, :3] @ np.asarray(LUMINANCE_WEIGHTS))
+    return evaluate_mix_chain(colors, factors).astype(np.float32)
+
+
+def evaluate_converted_layout(ramp_data, fac, layout, map_range_interpolation='LINEAR'):
+    """
+    Evaluate the node group a ramp definition is converted to,
+    each output of a fused node group is evaluated like a map range node group
+
+    :param ramp_data: The ramp definition (see functions.get_color_ramp_data)
+    :type ramp_data: dict
+    :param fac: The factors to evaluate the node group at
+    :type fac: array-like of shape (M,)
+    :param layout: The layout of the node group
+    :type layout: str in ['MAP_RANGE', 'COMPARE', 'LEGACY_CONSTANT', 'FUSED']
+    :param map_range_interpolation: The interpolation type of the map range nodes, defaults to 'LINEAR'
+    :type map_range_interpolation: str in ['LINEAR', 'STEPPED', 'SMOOTHSTEP', 'SMOOTHERSTEP'], optional
+    :return: The evaluated RGBA colors
+    :rtype: numpy.ndarray of shape (M, 4)
+    """
+    if layout == 'COMPARE':
+        return evaluate_compare_layout(ramp_data['positions'], ramp_data['colors'], fac)
+    if layout == 'LEGACY_CONSTANT':
+        return evaluate_legacy_constant_layout(ramp_data['positions'], ramp_data['colors'], fac,
+                                               ramp_data['color_mode'], ramp_data['hue_interpolation'])
+    return evaluate_map_range_layout(ramp_data['positions'], ramp_data['colors'], fac,
+                                     map_range_interpolation)
+
+
+def measure_conversion_error(ramp_data, layout, map_range_interpolation='LINEAR', sample_count=1024):
+    """
+    Compare a ramp definition with the node group it is converted to
+
+    :param ramp_data: The ramp definition (see functions.get_color_ramp_data)
+    :type ramp_data: dict
+    :param layout: The layout of the node group
+    :type layout: str in ['MAP_RANGE', 'COMPARE', 'LEGACY_CONSTANT']
+    :param map_range_interpolation: The interpolation type of the map range nodes, defaults to 'LINEAR'
+    :type map_range_interpolation: str in ['LINEAR', 'STEPPED', 'SMOOTHSTEP', 'SMOOTHERSTEP'], optional
+    :param sample_count: The number of evenly spaced factors in [0.0, 1.0] to compare, defaults to 1024
+    :type sample_count: int, optional
+    :return: The maximum and mean (per sample maximum) RGB error
+    :rtype: tuple of float
+    """
+    fac = np.linspace(0.0, 1.0, sample_count, dtype=np.float32)
+    expected = evaluate_ramp_data(ramp_data, fac)
+    actual = evaluate_converted_layout(ramp_data, fac, layout, map_range_interpolation)
+
+    # the node groups only output colors, alpha is not compared
+    error = np.abs(expected[:, :3] - actual[:, :3]).max(axis=1)
+    return float(error.max()), float(error.mean())
@@ -29,6 +29,22 @@
 
 import bpy
 import contextlib
+import hashlib
+import struct
+import traceback
+from .library import get_library_dir
+from .library import get_library_key
+from .library import load_node_tree
+from .library import store_node_tree
+from .lazy import lazy_import
+
+# NumPy is only imported when a conversion is verified
+evaluator = lazy_import('.evaluator', __package__)
+
+# ID property holding the metadata record of converted node trees
+CONVERTED_METADATA_KEY = 'color_ramp_converter'
+# bump when the layout of converted node trees or of the record changes
+CONVERTED_METADATA_VERSION = 2
 
 
 def get_addon_prefs():
@@ -79,9 +95,40 @@ def is_node_group(node):
     :return: Returns True if node is a converted node group, False otherwise
     :rtype: bool
     """
+    if node.__class__.__name__ not in ['ShaderNodeGroup', 'CompositorNodeGroup', 'GeometryNodeGroup']:
+        return False
+
+    # node trees converted with older versions don't carry a metadata record
+    return node.is_converted or has_converted_metadata(node.node_tree)
+
+
+def is_baked_lut(node):
+    """
+    Check if node is a node group baked to a lookup texture
+
+    :param node: The node to check
+    :type node: bpy.types.Node
+    :return: Returns True if node is a baked lookup texture node group, False otherwise
+    :rtype: bool
+    """
     return (node.__class__.__name__
             in ['ShaderNodeGroup', 'CompositorNodeGroup', 'GeometryNodeGroup']
-            and node.is_converted)
+            and node.is_baked)
+
+
+def is_osl_ramp(node):
+    """
+    Check if node is an OSL script node generated from a color ramp
+
+    :param node: The node to check
+    :type node: bpy.types.Node
+    :return: Returns True if node is a generated OSL script node, False otherwise
+    :rtype: bool
+    """
+    return (node.__class__.__name__ == 'ShaderNodeScript'
+            and node.mode == 'INTERNAL'
+            and node.script is not None
+            and 'color_ramp_data' in node.script)
 
 
 def is_map_range(node):
@@ -146,10 +193,10 @@ def is_valid_node(node):
     elif is_color_ramp(node):
         color_count = len(node.color_ramp.elements)
         return color_count > 1
+    elif is_baked_lut(node) or is_osl_ramp(node):
+        return True
     elif not is_node_group(node):
         return False
-    elif not node.is_converted:
-        return False
 
     return True
 
@@ -178,6 +225,30 @@ def any_converted_node_group(nodes):
     return any(is_node_group(node) for node in nodes)
 
 
+def any_baked_lut(nodes):
+    """
+    Check if any node in the list is a baked lookup texture node group
+
+    :param nodes: The list of nodes to check
+    :type nodes: list of bpy.types.Node
+    :return: Returns True if any node is a baked lookup texture node group, False otherwise
+    :rtype: bool
+    """
+    return any(is_baked_lut(node) for node in nodes)
+
+
+def any_osl_ramp(nodes):
+    """
+    Check if any node in the list is an OSL script node generated from a color ramp
+
+    :param nodes: The list of nodes to check
+    :type nodes: list of bpy.types.Node
+    :return: Returns True if any node is a generated OSL script node, False otherwise
+    :rtype: bool
+    """
+    return any(is_osl_ramp(node) for node in nodes)
+
+
 def any_valid_node(nodes):
     """
     Check if any node in the list is a valid node
@@ -308,6 +379,28 @@ def create_node_group_input(node_group, socket_type, socket_name, value):
     return node_group_input
 
 
+def create_node_group_output(node_group, socket_type, socket_name):
+    """
+    Create outputs (sockets) for a node group
+
+    :param node_group: The node group to create the output for
+    :type node_group: bpy.types.NodeGroup
+    :param socket_type: The type of the output socket to create
+    :type socket_type: str in ['NodeSocketColor', 'NodeSocketFloat']
+    :param socket_name: The name of the output socket to create
+    :type socket_name: str
+    :return: Returns the created output socket
+    :rtype: bpy.types.NodeSocket
+    """
+    # check blender version
+    if bpy.app.version < (4, 0, 0):
+        return node_group.outputs.new(socket_type, socket_name)
+
+    # blender 4.0 and above
+    return node_group.interface.new_socket(
+        name=socket_name, socket_type=socket_type, in_out='OUTPUT')
+
+
 def set_or_create_node_group_input(node_group, socket_type, socket_name, value):
     """
     Set or create inputs (sockets) for converted node group
@@ -607,7 +700,7 @@ def link_nodes(node_group):
     node_group_output_node = node_group.nodes.get('Group Output')
 
     # mix node indices
-    color1_index, color2_index, factor_index, output_index = get_mix_node_indices()
+    color1_index, color2_index, factor_index, output_index = get_mix_node_indices(node_group)
 
     map_range_node_count = len(map_range_nodes)
     # link map range nodes
@@ -678,7 +771,7 @@ def link_nodes_v2(node_group):
     node_group_output_node = node_group.nodes.get('Group Output')
 
     # mix node indices
-    color1_index, color2_index, factor_index, output_index = get_mix_node_indices()
+    color1_index, color2_index, factor_index, output_index = get_mix_node_indices(node_group)
 
     color_ramp_node_count = len(color_ramp_nodes)
 
@@ -753,6 +846,97 @@ def get_node_group_type(node_tree):
             f'Node tree: {node_tree.name} is not a shader, compositor or geometry node tree')
 
 
+def get_all_node_trees():
+    """
+    Get all node trees of the file that can contain color ramps or converted node groups
+
+    :return: The material, world and light node trees, the compositor node trees and the node groups
+    :rtype: list of bpy.types.NodeTree
+    """
+    node_trees = []
+    for id_collection in (bpy.data.materials, bpy.data.worlds, bpy.data.lights):
+        node_trees += [id_data.node_tree for id_data in id_collection
+                       if id_data.node_tree is not None]
+
+    # starting with Blender 5.0, compositor node trees are regular node groups
+    if bpy.app.version < (5, 0, 0):
+        node_trees += [scene.node_tree for scene in bpy.data.scenes
+                       if scene.node_tree is not None]
+
+    node_trees += [node_group for node_group in bpy.data.node_groups
+                   if node_group.bl_idname in ['ShaderNodeTree', 'CompositorNodeTree', 'GeometryNodeTree']]
+    return node_trees
+
+
+def is_converter_node_tree(node_tree):
+    """
+    Check if a node tree was created by the addon (converted or baked node tree)
+
+    :param node_tree: The node tree to check
+    :type node_tree: bpy.types.NodeTree
+    :return: Returns True if the node tree is a converted or baked node tree, False otherwise
+    :rtype: bool
+    """
+    return (has_converted_metadata(node_tree)
+            or 'color_ramp_data' in node_tree
+            # converted with an older version, without a metadata record
+            or node_tree.name.startswith('Converted'))
+
+
+def is_nested_node_group(node):
+    """
+    Check if node is a group node of a regular (not converted or baked) node tree
+
+    :param node: The node to check
+    :type node: bpy.types.Node
+    :return: Returns True if node is a group node that can contain color ramps, False otherwise
+    :rtype: bool
+    """
+    return (node.__class__.__name__ in ['ShaderNodeGroup', 'CompositorNodeGroup', 'GeometryNodeGroup']
+            and node.node_tree is not None
+            and not is_converter_node_tree(node.node_tree))
+
+
+def get_nested_node_trees(nodes, node_trees=()):
+    """
+    Collect the node trees reachable through (nested) group nodes.
+    Node trees shared by several group nodes are collected once
+
+    :param nodes: The nodes to start from
+    :type nodes: list of bpy.types.Node
+    :param node_trees: Node trees to collect as well, with the node trees nested in them, defaults to ()
+    :type node_trees: list of bpy.types.NodeTree, optional
+    :return: The unique node trees and the number of group node references found
+    :rtype: tuple (list of bpy.types.NodeTree, int)
+    """
+    # datablocks are keyed by pointer, the same node tree can be reached through many group nodes
+    visited = set()
+    unique_node_trees = []
+    reference_count = 0
+
+    for node_tree in node_trees:
+        if node_tree.as_pointer() not in visited and not is_converter_node_tree(node_tree):
+            visited.add(node_tree.as_pointer())
+            unique_node_trees.append(node_tree)
+
+    stack = [node for node in nodes if is_nested_node_group(node)]
+    for node_tree in unique_node_trees:
+        stack += [node for node in node_tree.nodes if is_nested_node_group(node)]
+
+    while stack:
+        node_tree = stack.pop().node_tree
+        reference_count += 1
+
+        if node_tree.as_pointer() in visited:
+            continue
+        visited.add(node_tree.as_pointer())
+        unique_node_trees.append(node_tree)
+
+        stack += [node for node in node_tree.nodes if is_nested_node_group(node)]
+
+    return unique_node_trees, reference_count
+
+
 def get_node_type(node_tree):
     """
     Get the type of a node, based on the type of the node tree
@@ -793,10 +977,62 @@ def create_node_group(node_group_name, node_tree, color_ramp, interpolation_type
     :return: The created node group
     :rtype: bpy.types.NodeGroup
     """
+    converted_node_tree = build_node_tree(
+        node_group_name, node_tree, color_ramp, interpolation_type)
+    node_group = instantiate_node_group(
+        converted_node_tree, get_node_group_type(node_tree), node_group_name, node_tree)
+    set_converted_node_group_settings(node_group, color_ramp)
+    return node_group
+
+
+def build_node_tree(node_group_name, node_tree, color_ramp, interpolation_type, capacity=0):
+    """
+    Build the node tree of a custom node group from a color ramp,
+    without changing the node tree the color ramp is in.
+    With a capacity, the node tree gets that many stop slots, the slots after the
+    last stop repeat its position and color, which makes their segments inactive
+
+    :param node_group_name: The name of the node tree to build
+    :type node_group_name: str
+    :param node_tree: The node tree the node group will be used in
+    :type node_tree: bpy.types.NodeTree
+    :param color_ramp: The color ramp to build the node tree from
+    :type color_ramp: [bpy.types.ShaderNodeValToRGB, bpy.types.CompositeNodeValToRGB]
+    :param interpolation_type: The interpolation type of the map range nodes in the custom node group
+    :type interpolation_type: str in ['LINEAR', 'STEPPED', 'SMOOTHSTEP', 'SMOOTHERSTEP']
+    :param capacity: The number of stop slots, 0 for exactly as many as the color ramp has stops, defaults to 0
+    :type capacity: int, optional
+    :return: The built (detached) node tree
+    :rtype: bpy.types.NodeTree
+    """
+    return build_node_tree_from_data(node_group_name, node_tree, get_color_ramp_data(color_ramp),
+                                     interpolation_type, capacity)
+
+
+def build_node_tree_from_data(node_group_name, node_tree, ramp_data, interpolation_type, capacity=0):
+    """
+    Build the node tree of a custom node group from a ramp definition (see build_node_tree)
+
+    :param node_group_name: The name of the node tree to build
+    :type node_group_name: str
+    :param node_tree: The node tree the node group will be used in
+    :type node_tree: bpy.types.NodeTree
+    :param ramp_data: The ramp definition to build the node tree from, stops in ascending order
+        (see get_color_ramp_data)
+    :type ramp_data: dict
+    :param interpolation_type: The interpolation type of the map range nodes in the custom node group
+    :type interpolation_type: str in ['LINEAR', 'STEPPED', 'SMOOTHSTEP', 'SMOOTHERSTEP']
+    :param capacity: The number of stop slots, 0 for exactly as many as the ramp has stops, defaults to 0
+    :type capacity: int, optional
+    :return: The built (detached) node tree
+    :rtype: bpy.types.NodeTree
+    """
     node_tree_type = get_node_type(node_tree)
     node_group_type = get_node_group_type(node_tree)
-    color_ramp_elements = color_ramp.color_ramp.elements
-    color_count = len(color_ramp_elements)
+    positions = ramp_data['positions']
+    colors = ramp_data['colors']
+    stop_count = len(positions)
+    color_count = get_node_group_capacity(stop_count, capacity)
 
     value_nodes = []
     map_range_nodes = []
@@ -811,7 +1047,7 @@ def create_node_group(node_group_name, node_tree, color_ramp, interpolation_type
 
     # add fac input to node group
     create_node_group_input(node_group, 'NodeSocketFloat',
-                            'Fac', color_ramp.inputs[0].default_value)
+                            'Fac', ramp_data['fac'])
 
     # add group input node
     node_group_input_node = node_group.nodes.new('NodeGroupInput')
@@ -832,6 +1068,9 @@ def create_node_group(node_group_name, node_tree, color_ramp, interpolation_type
 
     # create nodes
     for i in range(color_count):
+        # padded slots repeat the last stop
+        stop_index = min(i, stop_count - 1)
+
         # add colors of color stops as inputs to node group
         # check blender version
         if bpy.app.version < (4, 0, 0):
@@ -842,7 +1081,7 @@ def create_node_group(node_group_name, node_tree, color_ramp, interpolation_type
             color_input = node_group.interface.new_socket(
                 name=f'Color{i+1}', socket_type='NodeSocketColor', in_out='INPUT')
 
-        color_input.default_value = color_ramp_elements[i].color
+        color_input.default_value = colors[stop_index*4:stop_index*4 + 4]
 
         # add positions of color stops as inputs to node group
         # check blender version
@@ -853,7 +1092,7 @@ def create_node_group(node_group_name, node_tree, color_ramp, interpolation_type
             pos_input = node_group.interface.new_socket(
                 name=f'Pos{i+1}', socket_type='NodeSocketFloat', in_out='INPUT')
 
-        pos_input.default_value = color_ramp_elements[i].position
+        pos_input.default_value = positions[stop_index]
 
         # need one less from these nodes
         if i+1 < color_count:
@@ -881,208 +1120,1017 @@ def create_node_group(node_group_name, node_tree, color_ramp, interpolation_type
 
     link_nodes(node_group)
 
-    node_group = instantiate_node_group(
-        node_group, node_group_type, node_group_name, node_tree)
-
-    node_group.color_mode = color_ramp.color_ramp.color_mode
-    node_group.interpolation = color_ramp.color_ramp.interpolation
-    node_group.hue_interpolation = color_ramp.color_ramp.hue_interpolation
+    # inputs are Fac, then a Color and Pos input for each stop, then To Min and To Max
+    set_converted_metadata(node_group, 'MAP_RANGE', ramp_data, interpolation_type,
+                           color_inputs=[1 + i*2 for i in range(color_count)],
+                           position_inputs=[2 + i*2 for i in range(color_count)],
+                           stop_count=stop_count)
 
     return node_group
 
 
-def create_node_group_v2(node_group_name, node_tree, color_ramp):
+def get_node_group_capacity(stop_count, capacity):
     """
-    Create a custom node group from a color ramp
+    Get the number of stop slots of a padded node group
 
-    :param node_group_name: The name of the node group to create
-    :type node_group_name: str
-    :param node_tree: The node tree to create the node group in
-    :type node_tree: bpy.types.NodeTree
-    :param color_ramp: The color ramp to create the node group from
-    :type color_ramp: [bpy.types.ShaderNodeValToRGB, bpy.types.CompositeNodeValToRGB]
-    :return: The created node group
-    :rtype: bpy.types.NodeGroup
+    :param stop_count: The number of stops of the color ramp
+    :type stop_count: int
+    :param capacity: The requested number of stop slots, 0 for no padding
+    :type capacity: int
+    :return: The requested capacity, doubled until all stops fit, or the stop count without padding
+    :rtype: int
     """
-    node_tree_type = get_node_type(node_tree)
-    node_group_type = get_node_group_type(node_tree)
-    color_ramp_elements = color_ramp.color_ramp.elements
-    color_count = len(color_ramp_elements)
-
-    value_nodes = []
-    color_ramp_nodes = []
-    mix_rgb_nodes = []
-
-    # mix node indices
-    color1_index, color2_index, _, _ = get_mix_node_indices()
+    if capacity <= 0:
+        return stop_count
 
-    existing_node_group = bpy.data.node_groups.get(node_group_name)
-    with contextlib.suppress(Exception):
-        bpy.data.node_groups.remove(existing_node_group, do_unlink=False)
+    while capacity < stop_count:
+        capacity *= 2
+    return capacity
 
-    node_group = bpy.data.node_groups.new(
-        node_group_name, f'{node_group_type}NodeTree')
 
-    # add fac input to node group
-    create_node_group_input(node_group, 'NodeSocketFloat',
-                            'Fac', color_ramp.inputs[0].default_value)
+def get_active_stop_count(node_group, metadata=None):
+    """
+    Get the number of stops of a converted node group in use,
+    padded slots repeating the last stop are not counted
 
-    # add group input node
-    node_group_input_node = node_group.nodes.new('NodeGroupInput')
-    node_group_input_node.location = (-400, 0)
+    :param node_group: The converted node group
+    :type node_group: bpy.types.NodeGroup
+    :param metadata: The metadata record of the node group, read from it if None, defaults to None
+    :type metadata: dict, optional
+    :return: The number of stops in use
+    :rtype: int
+    """
+    if metadata is None:
+        metadata = get_converted_metadata(node_group)
+    color_inputs = metadata['color_inputs']
+    # fused node groups have a color input per stop for each output, but one position input
+    stop_count = len(metadata.get('position_inputs') or color_inputs)
+    # only the stops of map range and compare node groups can be edited through their inputs,
+    # whatever the node tree was built with (see set_converted_group_stops)
+    if metadata['layout'] not in ['MAP_RANGE', 'COMPARE']:
+        return stop_count
 
-    # add group output node
-    node_group_output_node = node_group.nodes.new('NodeGroupOutput')
-    node_group_output_node.location = (400, 0)
+    inputs = node_group.inputs
+    position_inputs = metadata['position_inputs']
+    while stop_count > 1:
+        last, previous = stop_count - 1, stop_count - 2
+        if (inputs[position_inputs[last]].default_value != inputs[position_inputs[previous]].default_value
+                or tuple(inputs[color_inputs[last]].default_value) != tuple(inputs[color_inputs[previous]].default_value)):
+            break
+        stop_count -= 1
 
-    # add color input to group output node
-    # check blender version
-    if bpy.app.version < (4, 0, 0):
-        node_group.outputs.new('NodeSocketColor', 'Color')
-    else:
-        # blender 4.0 and above
-        node_group.interface.new_socket(
-            name='Color', socket_type='NodeSocketColor', in_out='OUTPUT')
+    return stop_count
 
-    # create nodes
-    for i in range(color_count):
-        # add colors of color stops as inputs to node group
 
-        # check blender version
-        if bpy.app.version < (4, 0, 0):
-            color_input = node_group.inputs.new(
-                'NodeSocketColor', f'Color{i+1}')
-        else:
-            # blender 4.0 and above
-            color_input = node_group.interface.new_socket(
-                socket_type='NodeSocketColor', name=f'Color{i+1}', in_out='INPUT')
+def get_output_color_inputs(node_group, output_index=0, metadata=None):
+    """
+    Get the color inputs of the stops in use of one output of a converted node group.
+    Only fused node groups have more than one output, the output index is ignored for the rest
 
-        color_input.default_value = color_ramp_elements[i].color
+    :param node_group: The converted node group
+    :type node_group: bpy.types.NodeGroup
+    :param output_index: The index of the output of a fused node group, defaults to 0
+    :type output_index: int, optional
+    :param metadata: The metadata record of the node group, read from it if None, defaults to None
+    :type metadata: dict, optional
+    :return: The input index of each stop's color
+    :rtype: list of int
+    """
+    if metadata is None:
+        metadata = get_converted_metadata(node_group)
 
-        # need one less from these nodes
-        if i+1 < color_count:
+    color_inputs = metadata['color_inputs']
+    slot_count = len(metadata.get('position_inputs') or color_inputs)
+    if metadata.get('output_count', 1) == 1:
+        output_index = 0
 
-            # add color ramp nodes
-            new_color_ramp = create_node(node_group, f'{node_tree_type}NodeValToRGB',
-                                         f'Color Ramp{i+1}', (-150, -i*300))
+    # padded slots are left out
+    start = output_index * slot_count
+    return color_inputs[start:start + get_active_stop_count(node_group, metadata)]
 
-            copy_base_color_ramp(color_ramp, new_color_ramp)
 
-            color_stop_left = color_ramp.color_ramp.elements[0]
-            color_stop_right = color_ramp.color_ramp.elements[i+1]
-            color_stop_current = color_ramp.color_ramp.elements[i]
+def get_all_color_inputs(node_group, metadata=None):
+    """
+    Get the color inputs of the stops in use of every output of a converted node group
 
-            new_color_ramp.color_ramp.elements[0].position = color_stop_left.position
-            new_color_ramp.color_ramp.elements[1].position = color_stop_right.position
+    :param node_group: The converted node group
+    :type node_group: bpy.types.NodeGroup
+    :param metadata: The metadata record of the node group, read from it if None, defaults to None
+    :type metadata: dict, optional
+    :return: The input indices of the stop colors
+    :rtype: list of int
+    """
+    if metadata is None:
+        metadata = get_converted_metadata(node_group)
 
-            """ if i == 0:
-                create_driver(new_color_ramp, node_group,
-                              ramp_element_index=0, input_name='Pos1')
-            else:
+    return [color_input for output_index in range(metadata.get('output_count', 1))
+            for color_input in get_output_color_inputs(node_group, output_index, metadata)]
 
-                create_driver(new_color_ramp, node_group,
-                              ramp_element_index=1, input_name=f'Pos{i+2}') """
 
-            # add mix rgb nodes
-            mix_rgb_node = create_node(node_group, f'{node_tree_type}NodeMixRGB',
-                                       f'Mix{i+1}', (200, -i*300))
+def is_fused_node_group(node):
+    """
+    Check if node is a converted node group with several color ramps fused into it
 
-            # set mix rgb node's first color
-            color = color_stop_current.color
+    :param node: The node to check
+    :type node: bpy.types.Node
+    :return: Returns True if node is a fused node group, False otherwise
+    :rtype: bool
+    """
+    return (node.bl_idname.endswith('NodeGroup')
+            and has_converted_metadata(node.node_tree)
+            and node.node_tree[CONVERTED_METADATA_KEY].get('output_count', 1) > 1)
 
-            # have to set RGB values separately because of RGB and RGBA list size
-            mix_rgb_node.inputs[color1_index].default_value[0] = color[0]
-            mix_rgb_node.inputs[color1_index].default_value[1] = color[1]
-            mix_rgb_node.inputs[color1_index].default_value[2] = color[2]
 
-            mix_rgb_nodes.append(mix_rgb_node)
+def set_converted_group_stops(node_group, positions, colors):
+    """
+    Set the stops of a converted node group through its input values only.
+    Stops are added or removed without changing the node tree, as long as they fit in its slots
 
-    # set last mix rgb node's second color
-    color = color_ramp.color_ramp.elements[-1].color
+    :param node_group: The converted node group
+    :type node_group: bpy.types.NodeGroup
+    :param positions: The positions of the stops
+    :type positions: list of float
+    :param colors: The RGBA colors of the stops (N*4 floats)
+    :type colors: list of float
+    :return: Returns True if the stops were set, False if they don't fit in the node group
+    :rtype: bool
+    """
+    metadata = get_converted_metadata(node_group)
+    if metadata['layout'] not in ['MAP_RANGE', 'COMPARE']:
+        return False
 
-    # have to set RGB values separately because of RGB and RGBA list size
-    mix_rgb_nodes[-1].inputs[color2_index].default_value[0] = color[0]
-    mix_rgb_nodes[-1].inputs[color2_index].default_value[1] = color[1]
-    mix_rgb_nodes[-1].inputs[color2_index].default_value[2] = color[2]
+    color_inputs = metadata['color_inputs']
+    position_inputs = metadata['position_inputs']
+    stop_count = len(positions)
+    if not 0 < stop_count <= len(color_inputs):
+        return False
 
-    link_nodes_v2(node_group)
+    # the node chain expects the stops in order, like the color ramp keeps them
+    stops = sorted((positions[i], tuple(colors[i*4:i*4 + 4])) for i in range(stop_count))
+    # padded slots repeat the last stop
+    stops += [stops[-1]] * (len(color_inputs) - stop_count)
 
-    node_group = instantiate_node_group(
-        node_group, node_group_type, node_group_name, node_tree)
+    inputs = node_group.inputs
+    for (position, color), color_index, position_index in zip(stops, color_inputs, position_inputs):
+        inputs[color_index].default_value = color
+        inputs[position_index].default_value = position
 
-    return node_group
+    return True
 
 
-def get_mix_node_indices():
+def get_fusion_key(color_ramp, node_tree, interpolation_type):
     """
-    Get the indices of the color1, color2, factor and output sockets of a mix node.
-    Newer blender versions might have a different order or/and number of sockets.
-    Using indices instead of names to avoid issues.
-    :return: Indices for mix node sockets
-    :rtype: int, int, str, int
+    Get the key of the color ramps that can be fused into one node group:
+    color ramps driven by the same socket with the same stop positions and settings
+
+    :param color_ramp: The color ramp to get the key of
+    :type color_ramp: [bpy.types.ShaderNodeValToRGB, bpy.types.CompositeNodeValToRGB]
+    :param node_tree: The node tree the color ramp is in
+    :type node_tree: bpy.types.NodeTree
+    :param interpolation_type: The interpolation type of the map range nodes for non-constant color ramps
+    :type interpolation_type: str in ['LINEAR', 'STEPPED', 'SMOOTHSTEP', 'SMOOTHERSTEP']
+    :return: The key, None if the color ramp can't be fused
+    :rtype: tuple or None
     """
+    # the same socket as auto_link_node_group links to the node group's factor
+    if not color_ramp.inputs[0].is_linked:
+        return None
 
-    active_node_tree = bpy.context.space_data.edit_tree
+    layout, map_range_interpolation = get_conversion_layout(
+        color_ramp, node_tree, interpolation_type)
+    if layout != 'MAP_RANGE':
+        return None
 
-    # handle new mix node in newer blender versions
-    # except in compositor
-    is_compositor_node_tree = active_node_tree.bl_idname == 'CompositorNodeTree'
-    
-    
-    # starting with Blender 5.0, Compositor node trees use the same Mix node implementation as Shader node trees.
-    if is_compositor_node_tree and bpy.app.version >= (5, 0, 0):
-        color1 = 'A'
-        color2 = 'B'
-        factor = 'Factor'
-        output = 'Result'
-        
-        return color1, color2, factor, output
+    from_socket = color_ramp.inputs[0].links[0].from_socket
+    ramp = color_ramp.color_ramp
+    return (from_socket.node.name, from_socket.identifier, map_range_interpolation,
+            ramp.color_mode, ramp.interpolation, ramp.hue_interpolation,
+            tuple(element.position for element in ramp.elements))
 
-    if not is_compositor_node_tree and bpy.app.version >= (3, 6, 0):
-        color1 = 6
-        color2 = 7
-        factor = 'Factor'
-        output = 2
 
-        return color1, color2, factor, output
+def get_fused_color_ramp_groups(color_ramps, node_tree, interpolation_type):
+    """
+    Group the color ramps that can be fused into one node group (see get_fusion_key)
+
+    :param color_ramps: The color ramps to group
+    :type color_ramps: list of [bpy.types.ShaderNodeValToRGB, bpy.types.CompositeNodeValToRGB]
+    :param node_tree: The node tree the color ramps are in
+    :type node_tree: bpy.types.NodeTree
+    :param interpolation_type: The interpolation type of the map range nodes for non-constant color ramps
+    :type interpolation_type: str in ['LINEAR', 'STEPPED', 'SMOOTHSTEP', 'SMOOTHERSTEP']
+    :return: The groups of color ramps in their original order, color ramps that can't be fused are alone
+    :rtype: list of lists of [bpy.types.ShaderNodeValToRGB, bpy.types.CompositeNodeValToRGB]
+    """
+    color_ramp_groups = []
+    groups_by_key = {}
+    for color_ramp in color_ramps:
+        key = get_fusion_key(color_ramp, node_tree, interpolation_type)
+        if key is None:
+            color_ramp_groups.append([color_ramp])
+        elif key in groups_by_key:
+            groups_by_key[key].append(color_ramp)
+        else:
+            groups_by_key[key] = [color_ramp]
+            color_ramp_groups.append(groups_by_key[key])
+
+    return color_ramp_groups
+
+
+def build_fused_node_tree(node_group_name, node_tree, color_ramps, interpolation_type):
+    """
+    Build the node tree of a custom node group from color ramps with the same stop positions
+    (see get_fusion_key), without changing the node tree the color ramps are in.
+    The map range nodes are shared, each color ramp gets its own mix nodes and color output
+
+    :param node_group_name: The name of the node tree to build
+    :type node_group_name: str
+    :param node_tree: The node tree the node group will be used in
+    :type node_tree: bpy.types.NodeTree
+    :param color_ramps: The color ramps to build the node tree from
+    :type color_ramps: list of [bpy.types.ShaderNodeValToRGB, bpy.types.CompositeNodeValToRGB]
+    :param interpolation_type: The interpolation type of the map range nodes in the custom node group
+    :type interpolation_type: str in ['LINEAR', 'STEPPED', 'SMOOTHSTEP', 'SMOOTHERSTEP']
+    :return: The built (detached) node tree
+    :rtype: bpy.types.NodeTree
+    """
+    node_tree_type = get_node_type(node_tree)
+    node_group_type = get_node_group_type(node_tree)
+    color_ramp_elements = color_ramps[0].color_ramp.elements
+    color_count = len(color_ramp_elements)
+    output_count = len(color_ramps)
+
+    existing_node_group = bpy.data.node_groups.get(node_group_name)
+    with contextlib.suppress(Exception):
+        bpy.data.node_groups.remove(existing_node_group, do_unlink=False)
+
+    node_group = bpy.data.node_groups.new(
+        node_group_name, f'{node_group_type}NodeTree')
+
+    # mix node indices
+    color1_index, color2_index, factor_index, output_index = get_mix_node_indices(node_group)
+
+    # inputs are Fac, a Pos input for each stop, a Color input for each stop and color ramp,
+    # then To Min and To Max
+    create_node_group_input(node_group, 'NodeSocketFloat',
+                            'Fac', color_ramps[0].inputs[0].default_value)
+    for i, element in enumerate(color_ramp_elements):
+        create_node_group_input(node_group, 'NodeSocketFloat', f'Pos{i+1}', element.position)
+    for k, color_ramp in enumerate(color_ramps):
+        for i, element in enumerate(color_ramp.color_ramp.elements):
+            create_node_group_input(node_group, 'NodeSocketColor', f'Color{i+1}_{k+1}', element.color)
+    create_node_group_input(node_group, 'NodeSocketFloat', 'To Min', 0)
+    create_node_group_input(node_group, 'NodeSocketFloat', 'To Max', 1)
+
+    # a color output for each color ramp, named after it
+    for color_ramp in color_ramps:
+        create_node_group_output(node_group, 'NodeSocketColor', color_ramp.name)
+
+    node_group_input_node = node_group.nodes.new('NodeGroupInput')
+    node_group_input_node.location = (-400, 0)
+    node_group_output_node = node_group.nodes.new('NodeGroupOutput')
+    node_group_output_node.location = (400 + output_count*200, 0)
+
+    group_inputs = node_group_input_node.outputs
+    links = node_group.links
+
+    # shared map range nodes, one per segment
+    map_range_nodes = []
+    for i in range(color_count - 1):
+        map_range_node = create_node(node_group, f'{node_tree_type}NodeMapRange',
+                                     f'Map Range{i+1}', (0, -i*300))
+        set_map_range_interpolation(map_range_node, interpolation_type)
+
+        # set steps to a near zero value to achieve constant interpolation with map range node when using stepped interpolation
+        if interpolation_type == 'STEPPED':
+            map_range_node.inputs[5].default_value = 0.0001
+
+        links.new(group_inputs['Fac'], map_range_node.inputs[0])
+        links.new(group_inputs[f'Pos{i+1}'], map_range_node.inputs[1])
+        links.new(group_inputs[f'Pos{i+2}'], map_range_node.inputs[2])
+        links.new(group_inputs['To Min'], map_range_node.inputs['To Min'])
+        links.new(group_inputs['To Max'], map_range_node.inputs['To Max'])
+        map_range_nodes.append(map_range_node)
+
+    # a chain of mix nodes for each color ramp, mixing with the shared factors
+    for k in range(output_count):
+        mix_rgb_nodes = [create_node(node_group, f'{node_tree_type}NodeMixRGB',
+                                     f'Mix{i+1}_{k+1}', (200 + k*200, -i*300))
+                         for i in range(color_count - 1)]
+
+        for i, mix_rgb_node in enumerate(mix_rgb_nodes):
+            links.new(map_range_nodes[i].outputs[0], mix_rgb_node.inputs[factor_index])
+            links.new(group_inputs[f'Color{i+1}_{k+1}'], mix_rgb_node.inputs[color1_index])
+            if i + 1 < len(mix_rgb_nodes):
+                links.new(mix_rgb_nodes[i+1].outputs[output_index], mix_rgb_node.inputs[color2_index])
+            else:
+                links.new(group_inputs[f'Color{i+2}_{k+1}'], mix_rgb_node.inputs[color2_index])
+
+        links.new(mix_rgb_nodes[0].outputs[output_index], node_group_output_node.inputs[k])
+
+    set_converted_metadata(node_group, 'FUSED', color_ramps[0].color_ramp, interpolation_type,
+                           color_inputs=[1 + color_count + k*color_count + i
+                                         for k in range(output_count) for i in range(color_count)],
+                           position_inputs=[1 + i for i in range(color_count)],
+                           output_count=output_count)
+
+    return node_group
+
+
+def build_compare_node_tree(node_group_name, node_tree, ramp_data, capacity=0):
+    """
+    Build the node tree of a constant interpolation node group from a ramp definition.
+    A greater than math node per segment compares the factor with the position of the next stop
+    and selects the color of a mix node, the positions are inputs like in build_node_tree.
+    Stop positions equal to the factor select the stop, like the color ramp
+
+    :param node_group_name: The name of the node tree to build
+    :type node_group_name: str
+    :param node_tree: The node tree the node group will be used in
+    :type node_tree: bpy.types.NodeTree
+    :param ramp_data: The ramp definition to build the node tree from, stops in ascending order
+        (see get_color_ramp_data)
+    :type ramp_data: dict
+    :param capacity: The number of stop slots, 0 for exactly as many as the ramp has stops, defaults to 0
+    :type capacity: int, optional
+    :return: The built (detached) node tree
+    :rtype: bpy.types.NodeTree
+    """
+    node_tree_type = get_node_type(node_tree)
+    node_group_type = get_node_group_type(node_tree)
+    positions = ramp_data['positions']
+    colors = ramp_data['colors']
+    stop_count = len(positions)
+    color_count = get_node_group_capacity(stop_count, capacity)
+
+    existing_node_group = bpy.data.node_groups.get(node_group_name)
+    with contextlib.suppress(Exception):
+        bpy.data.node_groups.remove(existing_node_group, do_unlink=False)
+
+    node_group = bpy.data.node_groups.new(
+        node_group_name, f'{node_group_type}NodeTree')
+
+    # mix node indices
+    color1_index, color2_index, factor_index, output_index = get_mix_node_indices(node_group)
+
+    # inputs are Fac, then a Color and Pos input for each stop
+    create_node_group_input(node_group, 'NodeSocketFloat', 'Fac', ramp_data['fac'])
+    for i in range(color_count):
+        # padded slots repeat the last stop
+        stop_index = min(i, stop_count - 1)
+        create_node_group_input(node_group, 'NodeSocketColor', f'Color{i+1}',
+                                colors[stop_index*4:stop_index*4 + 4])
+        create_node_group_input(node_group, 'NodeSocketFloat', f'Pos{i+1}', positions[stop_index])
+    create_node_group_output(node_group, 'NodeSocketColor', 'Color')
+
+    node_group_input_node = node_group.nodes.new('NodeGroupInput')
+    node_group_input_node.location = (-400, 0)
+    node_group_output_node = node_group.nodes.new('NodeGroupOutput')
+    node_group_output_node.location = (400, 0)
+
+    group_inputs = node_group_input_node.outputs
+    links = node_group.links
+
+    mix_rgb_nodes = []
+    for i in range(color_count - 1):
+        # 1 while the factor is before the next stop (Pos > Fac), keeping this stop's color
+        compare_node = create_node(node_group, f'{node_tree_type}NodeMath',
+                                   f'Compare{i+1}', (0, -i*300))
+        compare_node.operation = 'GREATER_THAN'
+        links.new(group_inputs[f'Pos{i+2}'], compare_node.inputs[0])
+        links.new(group_inputs['Fac'], compare_node.inputs[1])
+
+        mix_rgb_node = create_node(node_group, f'{node_tree_type}NodeMixRGB',
+                                   f'Mix{i+1}', (200, -i*300))
+        links.new(compare_node.outputs[0], mix_rgb_node.inputs[factor_index])
+        links.new(group_inputs[f'Color{i+1}'], mix_rgb_node.inputs[color2_index])
+        mix_rgb_nodes.append(mix_rgb_node)
+
+    # the color of the next stops, or of the last stop
+    for i, mix_rgb_node in enumerate(mix_rgb_nodes):
+        if i + 1 < len(mix_rgb_nodes):
+            links.new(mix_rgb_nodes[i+1].outputs[output_index], mix_rgb_node.inputs[color1_index])
+        else:
+            links.new(group_inputs[f'Color{i+2}'], mix_rgb_node.inputs[color1_index])
+
+    links.new(mix_rgb_nodes[0].outputs[output_index], node_group_output_node.inputs[0])
+
+    set_converted_metadata(node_group, 'COMPARE', ramp_data, 'LINEAR',
+                           color_inputs=[1 + i*2 for i in range(color_count)],
+                           position_inputs=[2 + i*2 for i in range(color_count)],
+                           stop_count=stop_count)
+
+    return node_group
+
+
+def create_node_group_v2(node_group_name, node_tree, color_ramp):
+    """
+    Create a custom node group from a color ramp
+
+    :param node_group_name: The name of the node group to create
+    :type node_group_name: str
+    :param node_tree: The node tree to create the node group in
+    :type node_tree: bpy.types.NodeTree
+    :param color_ramp: The color ramp to create the node group from
+    :type color_ramp: [bpy.types.ShaderNodeValToRGB, bpy.types.CompositeNodeValToRGB]
+    :return: The created node group
+    :rtype: bpy.types.NodeGroup
+    """
+    converted_node_tree = build_node_tree_v2(node_group_name, node_tree, color_ramp)
+    node_group = instantiate_node_group(
+        converted_node_tree, get_node_group_type(node_tree), node_group_name, node_tree)
+    set_converted_node_group_settings(node_group, color_ramp)
+    return node_group
+
+
+def build_node_tree_v2(node_group_name, node_tree, color_ramp):
+    """
+    Build the node tree of a custom node group from a color ramp (legacy constant interpolation setup),
+    without changing the node tree the color ramp is in
+
+    :param node_group_name: The name of the node tree to build
+    :type node_group_name: str
+    :param node_tree: The node tree the node group will be used in
+    :type node_tree: bpy.types.NodeTree
+    :param color_ramp: The color ramp to build the node tree from
+    :type color_ramp: [bpy.types.ShaderNodeValToRGB, bpy.types.CompositeNodeValToRGB]
+    :return: The built (detached) node tree
+    :rtype: bpy.types.NodeTree
+    """
+    node_tree_type = get_node_type(node_tree)
+    node_group_type = get_node_group_type(node_tree)
+    color_ramp_elements = color_ramp.color_ramp.elements
+    color_count = len(color_ramp_elements)
+
+    value_nodes = []
+    color_ramp_nodes = []
+    mix_rgb_nodes = []
+
+    # mix node indices
+    color1_index, color2_index, _, _ = get_mix_node_indices(node_tree)
+
+    existing_node_group = bpy.data.node_groups.get(node_group_name)
+    with contextlib.suppress(Exception):
+        bpy.data.node_groups.remove(existing_node_group, do_unlink=False)
+
+    node_group = bpy.data.node_groups.new(
+        node_group_name, f'{node_group_type}NodeTree')
+
+    # add fac input to node group
+    create_node_group_input(node_group, 'NodeSocketFloat',
+                            'Fac', color_ramp.inputs[0].default_value)
+
+    # add group input node
+    node_group_input_node = node_group.nodes.new('NodeGroupInput')
+    node_group_input_node.location = (-400, 0)
+
+    # add group output node
+    node_group_output_node = node_group.nodes.new('NodeGroupOutput')
+    node_group_output_node.location = (400, 0)
+
+    # add color input to group output node
+    # check blender version
+    if bpy.app.version < (4, 0, 0):
+        node_group.outputs.new('NodeSocketColor', 'Color')
+    else:
+        # blender 4.0 and above
+        node_group.interface.new_socket(
+            name='Color', socket_type='NodeSocketColor', in_out='OUTPUT')
+
+    # create nodes
+    for i in range(color_count):
+        # add colors of color stops as inputs to node group
+
+        # check blender version
+        if bpy.app.version < (4, 0, 0):
+            color_input = node_group.inputs.new(
+                'NodeSocketColor', f'Color{i+1}')
+        else:
+            # blender 4.0 and above
+            color_input = node_group.interface.new_socket(
+                socket_type='NodeSocketColor', name=f'Color{i+1}', in_out='INPUT')
+
+        color_input.default_value = color_ramp_elements[i].color
+
+        # need one less from these nodes
+        if i+1 < color_count:
+
+            # add color ramp nodes
+            new_color_ramp = create_node(node_group, f'{node_tree_type}NodeValToRGB',
+                                         f'Color Ramp{i+1}', (-150, -i*300))
+
+            copy_base_color_ramp(color_ramp, new_color_ramp)
+            color_ramp_nodes.append(new_color_ramp)
+
+            color_stop_left = color_ramp.color_ramp.elements[0]
+            color_stop_right = color_ramp.color_ramp.elements[i+1]
+            color_stop_current = color_ramp.color_ramp.elements[i]
+
+            new_color_ramp.color_ramp.elements[0].position = color_stop_left.position
+            new_color_ramp.color_ramp.elements[1].position = color_stop_right.position
+
+            """ if i == 0:
+                create_driver(new_color_ramp, node_group,
+                              ramp_element_index=0, input_name='Pos1')
+            else:
+
+                create_driver(new_color_ramp, node_group,
+                              ramp_element_index=1, input_name=f'Pos{i+2}') """
+
+            # add mix rgb nodes
+            mix_rgb_node = create_node(node_group, f'{node_tree_type}NodeMixRGB',
+                                       f'Mix{i+1}', (200, -i*300))
+
+            # set mix rgb node's first color
+            color = color_stop_current.color
+
+            # have to set RGB values separately because of RGB and RGBA list size
+            mix_rgb_node.inputs[color1_index].default_value[0] = color[0]
+            mix_rgb_node.inputs[color1_index].default_value[1] = color[1]
+            mix_rgb_node.inputs[color1_index].default_value[2] = color[2]
+
+            mix_rgb_nodes.append(mix_rgb_node)
+
+    # set last mix rgb node's second color
+    color = color_ramp.color_ramp.elements[-1].color
+
+    # have to set RGB values separately because of RGB and RGBA list size
+    mix_rgb_nodes[-1].inputs[color2_index].default_value[0] = color[0]
+    mix_rgb_nodes[-1].inputs[color2_index].default_value[1] = color[1]
+    mix_rgb_nodes[-1].inputs[color2_index].default_value[2] = color[2]
+
+    link_nodes_v2(node_group)
+
+    # inputs are Fac, then a Color input for each stop,
+    # the positions are stored in the inner color ramps
+    set_converted_metadata(node_group, 'LEGACY_CONSTANT', color_ramp.color_ramp, 'LINEAR',
+                           color_inputs=[1 + i for i in range(color_count)],
+                           position_nodes=[node.name for node in color_ramp_nodes])
+
+    return node_group
+
+
+def set_converted_node_group_settings(node_group, color_ramp):
+    """
+    Set the factor and keep the settings of the color ramp on a converted node group
+
+    :param node_group: The converted node group
+    :type node_group: bpy.types.NodeGroup
+    :param color_ramp: The color ramp the node group is converted from
+    :type color_ramp: [bpy.types.ShaderNodeValToRGB, bpy.types.CompositeNodeValToRGB]
+    """
+    node_group.inputs[0].default_value = color_ramp.inputs[0].default_value
+
+    node_group.color_mode = color_ramp.color_ramp.color_mode
+    node_group.interpolation = color_ramp.color_ramp.interpolation
+    node_group.hue_interpolation = color_ramp.color_ramp.hue_interpolation
+
+
+def get_mix_node_indices(node_tree=None):
+    """
+    Get the indices of the color1, color2, factor and output sockets of a mix node.
+    Newer blender versions might have a different order or/and number of sockets.
+    Using indices instead of names to avoid issues.
+
+    :param node_tree: The node tree the mix node is in, defaults to the edited node tree
+    :type node_tree: bpy.types.NodeTree, optional
+    :return: Indices for mix node sockets
+    :rtype: int, int, str, int
+    """
+
+    active_node_tree = node_tree or bpy.context.space_data.edit_tree
+
+    # handle new mix node in newer blender versions
+    # except in compositor
+    is_compositor_node_tree = active_node_tree.bl_idname == 'CompositorNodeTree'
+    
+    
+    # starting with Blender 5.0, Compositor node trees use the same Mix node implementation as Shader node trees.
+    if is_compositor_node_tree and bpy.app.version >= (5, 0, 0):
+        color1 = 'A'
+        color2 = 'B'
+        factor = 'Factor'
+        output = 'Result'
+        
+        return color1, color2, factor, output
+
+    if not is_compositor_node_tree and bpy.app.version >= (3, 6, 0):
+        color1 = 6
+        color2 = 7
+        factor = 'Factor'
+        output = 2
+
+        return color1, color2, factor, output
 
     color1 = 1
     color2 = 2
     factor = 'Fac'
     output = 0
 
-    return color1, color2, factor, output
+    return color1, color2, factor, output
+
+
+def copy_base_color_ramp(src_color_ramp, dest_color_ramp):
+    """
+    Copy the base properties (interpolation, color_mode) of a color ramp node to another color ramp node
+
+    :param src_color_ramp: The source color ramp node to copy from
+    :type src_color_ramp: [bpy.types.ShaderNodeValToRGB, bpy.types.CompositeNodeValToRGB]
+    :param dest_color_ramp: The destination color ramp node to copy to
+    :type dest_color_ramp: [bpy.types.ShaderNodeValToRGB, bpy.types.CompositeNodeValToRGB]
+    """
+
+    # copy fac value
+    dest_color_ramp.inputs[0].default_value = src_color_ramp.inputs[0].default_value
+
+    # copy interpolation and color mode
+    dest_color_ramp.color_ramp.color_mode = src_color_ramp.color_ramp.color_mode
+    dest_color_ramp.color_ramp.interpolation = src_color_ramp.color_ramp.interpolation
+    dest_color_ramp.color_ramp.hue_interpolation = src_color_ramp.color_ramp.hue_interpolation
+
+    """ # copy color stops
+    for i in range(color_count):
+        src_stop = src_color_ramp.color_ramp.elements[i]
+        try:
+            dst_stop = dest_color_ramp.color_ramp.elements[i]
+        except Exception:
+            dst_stop = dest_color_ramp.color_ramp.elements.new(
+                src_stop.position)
+
+        dst_stop.position = src_stop.position
+        dst_stop.color = src_stop.color """
+
+
+def get_node_tree_input_identifiers(node_tree):
+    """
+    Get the identifiers of the input sockets of a node tree's interface, in socket order
+
+    :param node_tree: The node tree to get the input identifiers of
+    :type node_tree: bpy.types.NodeTree
+    :return: The identifier of each input socket
+    :rtype: list of str
+    """
+    # check blender version
+    if bpy.app.version < (4, 0, 0):
+        return [node_input.identifier for node_input in node_tree.inputs]
+
+    # blender 4.0 and above, panels are items of the interface too
+    return [item.identifier for item in node_tree.interface.items_tree
+            if item.item_type == 'SOCKET' and item.in_out == 'INPUT']
+
+
+def set_converted_metadata(node_tree, layout, color_ramp, map_range_interpolation,
+                           color_inputs, position_inputs=(), position_nodes=(), stop_count=None,
+                           output_count=1):
+    """
+    Store the metadata record of a converted node tree as an ID property,
+    so detection and reverse conversion don't have to scan nodes and socket names.
+    The inputs are stored by the identifiers of their interface sockets, which stay the same
+    when the sockets are reordered or renamed
+
+    :param node_tree: The converted node tree
+    :type node_tree: bpy.types.NodeTree
+    :param layout: The layout of the converted node tree
+    :type layout: str in ['MAP_RANGE', 'COMPARE', 'LEGACY_CONSTANT', 'FUSED']
+    :param color_ramp: The color ramp (or ramp definition, see get_color_ramp_data) the node tree is converted from
+    :type color_ramp: bpy.types.ColorRamp or dict
+    :param map_range_interpolation: The interpolation type of the map range nodes
+    :type map_range_interpolation: str in ['LINEAR', 'STEPPED', 'SMOOTHSTEP', 'SMOOTHERSTEP']
+    :param color_inputs: The input index of each stop's color, in the order the inputs were created
+    :type color_inputs: list of int
+    :param position_inputs: The input index of each stop's position, in the order the inputs were created,
+        defaults to ()
+    :type position_inputs: list of int, optional
+    :param position_nodes: The names of the inner color ramps holding the positions, defaults to ()
+    :type position_nodes: list of str, optional
+    :param stop_count: The number of stops the node tree was built with if it has padded slots,
+        defaults to None. The stops in use are counted per node group (see get_active_stop_count)
+    :type stop_count: int, optional
+    :param output_count: The number of color outputs (fused color ramps), defaults to 1
+    :type output_count: int, optional
+    """
+    if isinstance(color_ramp, dict):
+        settings = color_ramp
+    else:
+        settings = {key: getattr(color_ramp, key)
+                    for key in ('color_mode', 'interpolation', 'hue_interpolation')}
+
+    identifiers = get_node_tree_input_identifiers(node_tree)
+
+    metadata = {
+        'version': CONVERTED_METADATA_VERSION,
+        'layout': layout,
+        'stop_count': len(color_inputs) // output_count if stop_count is None else stop_count,
+        'color_mode': settings['color_mode'],
+        'interpolation': settings['interpolation'],
+        'hue_interpolation': settings['hue_interpolation'],
+        'map_range_interpolation': map_range_interpolation,
+        'fac_input': identifiers[0],
+        'color_inputs': [identifiers[index] for index in color_inputs],
+    }
+
+    # the stops of these layouts can be changed through the inputs, up to the number of slots
+    if layout in ['MAP_RANGE', 'COMPARE']:
+        metadata['capacity'] = len(color_inputs)
+    if output_count > 1:
+        metadata['output_count'] = output_count
+
+    # empty lists are left out, ID properties can't tell their type
+    if position_inputs:
+        metadata['position_inputs'] = [identifiers[index] for index in position_inputs]
+    if position_nodes:
+        metadata['position_nodes'] = list(position_nodes)
+
+    node_tree[CONVERTED_METADATA_KEY] = metadata
+
+
+def has_converted_metadata(node_tree):
+    """
+    Check if a node tree carries the metadata record of a converted node tree
+
+    :param node_tree: The node tree to check
+    :type node_tree: bpy.types.NodeTree or None
+    :return: Returns True if the node tree has a metadata record, False otherwise
+    :rtype: bool
+    """
+    return node_tree is not None and CONVERTED_METADATA_KEY in node_tree
+
+
+def infer_converted_metadata(node_group):
+    """
+    Rebuild the metadata record of a node group converted with an older version,
+    or with sockets edited by hand, by scanning its sockets and inner nodes
+
+    :param node_group: The converted node group
+    :type node_group: bpy.types.NodeGroup
+    :return: The metadata record (see set_converted_metadata)
+    :rtype: dict
+    """
+    nodes = node_group.node_tree.nodes
+    color_ramp_nodes = [node for node in nodes if is_color_ramp(node)]
+
+    color_inputs = []
+    position_inputs = []
+    for index, node_input in enumerate(node_group.inputs):
+        if index == 0:
+            continue
+        if node_input.name.startswith('Color'):
+            color_inputs.append(index)
+        elif node_input.name.startswith('Pos'):
+            position_inputs.append(index)
+
+    metadata = {
+        'version': 0,
+        'stop_count': len(color_inputs),
+        'fac_input': 0,
+        'color_inputs': color_inputs,
+    }
+
+    if color_ramp_nodes:
+        # constant interpolation node groups (legacy) store the positions in the color ramps
+        base_color_ramp = color_ramp_nodes[0].color_ramp
+        metadata.update({
+            'layout': 'LEGACY_CONSTANT',
+            'color_mode': base_color_ramp.color_mode,
+            'interpolation': base_color_ramp.interpolation,
+            'hue_interpolation': base_color_ramp.hue_interpolation,
+            'map_range_interpolation': 'LINEAR',
+            'position_nodes': [node.name for node in color_ramp_nodes],
+        })
+    else:
+        map_range_node = next((node for node in nodes if is_map_range(node)), None)
+        if map_range_node is None:
+            # compare node groups select the colors with math nodes
+            layout = 'COMPARE'
+        elif position_inputs and len(color_inputs) > len(position_inputs):
+            # fused node groups have a color input per stop for each output (Color1_1, Color2_1, ...)
+            layout = 'FUSED'
+            metadata['output_count'] = len(color_inputs) // len(position_inputs)
+            metadata['stop_count'] = len(position_inputs)
+        else:
+            layout = 'MAP_RANGE'
+
+        metadata.update({
+            'layout': layout,
+            'color_mode': node_group.color_mode,
+            'interpolation': node_group.interpolation,
+            'hue_interpolation': node_group.hue_interpolation,
+            'map_range_interpolation': getattr(map_range_node, 'interpolation_type', 'LINEAR'),
+            'position_inputs': position_inputs,
+        })
+
+    return metadata
+
+
+def get_converted_metadata(node_group):
+    """
+    Get the metadata record of a converted node group, with the socket identifiers
+    resolved to the input indices of the node group.
+    Inferred from its nodes if it was converted with an older version
+
+    :param node_group: The converted node group
+    :type node_group: bpy.types.NodeGroup
+    :return: The metadata record (see set_converted_metadata)
+    :rtype: dict
+    """
+    metadata = node_group.node_tree.get(CONVERTED_METADATA_KEY)
+    if metadata is None or metadata.get('version', 0) > CONVERTED_METADATA_VERSION:
+        return infer_converted_metadata(node_group)
+
+    metadata = metadata.to_dict()
+    keys = [key for key in ('color_inputs', 'position_inputs') if key in metadata]
+
+    if metadata.get('version', 0) < 2:
+        # records of version 1 store the input indices,
+        # the sockets might have been edited by hand since the conversion
+        input_count = len(node_group.inputs)
+        if any(index >= input_count for key in keys for index in metadata[key]):
+            return infer_converted_metadata(node_group)
+        return metadata
+
+    # the sockets might have been reordered or removed by hand since the conversion
+    input_indices = {node_input.identifier: index for index, node_input in enumerate(node_group.inputs)}
+    try:
+        metadata['fac_input'] = input_indices[metadata['fac_input']]
+        for key in keys:
+            metadata[key] = [input_indices[identifier] for identifier in metadata[key]]
+    except KeyError:
+        return infer_converted_metadata(node_group)
+
+    return metadata
+
+
+def get_color_ramp_data(node, output_index=0):
+    """
+    Get the stops and settings of a color ramp node or a converted node group
+
+    :param node: The color ramp node, converted or baked node group to read the stops from
+    :type node: [bpy.types.ShaderNodeValToRGB, bpy.types.CompositeNodeValToRGB, bpy.types.NodeGroup]
+    :param output_index: The output of a fused node group to read the stops of, defaults to 0
+    :type output_index: int, optional
+    :return: Ramp definition with 'positions' (N floats), 'colors' (N*4 floats),
+        'color_mode', 'interpolation', 'hue_interpolation' and 'fac' keys
+    :rtype: dict
+    """
+    if is_baked_lut(node):
+        # baked node groups keep the ramp definition they were baked from
+        ramp_data = node.node_tree['color_ramp_data'].to_dict()
+        ramp_data['fac'] = node.inputs[0].default_value
+        return ramp_data
+
+    if is_osl_ramp(node):
+        # as do the scripts of OSL script nodes
+        ramp_data = node.script['color_ramp_data'].to_dict()
+        ramp_data['fac'] = node.inputs[0].default_value
+        return ramp_data
+
+    if is_color_ramp(node):
+        color_ramp = node.color_ramp
+        elements = color_ramp.elements
+        color_count = len(elements)
+
+        # read all stops at once instead of element by element
+        positions = [0.0] * color_count
+        colors = [0.0] * (color_count * 4)
+        elements.foreach_get('position', positions)
+        elements.foreach_get('color', colors)
+
+        return {
+            'positions': positions,
+            'colors': colors,
+            'color_mode': color_ramp.color_mode,
+            'interpolation': color_ramp.interpolation,
+            'hue_interpolation': color_ramp.hue_interpolation,
+            'fac': node.inputs[0].default_value,
+        }
+
+    metadata = get_converted_metadata(node)
+    inputs = node.inputs
+
+    # padded slots are left out
+    color_inputs = get_output_color_inputs(node, output_index, metadata)
+    if 'position_inputs' in metadata:
+        del metadata['position_inputs'][len(color_inputs):]
+
+    colors = []
+    for index in color_inputs:
+        colors.extend(inputs[index].default_value)
+
+    if metadata['layout'] == 'LEGACY_CONSTANT':
+        # constant interpolation node groups (legacy) store the positions in the color ramps
+        inner_nodes = node.node_tree.nodes
+        color_ramps = [inner_nodes[name].color_ramp for name in metadata['position_nodes']]
+        positions = [color_ramps[0].elements[0].position]
+        positions += [color_ramp.elements[1].position for color_ramp in color_ramps]
+    else:
+        positions = [inputs[index].default_value for index in metadata['position_inputs']]
+
+    return {
+        'positions': positions,
+        'colors': colors,
+        'color_mode': metadata['color_mode'],
+        'interpolation': metadata['interpolation'],
+        'hue_interpolation': metadata['hue_interpolation'],
+        'fac': inputs[metadata['fac_input']].default_value,
+    }
+
+
+def get_color_ramp_name(node):
+    """
+    Get the name of the color ramp a node was created from
+
+    :param node: The color ramp node, converted or baked node group to get the name of
+    :type node: [bpy.types.ShaderNodeValToRGB, bpy.types.CompositeNodeValToRGB, bpy.types.NodeGroup]
+    :return: The name of the color ramp
+    :rtype: str
+    """
+    if is_node_group(node):
+        return node.node_tree.name.replace('Converted', '')
+    if is_baked_lut(node):
+        return node.name.replace('Baked', '', 1)
+    if is_osl_ramp(node):
+        return node.name.replace('OSL', '', 1)
+    return node.name
+
 
+def get_all_color_ramp_data(node):
+    """
+    Get the name and ramp definition of every color ramp a node holds,
+    one for each output of a fused node group, otherwise one
 
-def copy_base_color_ramp(src_color_ramp, dest_color_ramp):
+    :param node: The color ramp node, converted or baked node group to read the stops from
+    :type node: [bpy.types.ShaderNodeValToRGB, bpy.types.CompositeNodeValToRGB, bpy.types.NodeGroup]
+    :return: The name and ramp definition (see get_color_ramp_data) of each color ramp
+    :rtype: list of tuples (str, dict)
     """
-    Copy the base properties (interpolation, color_mode) of a color ramp node to another color ramp node
+    if is_fused_node_group(node):
+        # the outputs are named after the fused color ramps
+        return [(output.name, get_color_ramp_data(node, output_index))
+                for output_index, output in enumerate(node.outputs)]
 
-    :param src_color_ramp: The source color ramp node to copy from
-    :type src_color_ramp: [bpy.types.ShaderNodeValToRGB, bpy.types.CompositeNodeValToRGB]
-    :param dest_color_ramp: The destination color ramp node to copy to
-    :type dest_color_ramp: [bpy.types.ShaderNodeValToRGB, bpy.types.CompositeNodeValToRGB]
+    return [(get_color_ramp_name(node), get_color_ramp_data(node))]
+
+
+def get_color_ramp_data_hash(ramp_data):
     """
+    Get a content hash of a ramp definition, identical ramps share the same hash
 
-    # copy fac value
-    dest_color_ramp.inputs[0].default_value = src_color_ramp.inputs[0].default_value
+    :param ramp_data: The ramp definition to hash (see get_color_ramp_data)
+    :type ramp_data: dict
+    :return: Hexadecimal digest of the ramp definition
+    :rtype: str
+    """
+    positions = ramp_data['positions']
+    colors = ramp_data['colors']
 
-    # copy interpolation and color mode
-    dest_color_ramp.color_ramp.color_mode = src_color_ramp.color_ramp.color_mode
-    dest_color_ramp.color_ramp.interpolation = src_color_ramp.color_ramp.interpolation
-    dest_color_ramp.color_ramp.hue_interpolation = src_color_ramp.color_ramp.hue_interpolation
+    hasher = hashlib.sha1()
+    hasher.update(
+        f"{ramp_data['color_mode']}|{ramp_data['interpolation']}|{ramp_data['hue_interpolation']}".encode())
+    # pack as 32 bit floats, the same precision blender stores the stops with
+    hasher.update(struct.pack(f'<{len(positions)}f', *positions))
+    hasher.update(struct.pack(f'<{len(colors)}f', *colors))
+    return hasher.hexdigest()
 
-    """ # copy color stops
-    for i in range(color_count):
-        src_stop = src_color_ramp.color_ramp.elements[i]
-        try:
-            dst_stop = dest_color_ramp.color_ramp.elements[i]
-        except Exception:
-            dst_stop = dest_color_ramp.color_ramp.elements.new(
-                src_stop.position)
 
-        dst_stop.position = src_stop.position
-        dst_stop.color = src_stop.color """
+def set_color_ramp_stops(color_ramp_node, positions, colors):
+    """
+    Set all stops of a color ramp node, adding or removing color stops as needed
+
+    :param color_ramp_node: The color ramp node to set the stops of
+    :type color_ramp_node: [bpy.types.ShaderNodeValToRGB, bpy.types.CompositeNodeValToRGB]
+    :param positions: Positions of the color stops in ascending order
+    :type positions: list of float
+    :param colors: Flat RGBA colors of the color stops (4 floats per stop)
+    :type colors: list of float
+    """
+    elements = color_ramp_node.color_ramp.elements
+    color_count = len(positions)
+
+    while len(elements) > color_count:
+        elements.remove(elements[-1])
+    while len(elements) < color_count:
+        elements.new(positions[len(elements)])
+
+    # write all stops at once instead of element by element
+    elements.foreach_set('position', list(positions))
+    elements.foreach_set('color', list(colors))
+
+
+def apply_color_ramp_data(color_ramp_node, ramp_data):
+    """
+    Apply a ramp definition (stops and settings) to a color ramp node
+
+    :param color_ramp_node: The color ramp node to apply the definition to
+    :type color_ramp_node: [bpy.types.ShaderNodeValToRGB, bpy.types.CompositeNodeValToRGB]
+    :param ramp_data: The ramp definition to apply (see get_color_ramp_data)
+    :type ramp_data: dict
+    """
+    color_ramp = color_ramp_node.color_ramp
+    color_ramp.color_mode = ramp_data['color_mode']
+    color_ramp.interpolation = ramp_data['interpolation']
+    color_ramp.hue_interpolation = ramp_data['hue_interpolation']
+
+    set_color_ramp_stops(
+        color_ramp_node, ramp_data['positions'], ramp_data['colors'])
 
 
 def create_driver(color_ramp_node, node_group, ramp_element_index, input_name):
@@ -1109,6 +2157,170 @@ def create_driver(color_ramp_node, node_group, ramp_element_index, input_name):
     driver.expression = 'var'
 
 
+def get_fcurves(id_data):
+    """
+    Get the F-curves of the action assigned to a datablock
+
+    :param id_data: The datablock, e.g. a node tree
+    :type id_data: bpy.types.ID
+    :return: The F-curves of the assigned action (slot), None if the datablock isn't animated
+    :rtype: bpy.types.ActionFCurves or bpy.types.ActionChannelbagFCurves or None
+    """
+    animation_data = id_data.animation_data
+    if animation_data is None or animation_data.action is None:
+        return None
+
+    action = animation_data.action
+    # check blender version
+    if bpy.app.version < (4, 4, 0):
+        return action.fcurves
+
+    # blender 4.4 and above, slotted actions: the channelbag of the slot the datablock is animated by,
+    # the action can hold the channels of other datablocks too
+    action_slot = animation_data.action_slot
+    if action_slot is None:
+        return None
+    for layer in action.layers:
+        for strip in layer.strips:
+            for channelbag in strip.channelbags:
+                if channelbag.slot_handle == action_slot.handle:
+                    return channelbag.fcurves
+    return None
+
+
+def get_stop_data_paths(node, output_index=0):
+    """
+    Get the animatable data paths of the factor and the color stops of a node
+
+    :param node: The color ramp, converted or baked node group
+    :type node: bpy.types.Node
+    :param output_index: The output of a fused node group to get the color stops of, defaults to 0
+    :type output_index: int, optional
+    :return: The data path of the factor and the color and position data paths of each stop,
+        position data paths are None when the positions are not sockets of the node
+    :rtype: tuple (str, list of tuples (str, str or None))
+    """
+    node_path = f'nodes["{bpy.utils.escape_identifier(node.name)}"]'
+
+    if is_color_ramp(node):
+        stop_paths = [(f'{node_path}.color_ramp.elements[{i}].color',
+                       f'{node_path}.color_ramp.elements[{i}].position')
+                      for i in range(len(node.color_ramp.elements))]
+        return f'{node_path}.inputs[0].default_value', stop_paths
+
+    if is_baked_lut(node) or is_osl_ramp(node):
+        # the stops are baked in the lookup texture or the script
+        return f'{node_path}.inputs[0].default_value', []
+
+    metadata = get_converted_metadata(node)
+    color_inputs = get_output_color_inputs(node, output_index, metadata)
+    # legacy node groups store the positions in the color ramps of the (shared) node tree
+    position_inputs = metadata.get('position_inputs') or [None] * len(color_inputs)
+
+    stop_paths = [(f'{node_path}.inputs[{color_input}].default_value',
+                   None if position_input is None else f'{node_path}.inputs[{position_input}].default_value')
+                  for color_input, position_input in zip(color_inputs, position_inputs)]
+    return f'{node_path}.inputs[{metadata["fac_input"]}].default_value', stop_paths
+
+
+def retarget_fcurves(id_data, data_path_map):
+    """
+    Move F-curves to other data paths. The keyframes, handles and modifiers are kept as they are,
+    only the data path of each F-curve changes
+
+    :param id_data: The animated datablock, e.g. a node tree
+    :type id_data: bpy.types.ID
+    :param data_path_map: The new data path for each data path to move
+    :type data_path_map: dict of str -> str
+    :return: The number of moved F-curves
+    :rtype: int
+    """
+    fcurves = get_fcurves(id_data)
+    if not fcurves:
+        return 0
+
+    moved_count = 0
+    for fcurve in fcurves:
+        data_path = data_path_map.get(fcurve.data_path)
+        if data_path is not None:
+            fcurve.data_path = data_path
+            moved_count += 1
+    return moved_count
+
+
+def transfer_stop_animation(source_node, target_node, node_tree, output_index=0):
+    """
+    Move the animation of the factor and the color stops from one node to its replacement,
+    e.g. from a color ramp to the converted node group and back.
+    Must be called before the source node is removed, removing a node removes its animation
+
+    :param source_node: The node to move the animation from
+    :type source_node: bpy.types.Node
+    :param target_node: The node to move the animation to
+    :type target_node: bpy.types.Node
+    :param node_tree: The node tree both nodes are in
+    :type node_tree: bpy.types.NodeTree
+    :param output_index: The output of the fused node group on either side the color stops belong to,
+        defaults to 0
+    :type output_index: int, optional
+    :return: The number of moved F-curves and the number of F-curves the target node has no data path for,
+        they are removed with the source node
+    :rtype: tuple (int, int)
+    """
+    if node_tree.animation_data is None:
+        return 0, 0
+
+    source_fac_path, source_stop_paths = get_stop_data_paths(source_node, output_index)
+    target_fac_path, target_stop_paths = get_stop_data_paths(target_node, output_index)
+
+    # the factor of a fused node group is shared, it moves with the first output
+    data_path_map = {source_fac_path: target_fac_path} if output_index == 0 else {}
+    lost_paths = set()
+    for index, (source_color_path, source_position_path) in enumerate(source_stop_paths):
+        if index >= len(target_stop_paths):
+            # the stops are baked in the target
+            lost_paths.update(path for path in (source_color_path, source_position_path) if path is not None)
+            continue
+
+        target_color_path, target_position_path = target_stop_paths[index]
+        # colors have the same channels (RGBA) on both sides, array indices stay the same
+        data_path_map[source_color_path] = target_color_path
+        if source_position_path is None:
+            continue
+        if target_position_path is None:
+            # legacy constant node groups keep the positions in the color ramps of their node tree
+            lost_paths.add(source_position_path)
+        else:
+            data_path_map[source_position_path] = target_position_path
+
+    fcurves = get_fcurves(node_tree)
+    lost_count = sum(fcurve.data_path in lost_paths for fcurve in fcurves) if fcurves else 0
+    return retarget_fcurves(node_tree, data_path_map), lost_count
+
+
+def auto_link_replacement_node(node, active_node_tree, replacement_node):
+    """
+    Auto link a replacement node to the same sockets as the node it replaces,
+    the first input and the outputs are matched by index
+
+    :param node: The node to get the links from
+    :type node: bpy.types.Node
+    :param active_node_tree: The active node tree
+    :type active_node_tree: bpy.types.NodeTree
+    :param replacement_node: The node to recreate the links for
+    :type replacement_node: bpy.types.Node
+    """
+    # handle inputs
+    if node.inputs[0].is_linked:
+        active_node_tree.links.new(
+            node.inputs[0].links[0].from_socket, replacement_node.inputs[0])
+
+    # handle outputs
+    for output, replacement_output in zip(node.outputs, replacement_node.outputs):
+        for link in output.links:
+            active_node_tree.links.new(replacement_output, link.to_socket)
+
+
 def auto_link_node_group(color_ramp, active_node_tree, node_group):
     """
     Auto link the node group to the same node sockets as the color ramp node
@@ -1138,7 +2350,7 @@ def auto_link_node_group(color_ramp, active_node_tree, node_group):
                 node_group.outputs["Color"], to_node.inputs[to_socket_name])
 
 
-def create_extra_nodes_for_node_group(self, node_group, node_tree, node_type, with_link=True):
+def create_extra_nodes_for_node_group(self, node_group, node_tree, node_type, with_link=True, node_layout=None):
     """
     Create extra nodes for the node group
 
@@ -1150,10 +2362,13 @@ def create_extra_nodes_for_node_group(self, node_group, node_tree, node_type, wi
     :type node_type: str
     :param with_link: Create extra nodes with links to the node group, defaults to True
     :type with_link: bool, optional
+    :param node_layout: Layout of the node tree to place the extra nodes without overlaps, defaults to None
+    :type node_layout: layout.NodeLayout, optional
     """
     report = False
     node_tree_type = get_node_type(node_tree)
-    for i in range(len(node_group.inputs)):
+    # no extra nodes for padded slots
+    for i in get_all_color_inputs(node_group):
         ng_input = node_group.inputs[i]
         if ng_input.bl_idname == 'NodeSocketColor':
             node = node_tree.nodes.new(node_type)
@@ -1164,6 +2379,9 @@ def create_extra_nodes_for_node_group(self, node_group, node_tree, node_type, wi
             offset_node_location_x(
                 node, node_group.width, delta=-1)
             offset_node_location_y(node, i*node.height, delta=-1)
+            if node_layout is not None:
+                # move down from the fixed offset until there's room
+                node_layout.place(node, tuple(node.location))
 
             color_input = get_extra_node_color_input(node)
 
@@ -1181,191 +2399,476 @@ def create_extra_nodes_for_node_group(self, node_group, node_tree, node_type, wi
             {'WARNING'}, f'"{node_type} Node" has no compatible output to connect to')
 
 
-def convert_color_ramp(self, context, color_ramp, node_tree):
+def get_conversion_layout(color_ramp, node_tree, interpolation_type):
     """
-    Convert a color ramp to a custom node group alternative
+    Get the node group layout a color ramp is converted to
 
-    :param context: context
-    :type context: bpy.context
     :param color_ramp: The color ramp to convert
     :type color_ramp: [bpy.types.ShaderNodeValToRGB, bpy.types.CompositeNodeValToRGB]
-    :param node_tree: The node tree to add the node group to
+    :param node_tree: The node tree the color ramp is in
     :type node_tree: bpy.types.NodeTree
+    :param interpolation_type: The interpolation type of the map range nodes for non-constant color ramps
+    :type interpolation_type: str in ['LINEAR', 'STEPPED', 'SMOOTHSTEP', 'SMOOTHERSTEP']
+    :return: The layout and the interpolation type of the map range nodes
+    :rtype: tuple (str in ['MAP_RANGE', 'COMPARE', 'LEGACY_CONSTANT'], str)
     """
-    scene = context.scene
     addon_prefs = get_addon_prefs()
 
-    color_ramp_location = color_ramp.location
-
-    node_group = None
-    
-    node_tree_type = get_node_group_type(node_tree)
-
     # constant interpolation
     if color_ramp.color_ramp.interpolation == 'CONSTANT':
 
-        # TODO: add support for COMPOSITOR
-        if not addon_prefs.legacy_const_ramp_conv and node_tree_type in ['Shader', 'Geometry']:
-            # with position inputs (using the same node setup as for linear interpolation),
-            # slightly different visual result
-            # due to the stepped linear interpolation applied on the Map Range nodes
-            # (steps is set to a value close to 0) 
-            node_group = create_node_group(f'Converted{color_ramp.name}', node_tree, color_ramp,
-                                       'STEPPED')
+        if not addon_prefs.legacy_const_ramp_conv:
+            # with position inputs, greater than math nodes select the colors (see build_compare_node_tree),
+            # same visual result in every node tree type
+            return 'COMPARE', 'LINEAR'
+
+        # without position inputs
+        # same visual result
+        return 'LEGACY_CONSTANT', interpolation_type
+
+    return 'MAP_RANGE', interpolation_type
+
+
+def get_converted_node_group_layout(node_group):
+    """
+    Get the layout of an existing converted node group
+
+    :param node_group: The converted node group
+    :type node_group: bpy.types.NodeGroup
+    :return: The layout and the interpolation type of the map range nodes
+    :rtype: tuple (str in ['MAP_RANGE', 'COMPARE', 'LEGACY_CONSTANT', 'FUSED'], str)
+    """
+    metadata = get_converted_metadata(node_group)
+    return metadata['layout'], metadata['map_range_interpolation']
+
+
+def verify_conversions(nodes, sample_count=1024):
+    """
+    Compare color ramps with the node groups they are (or would be) converted to,
+    and converted node groups with the color ramps they represent
+
+    :param nodes: The color ramp nodes and converted node groups to verify
+    :type nodes: list of bpy.types.Node
+    :param sample_count: The number of evenly spaced factors in [0.0, 1.0] to compare, defaults to 1024
+    :type sample_count: int, optional
+    :return: The name, layout, maximum and mean RGB error of each verified node
+    :rtype: list of tuples (str, str, float, float)
+    """
+    interpolation_type = bpy.context.scene.node_group_interpolation
+
+    results = []
+    for node in nodes:
+        if is_color_ramp(node):
+            if len(node.color_ramp.elements) < 2:
+                continue
+            layout, map_range_interpolation = get_conversion_layout(
+                node, node.id_data, interpolation_type)
+        elif is_node_group(node):
+            layout, map_range_interpolation = get_converted_node_group_layout(node)
         else:
-            # without position inputs
-            # same visual result
-            node_group = create_node_group_v2(
-                f'Converted{color_ramp.name}', node_tree, color_ramp) 
+            continue
+
+        if layout == 'FUSED':
+            # each output of a fused node group is a map range node group sharing the map range nodes
+            for output_name, ramp_data in get_all_color_ramp_data(node):
+                max_error, mean_error = evaluator.measure_conversion_error(
+                    ramp_data, 'MAP_RANGE', map_range_interpolation, sample_count)
+                results.append((f'{node.name} ({output_name})', layout, max_error, mean_error))
+            continue
+
+        max_error, mean_error = evaluator.measure_conversion_error(
+            get_color_ramp_data(node), layout, map_range_interpolation, sample_count)
+        results.append((node.name, layout, max_error, mean_error))
+
+    return results
+
+
+def load_converted_node_tree(library_dir, library_key, node_group_name, link=False):
+    """
+    Load a converted node tree from the library instead of building it
+
+    :param library_dir: The library directory
+    :type library_dir: str
+    :param library_key: The key of the library entry (see get_library_key)
+    :type library_key: str
+    :param node_group_name: The name of the node tree
+    :type node_group_name: str
+    :param link: Link the node tree from the library instead of appending it, defaults to False
+    :type link: bool, optional
+    :return: The loaded node tree, None if the library has no such entry
+    :rtype: bpy.types.NodeTree or None
+    """
+    if not link:
+        existing_node_group = bpy.data.node_groups.get(node_group_name)
+        with contextlib.suppress(Exception):
+            bpy.data.node_groups.remove(existing_node_group, do_unlink=False)
+
+    converted_node_tree = load_node_tree(library_dir, library_key, link)
+    if converted_node_tree is None:
+        return None
+
+    if not link:
+        converted_node_tree.name = node_group_name
+
+    return converted_node_tree
+
+
+def build_converted_node_tree(self, color_ramp, node_tree, interpolation_type):
+    """
+    Build (or load from the library) the node tree a color ramp is converted to.
+    The node tree the color ramp is in is not changed, see attach_converted_node_tree
 
+    :param color_ramp: The color ramp to convert
+    :type color_ramp: [bpy.types.ShaderNodeValToRGB, bpy.types.CompositeNodeValToRGB]
+    :param node_tree: The node tree the color ramp is in
+    :type node_tree: bpy.types.NodeTree
+    :param interpolation_type: The interpolation type of the map range nodes for non-constant color ramps
+    :type interpolation_type: str in ['LINEAR', 'STEPPED', 'SMOOTHSTEP', 'SMOOTHERSTEP']
+    :return: The converted node tree, None if the conversion was refused by the verification
+    :rtype: bpy.types.NodeTree or None
+    """
+    addon_prefs = get_addon_prefs()
+
+    node_group_name = f'Converted{color_ramp.name}'
+    node_tree_type = get_node_group_type(node_tree)
+
+    layout, interpolation_type = get_conversion_layout(
+        color_ramp, node_tree, interpolation_type)
+    use_v2 = layout == 'LEGACY_CONSTANT'
+
+    if addon_prefs.verify_conversions:
+        max_error, mean_error = evaluator.measure_conversion_error(
+            get_color_ramp_data(color_ramp), layout, interpolation_type)
+        if max_error > addon_prefs.max_conversion_error:
+            self.report({'WARNING'}, f'"{color_ramp.name}" was not converted, '
+                        f'max color error {max_error:.4f} (mean {mean_error:.4f})')
+            return None
+
+    # the legacy layout keeps the positions in its nodes, it can't be padded
+    capacity = 0 if use_v2 else int(addon_prefs.node_group_capacity)
+    capacity = get_node_group_capacity(len(color_ramp.color_ramp.elements), capacity)
+
+    converted_node_tree = None
+    library_key = None
+    if addon_prefs.use_library:
+        library_layout = {'LEGACY_CONSTANT': 'V2', 'COMPARE': 'COMPARE'}.get(layout, interpolation_type)
+        if capacity > len(color_ramp.color_ramp.elements):
+            library_layout = f'{library_layout}_{capacity}'
+        library_key = get_library_key(get_color_ramp_data_hash(get_color_ramp_data(color_ramp)),
+                                      node_tree_type, library_layout)
+        try:
+            library_dir = get_library_dir(addon_prefs.library_path)
+            converted_node_tree = load_converted_node_tree(
+                library_dir, library_key, node_group_name, addon_prefs.library_link)
+        except OSError:
+            # the library directory can't be used, the node tree is built without it
+            traceback.print_exc()
+            library_key = None
+
+    if converted_node_tree is not None:
+        # reused from the library
+        return converted_node_tree
+
+    if use_v2:
+        converted_node_tree = build_node_tree_v2(
+            node_group_name, node_tree, color_ramp)
+    elif layout == 'COMPARE':
+        converted_node_tree = build_compare_node_tree(
+            node_group_name, node_tree, get_color_ramp_data(color_ramp), capacity)
     else:
-        node_group = create_node_group(f'Converted{color_ramp.name}', node_tree, color_ramp,
-                                       scene.node_group_interpolation)
+        converted_node_tree = build_node_tree(node_group_name, node_tree, color_ramp,
+                                              interpolation_type, capacity)
+
+    if library_key is not None:
+        try:
+            store_node_tree(library_dir, library_key, converted_node_tree,
+                            addon_prefs.library_max_size * 1024 * 1024)
+        except OSError:
+            # the conversion itself succeeded, only the library couldn't be updated
+            traceback.print_exc()
+
+    return converted_node_tree
+
+
+def build_fused_converted_node_tree(self, color_ramps, node_tree, interpolation_type):
+    """
+    Build the node tree color ramps with the same stop positions are fused into
+    (see get_fused_color_ramp_groups). The node tree the color ramps are in is not changed,
+    see attach_fused_node_tree
+
+    :param color_ramps: The color ramps to fuse
+    :type color_ramps: list of [bpy.types.ShaderNodeValToRGB, bpy.types.CompositeNodeValToRGB]
+    :param node_tree: The node tree the color ramps are in
+    :type node_tree: bpy.types.NodeTree
+    :param interpolation_type: The interpolation type of the map range nodes for non-constant color ramps
+    :type interpolation_type: str in ['LINEAR', 'STEPPED', 'SMOOTHSTEP', 'SMOOTHERSTEP']
+    :return: The fused node tree, None if the conversion of any color ramp was refused by the verification
+    :rtype: bpy.types.NodeTree or None
+    """
+    addon_prefs = get_addon_prefs()
+
+    # the color ramps share the layout, see get_fusion_key
+    _, interpolation_type = get_conversion_layout(
+        color_ramps[0], node_tree, interpolation_type)
+
+    if addon_prefs.verify_conversions:
+        for color_ramp in color_ramps:
+            max_error, _ = evaluator.measure_conversion_error(
+                get_color_ramp_data(color_ramp), 'MAP_RANGE', interpolation_type)
+            if max_error > addon_prefs.max_conversion_error:
+                return None
+
+    return build_fused_node_tree(f'Converted{color_ramps[0].name}', node_tree, color_ramps,
+                                 interpolation_type)
+
+
+def get_extra_node_type(context, node_tree):
+    """
+    Get the type of the extra nodes created for converted node groups in a node tree
+
+    :param context: context
+    :type context: bpy.context
+    :param node_tree: The node tree to create the extra nodes in
+    :type node_tree: bpy.types.NodeTree
+    :return: The type of the extra nodes
+    :rtype: str
+    """
+    node_tree_type = get_node_group_type(node_tree)
+    if node_tree_type == 'Shader':
+        return context.scene.extra_shader_node_type
+    elif node_tree_type == 'Compositor':
+        return context.scene.extra_compositor_node_type
+    elif node_tree_type == 'Geometry':
+        return context.scene.extra_geometry_node_type
+
+
+def attach_converted_node_tree(self, context, color_ramp, node_tree, converted_node_tree, node_layout=None):
+    """
+    Replace a color ramp with a node group of its converted node tree.
+    All changes to the node tree the color ramp is in are made here
+
+    :param context: context
+    :type context: bpy.context
+    :param color_ramp: The color ramp to replace
+    :type color_ramp: [bpy.types.ShaderNodeValToRGB, bpy.types.CompositeNodeValToRGB]
+    :param node_tree: The node tree the color ramp is in
+    :type node_tree: bpy.types.NodeTree
+    :param converted_node_tree: The converted node tree (see build_converted_node_tree)
+    :type converted_node_tree: bpy.types.NodeTree
+    :param node_layout: Layout of the node tree to place the new nodes without overlaps, defaults to None
+    :type node_layout: layout.NodeLayout, optional
+    :return: The node group replacing the color ramp
+    :rtype: bpy.types.NodeGroup
+    """
+    addon_prefs = get_addon_prefs()
+    node_tree_type = get_node_group_type(node_tree)
+    color_ramp_location = color_ramp.location
+
+    node_group = instantiate_node_group(
+        converted_node_tree, node_tree_type, f'Converted{color_ramp.name}', node_tree)
+    set_converted_node_group_settings(node_group, color_ramp)
 
     auto_link_node_group(color_ramp, node_tree, node_group)
     if addon_prefs.copy_width:
         set_node_width(node_group, color_ramp.width)
 
-    set_node_location(node_group, color_ramp_location)
+    if node_layout is None:
+        set_node_location(node_group, color_ramp_location)
+    else:
+        # the node group takes the place of the color ramp
+        node_layout.remove(color_ramp.name)
+        node_layout.place(node_group, tuple(color_ramp_location))
     node_group.is_converted = True
 
+    lost_count = transfer_stop_animation(color_ramp, node_group, node_tree)[1]
+    if lost_count:
+        self.report({'WARNING'}, f'"{color_ramp.name}": the animation of {lost_count} stop position(s) '
+                                 f'was removed, the converted node group has no position inputs')
+
     # override node
     remove_node(color_ramp, node_tree)
 
 
     if addon_prefs.create_extra_nodes:
-        if node_tree_type == 'Shader':
-            extra_node_type = context.scene.extra_shader_node_type
-        elif node_tree_type == 'Compositor':
-            extra_node_type = context.scene.extra_compositor_node_type
-        elif node_tree_type == 'Geometry':
-            extra_node_type = context.scene.extra_geometry_node_type
+        create_extra_nodes_for_node_group(
+            self, node_group, node_tree, get_extra_node_type(context, node_tree), node_layout=node_layout)
+
+    node_group.select = True
+    node_tree.nodes.active = node_group
+    return node_group
+
+
+def attach_fused_node_tree(self, context, color_ramps, node_tree, converted_node_tree, node_layout=None):
+    """
+    Replace color ramps with a node group of the node tree they are fused into,
+    each color ramp's links move to its output.
+    All changes to the node tree the color ramps are in are made here
+
+    :param context: context
+    :type context: bpy.context
+    :param color_ramps: The fused color ramps to replace
+    :type color_ramps: list of [bpy.types.ShaderNodeValToRGB, bpy.types.CompositeNodeValToRGB]
+    :param node_tree: The node tree the color ramps are in
+    :type node_tree: bpy.types.NodeTree
+    :param converted_node_tree: The fused node tree (see build_fused_converted_node_tree)
+    :type converted_node_tree: bpy.types.NodeTree
+    :param node_layout: Layout of the node tree to place the new nodes without overlaps, defaults to None
+    :type node_layout: layout.NodeLayout, optional
+    :return: The node group replacing the color ramps
+    :rtype: bpy.types.NodeGroup
+    """
+    addon_prefs = get_addon_prefs()
+    node_tree_type = get_node_group_type(node_tree)
+    first_color_ramp = color_ramps[0]
+    color_ramp_location = first_color_ramp.location
+
+    node_group = instantiate_node_group(
+        converted_node_tree, node_tree_type, f'Converted{first_color_ramp.name}', node_tree)
+    set_converted_node_group_settings(node_group, first_color_ramp)
+
+    # the color ramps share the socket driving their factor
+    node_tree.links.new(first_color_ramp.inputs[0].links[0].from_socket, node_group.inputs[0])
+    for output, color_ramp in zip(node_group.outputs, color_ramps):
+        for link in list(color_ramp.outputs[0].links):
+            node_tree.links.new(output, link.to_socket)
+
+    if addon_prefs.copy_width:
+        set_node_width(node_group, first_color_ramp.width)
+
+    if node_layout is None:
+        set_node_location(node_group, color_ramp_location)
+    else:
+        # the node group takes the place of the first color ramp
+        for color_ramp in color_ramps:
+            node_layout.remove(color_ramp.name)
+        node_layout.place(node_group, tuple(color_ramp_location))
+    node_group.is_converted = True
+
+    for output_index, color_ramp in enumerate(color_ramps):
+        transfer_stop_animation(color_ramp, node_group, node_tree, output_index)
+
+    # override nodes
+    for color_ramp in color_ramps:
+        remove_node(color_ramp, node_tree)
 
+    if addon_prefs.create_extra_nodes:
         create_extra_nodes_for_node_group(
-            self, node_group, node_tree, extra_node_type)
+            self, node_group, node_tree, get_extra_node_type(context, node_tree), node_layout=node_layout)
 
     node_group.select = True
     node_tree.nodes.active = node_group
+    return node_group
 
 
-def create_color_ramp_node(name, node_tree, node_group):
+def convert_color_ramp(self, context, color_ramp, node_tree, node_layout=None):
     """
-    Create a color ramp node from converted node group
+    Convert a color ramp to a custom node group alternative
 
-    :param name: The name of the color ramp node
-    :type name: str
-    :param node_tree: The node tree to add the node to
+    :param context: context
+    :type context: bpy.context
+    :param color_ramp: The color ramp to convert
+    :type color_ramp: [bpy.types.ShaderNodeValToRGB, bpy.types.CompositeNodeValToRGB]
+    :param node_tree: The node tree to add the node group to
     :type node_tree: bpy.types.NodeTree
-    :param node_group: The node group to create the color ramp from
-    :type node_group: bpy.types.NodeGroup
-    :return: The created color ramp node
-    :rtype: [bpy.types.ShaderNodeValToRGB, bpy.types.CompositeNodeValToRGB]
+    :param node_layout: Layout of the node tree to place the new nodes without overlaps, defaults to None
+    :type node_layout: layout.NodeLayout, optional
+    :return: The created node group, None if the conversion was refused by the verification
+    :rtype: bpy.types.NodeGroup or None
     """
-    node_tree_type = get_node_type(node_tree)
-    color_ramp_node = node_tree.nodes.new(type=f'{node_tree_type}NodeValToRGB')
-    set_node_name(color_ramp_node, name)
-    set_node_label(color_ramp_node, name)
+    node_groups = convert_color_ramps(self, context, [color_ramp], node_tree, node_layout)
+    return node_groups[0]
 
-    # set fac value
-    color_ramp_node.inputs["Fac"].default_value = node_group.inputs["Fac"].default_value
 
-    # set basic color ramp settings from saved settings
-    color_ramp_node.color_ramp.color_mode = node_group.color_mode
-    color_ramp_node.color_ramp.interpolation = node_group.interpolation
-    color_ramp_node.color_ramp.hue_interpolation = node_group.hue_interpolation
+def convert_color_ramps(self, context, color_ramps, node_tree, node_layout=None):
+    """
+    Convert color ramps of the same node tree to custom node group alternatives.
+    Every converted node tree is built first, then the node tree of the color ramps
+    is changed in one go, so it's updated (and materials recompiled) once per batch
 
-    colors = []
-    positions = []
-    for i in range(1, len(node_group.inputs)-2):
-        # add color stop to color ramp node
-        if i % 2 == 1:
-            colors.append(node_group.inputs[i].default_value)
+    :param context: context
+    :type context: bpy.context
+    :param color_ramps: The color ramps to convert
+    :type color_ramps: list of [bpy.types.ShaderNodeValToRGB, bpy.types.CompositeNodeValToRGB]
+    :param node_tree: The node tree the color ramps are in
+    :type node_tree: bpy.types.NodeTree
+    :param node_layout: Layout of the node tree to place the new nodes without overlaps, defaults to None
+    :type node_layout: layout.NodeLayout, optional
+    :return: The created node group of each color ramp (shared by fused color ramps),
+        None where the conversion was refused
+    :rtype: list of bpy.types.NodeGroup or None
+    """
+    addon_prefs = get_addon_prefs()
+    interpolation_type = context.scene.node_group_interpolation
+
+    if addon_prefs.fuse_color_ramps:
+        color_ramp_groups = get_fused_color_ramp_groups(color_ramps, node_tree, interpolation_type)
+    else:
+        color_ramp_groups = [[color_ramp] for color_ramp in color_ramps]
+
+    # build
+    converted_node_trees = []
+    for color_ramp_group in color_ramp_groups:
+        if len(color_ramp_group) > 1:
+            converted_node_tree = build_fused_converted_node_tree(
+                self, color_ramp_group, node_tree, interpolation_type)
+            if converted_node_tree is not None:
+                converted_node_trees.append((color_ramp_group, converted_node_tree))
+                continue
+
+        # color ramps refused as a fused group are converted (and reported) one by one
+        converted_node_trees.extend(
+            ([color_ramp], build_converted_node_tree(self, color_ramp, node_tree, interpolation_type))
+            for color_ramp in color_ramp_group)
+
+    # the color ramps are removed while attaching
+    color_ramp_names = [color_ramp.name for color_ramp in color_ramps]
+    group_names = [[color_ramp.name for color_ramp in color_ramp_group]
+                   for color_ramp_group, _ in converted_node_trees]
+
+    # attach
+    node_groups = {}
+    for (color_ramp_group, converted_node_tree), names in zip(converted_node_trees, group_names):
+        if converted_node_tree is None:
+            node_group = None
+        elif len(color_ramp_group) > 1:
+            node_group = attach_fused_node_tree(
+                self, context, color_ramp_group, node_tree, converted_node_tree, node_layout)
         else:
-            positions.append(node_group.inputs[i].default_value)
+            node_group = attach_converted_node_tree(
+                self, context, color_ramp_group[0], node_tree, converted_node_tree, node_layout)
 
-    for i in range(len(colors)):
-        # create color stops if needed
-        if i not in [0, len(colors) - 1]:
-            color_ramp_node.color_ramp.elements.new(positions[i])
-        # set color of color stops
-        color_ramp_node.color_ramp.elements[i].color = colors[i]
-        # set position of color ramp stops
-        color_ramp_node.color_ramp.elements[i].position = positions[i]
+        node_groups.update(dict.fromkeys(names, node_group))
 
-    return color_ramp_node
+    return [node_groups[name] for name in color_ramp_names]
 
 
-def create_color_ramp_node_v2(name, node_tree, node_group):
+def create_color_ramp_node(name, node_tree, ramp_data):
     """
-    Create a color ramp node from converted node group
-    Used when interpolation is set to CONSTANT
+    Create a color ramp node from the ramp definition of a converted node group
 
     :param name: The name of the color ramp node
     :type name: str
     :param node_tree: The node tree to add the node to
     :type node_tree: bpy.types.NodeTree
-    :param node_group: The node group to create the color ramp from
-    :type node_group: bpy.types.NodeGroup
+    :param ramp_data: The ramp definition (see get_color_ramp_data)
+    :type ramp_data: dict
     :return: The created color ramp node
     :rtype: [bpy.types.ShaderNodeValToRGB, bpy.types.CompositeNodeValToRGB]
     """
-
     node_tree_type = get_node_type(node_tree)
     color_ramp_node = node_tree.nodes.new(type=f'{node_tree_type}NodeValToRGB')
     set_node_name(color_ramp_node, name)
     set_node_label(color_ramp_node, name)
 
     # set fac value
-    color_ramp_node.inputs["Fac"].default_value = node_group.inputs["Fac"].default_value
-
-    color_ramp_nodes = [
-        node for node in node_group.node_tree.nodes if is_color_ramp(node)]
-
-    # set basic color ramp settings
-    copy_base_color_ramp(color_ramp_nodes[0], color_ramp_node)
-
-    colors = []
-    positions = []
-
-    num_inputs = len(node_group.inputs)
-    num_color_ramp_nodes = len(color_ramp_nodes)
-
-    # get colors from node group
-    for i in range(1, num_inputs):
-        if 'Color' in node_group.inputs[i].name:
-            colors.append(node_group.inputs[i].default_value)
-
-    # get positions from color ramps
-    for i in range(num_color_ramp_nodes):
-        if i == 0:
-            positions.append(
-                color_ramp_nodes[i].color_ramp.elements[0].position)
-            positions.append(
-                color_ramp_nodes[i].color_ramp.elements[1].position)
-        else:
-            positions.append(
-                color_ramp_nodes[i].color_ramp.elements[1].position)
-
-    num_colors = len(colors)
+    color_ramp_node.inputs["Fac"].default_value = ramp_data['fac']
 
-    # set values for color ramp
-    for i in range(num_colors):
-
-        if i < len(color_ramp_node.color_ramp.elements):
-            element_to_set = color_ramp_node.color_ramp.elements[i]
-        else:
-            element_to_set = color_ramp_node.color_ramp.elements.new(
-                positions[i])
-
-        # set color of color stops
-        element_to_set.color = colors[i]
-        # set position of color ramp stops
-        element_to_set.position = positions[i]
+    apply_color_ramp_data(color_ramp_node, ramp_data)
 
     return color_ramp_node
 
 
-def auto_link_color_ramp_node(node_group, active_node_tree, color_ramp_node):
+def auto_link_color_ramp_node(node_group, active_node_tree, color_ramp_node, output_index=0):
     """
     Auto link the color ramp node to the same sockets as the converted node group
 
@@ -1375,6 +2878,8 @@ def auto_link_color_ramp_node(node_group, active_node_tree, color_ramp_node):
     :type active_node_tree: bpy.types.NodeTree
     :param color_ramp_node: The color ramp node to recreate the links for
     :type color_ramp_node: [bpy.types.ShaderNodeValToRGB, bpy.types.CompositeNodeValToRGB]
+    :param output_index: The output of the node group to get the links from, defaults to 0
+    :type output_index: int, optional
     """
     # handle inputs
     if node_group.inputs[0].is_linked:
@@ -1385,13 +2890,13 @@ def auto_link_color_ramp_node(node_group, active_node_tree, color_ramp_node):
             from_node.outputs[from_socket_name], color_ramp_node.inputs["Fac"])
 
     # handle outputs
-    if node_group.outputs[0].is_linked:
+    if node_group.outputs[output_index].is_linked:
         node_tree_type = get_node_type(active_node_tree)
         if node_tree_type == 'Shader':
             output_key = 'Color'
         elif node_tree_type == 'Compositor':
             output_key = 'Image'
-        node_group_links = node_group.outputs[0].links
+        node_group_links = node_group.outputs[output_index].links
         for link in node_group_links:
             to_node = link.to_node
             to_socket_name = link.to_socket.name
@@ -1410,32 +2915,30 @@ def convert_node_group(node_group, node_tree):
     """
     addon_prefs = get_addon_prefs()
 
-    color_ramp_name = node_group.node_tree.name.replace(
-        'Converted', '')
-
-    color_ramp_node = None
-    # TODO add additional check when adding a driver based implementation
-    is_constant_interpolation = bool(
-        any_color_ramp_node(node_group.node_tree.nodes))
-    if is_constant_interpolation:
-        color_ramp_node = create_color_ramp_node_v2(
-            color_ramp_name, node_tree, node_group)
-    else:
+    # the metadata record tells where the stops are, whatever the layout.
+    # A fused node group is split into a color ramp for each output
+    color_ramp_nodes = []
+    for output_index, (color_ramp_name, ramp_data) in enumerate(get_all_color_ramp_data(node_group)):
         color_ramp_node = create_color_ramp_node(
-            color_ramp_name, node_tree, node_group)
+            color_ramp_name, node_tree, ramp_data)
 
-    if addon_prefs.copy_width:
-        set_node_width(color_ramp_node, node_group.width)
+        if addon_prefs.copy_width:
+            set_node_width(color_ramp_node, node_group.width)
+
+        auto_link_color_ramp_node(node_group, node_tree,
+                                  color_ramp_node, output_index)
 
-    auto_link_color_ramp_node(node_group, node_tree,
-                              color_ramp_node)
+        set_node_location(color_ramp_node, node_group.location)
+        offset_node_location_y(color_ramp_node, output_index*300, space=0)
 
-    set_node_location(color_ramp_node, node_group.location)
+        transfer_stop_animation(node_group, color_ramp_node, node_tree, output_index)
+        color_ramp_nodes.append(color_ramp_node)
 
     if addon_prefs.remove_extra_nodes:
         remove_excess_extra_nodes(node_tree.nodes, node_group.name)
     # override
     remove_node(node_group, node_tree)
 
-    color_ramp_node.select = True
-    node_tree.nodes.active = color_ramp_node
+    for color_ramp_node in color_ramp_nodes:
+        color_ramp_node.select = True
+    node_tree.nodes.active = color_ramp_nodes[0]
@@ -0,0 +1,300 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+# GPLv3 License
+#
+# ColorRampConverter
+# Copyright (C) 2022-2026, Mark Elek, David Elek
+#
+# ColorRampConverter is a Blender addon that generates
+# custom node groups from color ramp nodes,
+# making a few parameters more accessible.
+#
+# This file is a part of ColorRampConverter.
+# ColorRampConverter is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# ColorRampConverter is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ColorRampConverter. If not, see <http://www.gnu.org/licenses/>.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# <pep8 compliant>
+
+import time
+import bpy
+from bpy.app.handlers import persistent
+from .lazy import lazy_import
+
+# imported on first use, background renders without render substitution never load them
+functions = lazy_import('.functions', __package__)
+lut = lazy_import('.lut', __package__)
+maintenance = lazy_import('.maintenance', __package__)
+previews = lazy_import('.previews', __package__)
+
+
+# substituted nodes of the current render, restored after rendering
+# list of tuples (node tree, converted node group name, substitute node name, [(to node name, to socket identifier)],
+# [(data collection name, name)] of the datablocks created for the substitute)
+substituted_nodes = []
+
+# statistics of the last substitution, printed only when blender runs with --debug
+last_substitution_stats = {'swapped': 0, 'swap_time': 0.0, 'restored': 0, 'restore_time': 0.0}
+
+# material shading updates (each one is a material recompile) seen by the depsgraph handler,
+# and the updates caused by the last conversion, shown in the statistics panel
+material_update_stats = {'count': 0, 'last_label': '', 'last_count': 0}
+
+
+def create_substitute_node(node_group, node_tree, mode, resolution):
+    """
+    Create a render substitute for a converted node group
+
+    :param node_group: The converted node group to create the substitute for
+    :type node_group: bpy.types.NodeGroup
+    :param node_tree: The node tree the converted node group is in
+    :type node_tree: bpy.types.NodeTree
+    :param mode: The type of the substitute node
+    :type mode: str in ['LUT', 'COLOR_RAMP']
+    :param resolution: The number of pixels of the lookup texture
+    :type resolution: int
+    :return: The substitute node and the data collection name and name of each datablock created for it
+    :rtype: tuple (bpy.types.Node, list of tuples (str, str))
+    """
+    ramp_data = functions.get_color_ramp_data(node_group)
+    created_datablocks = []
+
+    if mode == 'LUT':
+        # lookup textures baked for the render only are removed after it, animated stops bake one per frame
+        ramp_hash = functions.get_color_ramp_data_hash(ramp_data)
+        for collection_name, name in (('node_groups', lut.get_lut_node_tree_name(ramp_hash, resolution, node_tree)),
+                                      ('images', lut.get_lut_name(ramp_hash, resolution))):
+            if name not in getattr(bpy.data, collection_name):
+                created_datablocks.append((collection_name, name))
+
+        lut_node_group = lut.get_or_create_lut_node_tree(
+            ramp_data, resolution, node_tree)
+        substitute_node = functions.instantiate_node_group(
+            lut_node_group, functions.get_node_group_type(node_tree),
+            f'RenderLUT{node_group.name}', node_tree)
+        substitute_node.is_baked = True
+    else:
+        node_tree_type = functions.get_node_type(node_tree)
+        substitute_node = node_tree.nodes.new(
+            type=f'{node_tree_type}NodeValToRGB')
+        substitute_node.name = f'RenderRamp{node_group.name}'
+        functions.apply_color_ramp_data(substitute_node, ramp_data)
+
+    substitute_node.inputs[0].default_value = ramp_data['fac']
+    functions.set_node_location(substitute_node, node_group.location)
+    return substitute_node, created_datablocks
+
+
+def substitute_converted_node_groups(mode, resolution):
+    """
+    Swap every converted node group for a lookup texture node group or a color ramp node.
+    The converted node groups are kept, only their output links are moved to the substitutes.
+
+    :param mode: The type of the substitute nodes
+    :type mode: str in ['LUT', 'COLOR_RAMP']
+    :param resolution: The number of pixels of the lookup textures
+    :type resolution: int
+    :return: The number of swapped node groups
+    :rtype: int
+    """
+    for node_tree in functions.get_all_node_trees():
+        # fused node groups have several outputs, a substitute has one
+        node_groups = [node for node in node_tree.nodes
+                       if functions.is_node_group(node) and not functions.is_fused_node_group(node)]
+        for node_group in node_groups:
+            substitute_node, created_datablocks = create_substitute_node(
+                node_group, node_tree, mode, resolution)
+
+            if node_group.inputs[0].is_linked:
+                node_tree.links.new(
+                    node_group.inputs[0].links[0].from_socket, substitute_node.inputs[0])
+
+            to_sockets = []
+            for link in list(node_group.outputs[0].links):
+                to_socket = link.to_socket
+                to_sockets.append((to_socket.node.name, to_socket.identifier))
+                # replaces the link of the converted node group
+                node_tree.links.new(substitute_node.outputs[0], to_socket)
+
+            # animated stops (and factor) drive the substitute while rendering
+            functions.transfer_stop_animation(node_group, substitute_node, node_tree)
+
+            substituted_nodes.append(
+                (node_tree, node_group.name, substitute_node.name, to_sockets, created_datablocks))
+
+    return len(substituted_nodes)
+
+
+def restore_converted_node_groups():
+    """
+    Restore the converted node groups swapped by substitute_converted_node_groups,
+    and remove the datablocks created for the substitutes once nothing uses them
+
+    :return: The number of restored node groups
+    :rtype: int
+    """
+    restored_count = 0
+    created_datablocks = []
+    for node_tree, node_group_name, substitute_node_name, to_sockets, created in substituted_nodes:
+        created_datablocks.extend(created)
+
+        node_group = node_tree.nodes.get(node_group_name)
+        substitute_node = node_tree.nodes.get(substitute_node_name)
+
+        if node_group is not None:
+            for to_node_name, to_socket_identifier in to_sockets:
+                to_node = node_tree.nodes.get(to_node_name)
+                if to_node is None:
+                    continue
+                to_socket = next((socket for socket in to_node.inputs
+                                  if socket.identifier == to_socket_identifier), None)
+                if to_socket is not None:
+                    node_tree.links.new(node_group.outputs[0], to_socket)
+            restored_count += 1
+
+        if substitute_node is not None:
+            if node_group is not None:
+                functions.transfer_stop_animation(substitute_node, node_group, node_tree)
+            node_tree.nodes.remove(substitute_node)
+
+    # node groups first, they are the users of the images
+    for collection_name, name in sorted(created_datablocks, key=lambda item: item[0] != 'node_groups'):
+        collection = getattr(bpy.data, collection_name)
+        datablock = collection.get(name)
+        if datablock is not None and datablock.users == 0:
+            collection.remove(datablock)
+
+    substituted_nodes.clear()
+    return restored_count
+
+
+@persistent
+def render_pre_handler(scene, depsgraph=None):
+    """
+    Swap converted node groups for their render substitutes before rendering
+    """
+    mode = scene.render_substitution
+    if mode == 'NONE':
+        return
+
+    # a previous render didn't finish cleanly
+    if substituted_nodes:
+        restore_converted_node_groups()
+
+    start_time = time.perf_counter()
+    swapped_count = substitute_converted_node_groups(
+        mode, int(scene.lut_resolution))
+    swap_time = time.perf_counter() - start_time
+
+    last_substitution_stats['swapped'] = swapped_count
+    last_substitution_stats['swap_time'] = swap_time
+    if bpy.app.debug:
+        print(f'ColorRampConverter: swapped {swapped_count} converted node group(s) '
+              f'in {swap_time*1000:.2f} ms')
+
+
+@persistent
+def render_post_handler(scene, depsgraph=None):
+    """
+    Restore converted node groups after rendering (or cancelling the render)
+    """
+    if not substituted_nodes:
+        return
+
+    start_time = time.perf_counter()
+    restored_count = restore_converted_node_groups()
+    restore_time = time.perf_counter() - start_time
+
+    last_substitution_stats['restored'] = restored_count
+    last_substitution_stats['restore_time'] = restore_time
+    if bpy.app.debug:
+        print(f'ColorRampConverter: restored {restored_count} converted node group(s) '
+              f'in {restore_time*1000:.2f} ms')
+
+
+def record_material_updates(label, start_count):
+    """
+    Record the number of material updates since start_count as the updates of the last conversion,
+    once the changes made by an operator have been evaluated
+
+    :param label: What caused the updates, e.g. 'Converted 10 node(s)'
+    :type label: str
+    :param start_count: The material update count before the changes
+    :type start_count: int
+    """
+    def record_updates():
+        material_update_stats['last_label'] = label
+        material_update_stats['last_count'] = material_update_stats['count'] - start_count
+        if bpy.app.debug:
+            print(f'ColorRampConverter: {label}, {material_update_stats["last_count"]} material update(s)')
+
+        for window in bpy.context.window_manager.windows:
+            for area in window.screen.areas:
+                if area.type == 'NODE_EDITOR':
+                    area.tag_redraw()
+
+    # the depsgraph is evaluated after the operator returns
+    bpy.app.timers.register(record_updates, first_interval=0.5)
+
+
+@persistent
+def depsgraph_update_post_handler(scene, depsgraph):
+    """
+    Count material updates and mark the edited node trees,
+    so their statistics are counted again and their previews looked up again
+    """
+    statistics_loaded = maintenance.is_loaded
+    previews_loaded = previews.is_loaded
+
+    for update in depsgraph.updates:
+        if update.is_updated_shading and isinstance(update.id, bpy.types.Material):
+            material_update_stats['count'] += 1
+
+        # nothing to invalidate before the statistics are first counted
+        if statistics_loaded:
+            maintenance.mark_statistics_dirty(update.id.original)
+        if previews_loaded:
+            previews.mark_previews_dirty(update.id.original)
+
+
+@persistent
+def load_post_handler(filepath, *args):
+    """
+    Forget the statistics and previews of the previous file
+    """
+    if maintenance.is_loaded:
+        maintenance.clear_statistics_cache()
+    if previews.is_loaded:
+        previews.clear_previews()
+
+
+handlers = [
+    (bpy.app.handlers.render_pre, render_pre_handler),
+    (bpy.app.handlers.render_post, render_post_handler),
+    (bpy.app.handlers.render_cancel, render_post_handler),
+    (bpy.app.handlers.depsgraph_update_post, depsgraph_update_post_handler),
+    (bpy.app.handlers.load_post, load_post_handler),
+]
+
+
+def register():
+    for handler_list, handler in handlers:
+        if handler not in handler_list:
+            handler_list.append(handler)
+
+
+def unregister():
+    for handler_list, handler in handlers:
+        if handler in handler_list:
+            handler_list.remove(handler)
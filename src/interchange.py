@@ -0,0 +1,221 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+# GPLv3 License
+#
+# ColorRampConverter
+# Copyright (C) 2022-2026, Mark Elek, David Elek
+#
+# ColorRampConverter is a Blender addon that generates
+# custom node groups from color ramp nodes,
+# making a few parameters more accessible.
+#
+# This file is a part of ColorRampConverter.
+# ColorRampConverter is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# ColorRampConverter is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ColorRampConverter. If not, see <http://www.gnu.org/licenses/>.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# <pep8 compliant>
+
+import struct
+from .functions import (get_all_node_trees,
+                        get_all_color_ramp_data,
+                        apply_color_ramp_data,
+                        get_node_type,
+                        convert_color_ramp,
+                        is_color_ramp,
+                        is_node_group,
+                        is_baked_lut,
+                        is_osl_ramp,
+                        set_node_label,
+                        set_node_location,
+                        set_node_name,
+                        )
+
+
+# File layout (little endian):
+#   header: magic (4 bytes), format version (uint16), reserved (uint16)
+#   records: name length (uint16), color mode, interpolation, hue interpolation (uint8 each),
+#            stop count (uint16), fac (float32), name (utf-8),
+#            positions (stop count float32), colors (stop count * 4 float32)
+MAGIC = b'CRCR'
+FORMAT_VERSION = 1
+FILE_EXTENSION = '.crramp'
+
+HEADER = struct.Struct('<4sHH')
+RECORD_HEADER = struct.Struct('<HBBBHf')
+
+COLOR_MODES = ('RGB', 'HSV', 'HSL')
+INTERPOLATIONS = ('EASE', 'CARDINAL', 'LINEAR', 'B_SPLINE', 'CONSTANT')
+HUE_INTERPOLATIONS = ('NEAR', 'FAR', 'CW', 'CCW')
+
+
+def write_color_ramps(filepath, color_ramps):
+    """
+    Write ramp definitions to a color ramp file, records are written one by one
+
+    :param filepath: The path of the file to write
+    :type filepath: str
+    :param color_ramps: The names and definitions of the ramps to write (see get_color_ramp_data)
+    :type color_ramps: iterable of tuples (str, dict)
+    :return: The number of written ramps
+    :rtype: int
+    """
+    ramp_count = 0
+    with open(filepath, 'wb') as ramp_file:
+        ramp_file.write(HEADER.pack(MAGIC, FORMAT_VERSION, 0))
+
+        for name, ramp_data in color_ramps:
+            encoded_name = name.encode('utf-8')
+            positions = ramp_data['positions']
+            colors = ramp_data['colors']
+            stop_count = len(positions)
+
+            ramp_file.write(RECORD_HEADER.pack(
+                len(encoded_name),
+                COLOR_MODES.index(ramp_data['color_mode']),
+                INTERPOLATIONS.index(ramp_data['interpolation']),
+                HUE_INTERPOLATIONS.index(ramp_data['hue_interpolation']),
+                stop_count,
+                ramp_data.get('fac', 0.5)))
+            ramp_file.write(encoded_name)
+            ramp_file.write(struct.pack(f'<{stop_count}f', *positions))
+            ramp_file.write(struct.pack(f'<{stop_count * 4}f', *colors))
+            ramp_count += 1
+
+    return ramp_count
+
+
+def iter_color_ramps(filepath):
+    """
+    Read the ramp definitions of a color ramp file, records are read one by one
+
+    :param filepath: The path of the file to read
+    :type filepath: str
+    :return: Generator of the names and definitions of the ramps (see get_color_ramp_data)
+    :rtype: generator of tuples (str, dict)
+    """
+    with open(filepath, 'rb') as ramp_file:
+        magic, version, _ = HEADER.unpack(ramp_file.read(HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f'{filepath} is not a color ramp file')
+        if version > FORMAT_VERSION:
+            raise ValueError(
+                f'{filepath} has an unsupported format version: {version}')
+
+        while True:
+            record_header = ramp_file.read(RECORD_HEADER.size)
+            if not record_header:
+                return
+            if len(record_header) < RECORD_HEADER.size:
+                raise ValueError(f'{filepath} is truncated')
+
+            (name_length, color_mode, interpolation, hue_interpolation,
+             stop_count, fac) = RECORD_HEADER.unpack(record_header)
+
+            name = ramp_file.read(name_length).decode('utf-8')
+            positions = struct.unpack(
+                f'<{stop_count}f', ramp_file.read(stop_count * 4))
+            colors = struct.unpack(
+                f'<{stop_count * 4}f', ramp_file.read(stop_count * 16))
+
+            yield name, {
+                'positions': list(positions),
+                'colors': list(colors),
+                'color_mode': COLOR_MODES[color_mode],
+                'interpolation': INTERPOLATIONS[interpolation],
+                'hue_interpolation': HUE_INTERPOLATIONS[hue_interpolation],
+                'fac': fac,
+            }
+
+
+def is_exportable(node):
+    """
+    Check if node can be exported to a color ramp file
+
+    :param node: The node to check
+    :type node: bpy.types.Node
+    :return: Returns True if node is a color ramp, converted or baked node group
+        or generated OSL script node, False otherwise
+    :rtype: bool
+    """
+    return is_color_ramp(node) or is_node_group(node) or is_baked_lut(node) or is_osl_ramp(node)
+
+
+def export_color_ramps(filepath, nodes=None):
+    """
+    Export color ramp nodes, converted and baked node groups to a color ramp file
+
+    :param filepath: The path of the file to write
+    :type filepath: str
+    :param nodes: The nodes to export, defaults to every exportable node of the file
+    :type nodes: list of bpy.types.Node, optional
+    :return: The number of exported ramps
+    :rtype: int
+    """
+    if nodes is None:
+        # skip the color ramps inside converted node groups
+        nodes = (node for node_tree in get_all_node_trees()
+                 if not node_tree.name.startswith('Converted')
+                 for node in node_tree.nodes)
+
+    # fused node groups are exported as a color ramp for each output
+    color_ramps = (color_ramp for node in nodes if is_exportable(node)
+                   for color_ramp in get_all_color_ramp_data(node))
+    return write_color_ramps(filepath, color_ramps)
+
+
+def import_color_ramps(self, context, filepath, node_tree, as_node_groups=False,
+                       location=(0.0, 0.0), columns=8, spacing=300.0):
+    """
+    Import the ramps of a color ramp file as color ramp nodes or converted node groups
+
+    :param context: context
+    :type context: bpy.context
+    :param filepath: The path of the file to read
+    :type filepath: str
+    :param node_tree: The node tree to create the nodes in
+    :type node_tree: bpy.types.NodeTree
+    :param as_node_groups: Create converted node groups instead of color ramp nodes, defaults to False
+    :type as_node_groups: bool, optional
+    :param location: The location of the first created node
+    :type location: float array of 2 items in [-100000, 100000], default (0.0, 0.0)
+    :param columns: The number of columns to arrange the created nodes in, defaults to 8
+    :type columns: int, optional
+    :param spacing: The space between the created nodes, defaults to 300.0
+    :type spacing: float, optional
+    :return: The number of imported ramps
+    :rtype: int
+    """
+    node_tree_type = get_node_type(node_tree)
+
+    ramp_count = 0
+    for name, ramp_data in iter_color_ramps(filepath):
+        color_ramp_node = node_tree.nodes.new(
+            type=f'{node_tree_type}NodeValToRGB')
+        set_node_name(color_ramp_node, name)
+        set_node_label(color_ramp_node, name)
+        apply_color_ramp_data(color_ramp_node, ramp_data)
+        color_ramp_node.inputs[0].default_value = ramp_data['fac']
+
+        column = ramp_count % columns
+        row = ramp_count // columns
+        set_node_location(color_ramp_node, (location[0] + column * spacing,
+                                            location[1] - row * spacing))
+
+        if as_node_groups and len(ramp_data['positions']) > 1:
+            convert_color_ramp(self, context, color_ramp_node, node_tree)
+
+        ramp_count += 1
+
+    return ramp_count
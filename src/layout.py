@@ -0,0 +1,211 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+# GPLv3 License
+#
+# ColorRampConverter
+# Copyright (C) 2022-2026, Mark Elek, David Elek
+#
+# ColorRampConverter is a Blender addon that generates
+# custom node groups from color ramp nodes,
+# making a few parameters more accessible.
+#
+# This file is a part of ColorRampConverter.
+# ColorRampConverter is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# ColorRampConverter is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ColorRampConverter. If not, see <http://www.gnu.org/licenses/>.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# <pep8 compliant>
+
+import bpy
+import math
+from .functions import get_node_group_height
+from .functions import is_node_group
+
+
+# size of the spatial hash cells, about the size of a regular node
+CELL_SIZE = 200.0
+# space kept between placed nodes
+NODE_MARGIN = 20.0
+# nodes that are not drawn yet have no dimensions
+DEFAULT_NODE_HEIGHT = 150.0
+# give up searching for a free location after this many steps
+MAX_PLACEMENT_STEPS = 10000
+
+
+def get_node_size(node):
+    """
+    Get the (estimated) width and height of a node
+
+    :param node: The node to get the size of
+    :type node: bpy.types.Node
+    :return: The width and height of the node
+    :rtype: tuple (float, float)
+    """
+    # dimensions are only known after the node has been drawn, and include the interface scale
+    if node.dimensions[1] > 0.0:
+        ui_scale = bpy.context.preferences.system.ui_scale
+        return node.dimensions[0] / ui_scale, node.dimensions[1] / ui_scale
+
+    if is_node_group(node) or node.bl_idname.endswith('NodeGroup'):
+        return node.width, get_node_group_height(node)
+
+    return node.width, DEFAULT_NODE_HEIGHT
+
+
+def get_node_bounds(node, location=None):
+    """
+    Get the bounds of a node, the location of a node is its top left corner
+
+    :param node: The node to get the bounds of
+    :type node: bpy.types.Node
+    :param location: The location to get the bounds at, defaults to the location of the node
+    :type location: tuple (float, float), optional
+    :return: The minimum x, minimum y, maximum x and maximum y of the node
+    :rtype: tuple (float, float, float, float)
+    """
+    if location is None:
+        # nodes in frames are located relative to the frame in older versions
+        location = getattr(node, 'location_absolute', node.location)
+    width, height = get_node_size(node)
+    return location[0], location[1] - height, location[0] + width, location[1]
+
+
+class NodeLayout:
+    """
+    Spatial hash of the node bounds of a node tree, used to place new nodes
+    next to their preferred location without overlapping existing nodes.
+    Build it once per node tree and reuse it for every node placed in a batch
+    """
+
+    def __init__(self, node_tree, cell_size=CELL_SIZE, margin=NODE_MARGIN):
+        """
+        Hash the bounds of the nodes of the node tree
+
+        :param node_tree: The node tree to lay out nodes in
+        :type node_tree: bpy.types.NodeTree
+        :param cell_size: The size of the spatial hash cells, defaults to CELL_SIZE
+        :type cell_size: float, optional
+        :param margin: The space kept between placed nodes, defaults to NODE_MARGIN
+        :type margin: float, optional
+        """
+        self.cell_size = cell_size
+        self.margin = margin
+        # cell -> names of the nodes overlapping the cell
+        self.cells = {}
+        # node name -> bounds
+        self.bounds = {}
+        # (preferred location, direction) -> where the last search ended,
+        # batches placing many nodes at the same location don't walk the same occupied steps again
+        self.search_ends = {}
+
+        for node in node_tree.nodes:
+            # frames contain other nodes, they don't take up space themselves
+            if node.bl_idname != 'NodeFrame':
+                self.add(node.name, get_node_bounds(node))
+
+    def get_cells(self, bounds):
+        """
+        Get the cells the bounds overlap
+
+        :param bounds: The bounds (see get_node_bounds)
+        :type bounds: tuple (float, float, float, float)
+        :return: The cells the bounds overlap
+        :rtype: generator of tuples (int, int)
+        """
+        cell_size = self.cell_size
+        min_x, min_y, max_x, max_y = bounds
+        for cell_x in range(math.floor(min_x / cell_size), math.floor(max_x / cell_size) + 1):
+            for cell_y in range(math.floor(min_y / cell_size), math.floor(max_y / cell_size) + 1):
+                yield cell_x, cell_y
+
+    def add(self, name, bounds):
+        """
+        Add the bounds of a node
+
+        :param name: The name of the node
+        :type name: str
+        :param bounds: The bounds of the node (see get_node_bounds)
+        :type bounds: tuple (float, float, float, float)
+        """
+        self.remove(name)
+        self.bounds[name] = bounds
+        for cell in self.get_cells(bounds):
+            self.cells.setdefault(cell, set()).add(name)
+
+    def remove(self, name):
+        """
+        Remove the bounds of a node, e.g. before the node is removed or replaced
+
+        :param name: The name of the node
+        :type name: str
+        """
+        bounds = self.bounds.pop(name, None)
+        if bounds is None:
+            return
+        for cell in self.get_cells(bounds):
+            self.cells[cell].discard(name)
+
+    def is_free(self, bounds):
+        """
+        Check if the bounds (with the margin) don't overlap any node
+
+        :param bounds: The bounds to check (see get_node_bounds)
+        :type bounds: tuple (float, float, float, float)
+        :return: Returns True if the bounds don't overlap any node, False otherwise
+        :rtype: bool
+        """
+        margin = self.margin
+        min_x, min_y, max_x, max_y = bounds
+        padded_bounds = (min_x - margin, min_y - margin, max_x + margin, max_y + margin)
+
+        for cell in self.get_cells(padded_bounds):
+            for name in self.cells.get(cell, ()):
+                other_min_x, other_min_y, other_max_x, other_max_y = self.bounds[name]
+                if (padded_bounds[0] < other_max_x and other_min_x < padded_bounds[2]
+                        and padded_bounds[1] < other_max_y and other_min_y < padded_bounds[3]):
+                    return False
+        return True
+
+    def place(self, node, location, direction=(0, -1)):
+        """
+        Place a node at the first free location starting from the preferred location,
+        stepping by the size of the node in the given direction
+
+        :param node: The node to place
+        :type node: bpy.types.Node
+        :param location: The preferred location (top left corner) of the node
+        :type location: tuple (float, float)
+        :param direction: The direction to step in when the location is taken, defaults to down
+        :type direction: tuple (int, int), optional
+        :return: The location the node was placed at
+        :rtype: tuple (float, float)
+        """
+        self.remove(node.name)
+        width, height = get_node_size(node)
+        step_x = direction[0] * (width + self.margin)
+        step_y = direction[1] * (height + self.margin)
+
+        search_key = (tuple(location), tuple(direction))
+        x, y = self.search_ends.get(search_key, location)
+        for _ in range(MAX_PLACEMENT_STEPS):
+            bounds = (x, y - height, x + width, y)
+            if self.is_free(bounds):
+                break
+            x += step_x
+            y += step_y
+
+        self.search_ends[search_key] = (x, y)
+        node.location = (x, y)
+        self.add(node.name, (x, y - height, x + width, y))
+        return x, y
@@ -0,0 +1,78 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+# GPLv3 License
+#
+# ColorRampConverter
+# Copyright (C) 2022-2026, Mark Elek, David Elek
+#
+# ColorRampConverter is a Blender addon that generates
+# custom node groups from color ramp nodes,
+# making a few parameters more accessible.
+#
+# This file is a part of ColorRampConverter.
+# ColorRampConverter is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# ColorRampConverter is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ColorRampConverter. If not, see <http://www.gnu.org/licenses/>.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# <pep8 compliant>
+
+import importlib
+import importlib.util
+import sys
+
+
+class LazyModule:
+    """
+    Stand-in for a module of the addon that is imported on first attribute access,
+    keeps Blender startup (and background farm renders) from importing modules that aren't used
+    """
+
+    def __init__(self, name, package):
+        """
+        :param name: The (relative) name of the module, e.g. '.functions'
+        :type name: str
+        :param package: The package to resolve the relative name against, usually __package__
+        :type package: str
+        """
+        self._name = importlib.util.resolve_name(name, package)
+        self._module = None
+
+    @property
+    def is_loaded(self):
+        """
+        Returns True if the module has been imported (here or anywhere else), False otherwise
+        """
+        return self._module is not None or self._name in sys.modules
+
+    def __getattr__(self, attribute):
+        """
+        Import the module (once) and get the attribute from it
+        """
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attribute)
+
+
+def lazy_import(name, package):
+    """
+    Get a module of the addon that is imported on first use
+
+    :param name: The (relative) name of the module, e.g. '.functions'
+    :type name: str
+    :param package: The package to resolve the relative name against, usually __package__
+    :type package: str
+    :return: The lazily imported module
+    :rtype: LazyModule
+    """
+    return LazyModule(name, package)
@@ -0,0 +1,262 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+# GPLv3 License
+#
+# ColorRampConverter
+# Copyright (C) 2022-2026, Mark Elek, David Elek
+#
+# ColorRampConverter is a Blender addon that generates
+# custom node groups from color ramp nodes,
+# making a few parameters more accessible.
+#
+# This file is a part of ColorRampConverter.
+# ColorRampConverter is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# ColorRampConverter is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ColorRampConverter. If not, see <http://www.gnu.org/licenses/>.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# <pep8 compliant>
+
+import bpy
+import contextlib
+import hashlib
+import json
+import os
+import time
+import traceback
+
+try:
+    import fcntl
+except ImportError:
+    # windows
+    fcntl = None
+    import msvcrt
+
+
+# bump when the layout of converted node groups changes, old entries won't be used anymore
+LIBRARY_VERSION = 1
+
+INDEX_FILE_NAME = 'index.json'
+LOCK_FILE_NAME = 'index.lock'
+
+
+def get_library_dir(library_path=''):
+    """
+    Get (and create if needed) the directory of the converted node group library
+
+    :param library_path: The directory set in the addon preferences, empty to use the default directory
+    :type library_path: str
+    :return: The absolute path of the library directory
+    :rtype: str
+    """
+    if library_path:
+        library_dir = bpy.path.abspath(library_path)
+    else:
+        library_dir = bpy.utils.user_resource(
+            'CONFIG', path='color_ramp_converter_library')
+
+    os.makedirs(library_dir, exist_ok=True)
+    return library_dir
+
+
+def get_library_key(ramp_hash, node_group_type, layout):
+    """
+    Get the key of a converted node group in the library
+
+    :param ramp_hash: The content hash of the ramp definition (see get_color_ramp_data_hash)
+    :type ramp_hash: str
+    :param node_group_type: The type of the node group
+    :type node_group_type: str in ['Shader', 'Compositor', 'Geometry']
+    :param layout: The layout of the node group (map range interpolation type or legacy layout)
+    :type layout: str
+    :return: The key of the library entry
+    :rtype: str
+    """
+    key = f'{LIBRARY_VERSION}|{ramp_hash}|{node_group_type}|{layout}'
+    return hashlib.sha1(key.encode()).hexdigest()
+
+
+@contextlib.contextmanager
+def library_lock(library_dir):
+    """
+    Lock the library directory, so concurrent blender processes don't read or write it at the same time
+
+    :param library_dir: The library directory to lock
+    :type library_dir: str
+    """
+    lock_path = os.path.join(library_dir, LOCK_FILE_NAME)
+    with open(lock_path, 'a+b') as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        else:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def read_index(library_dir):
+    """
+    Read the index of the library, the library lock has to be held
+
+    :param library_dir: The library directory
+    :type library_dir: str
+    :return: The library index
+    :rtype: dict
+    """
+    index_path = os.path.join(library_dir, INDEX_FILE_NAME)
+    with contextlib.suppress(OSError, ValueError):
+        with open(index_path, 'r') as index_file:
+            index = json.load(index_file)
+        if index.get('version') == LIBRARY_VERSION:
+            return index
+    return {'version': LIBRARY_VERSION, 'entries': {}}
+
+
+def write_index(library_dir, index):
+    """
+    Write the index of the library, the library lock has to be held
+
+    :param library_dir: The library directory
+    :type library_dir: str
+    :param index: The library index to write
+    :type index: dict
+    """
+    index_path = os.path.join(library_dir, INDEX_FILE_NAME)
+    temp_path = f'{index_path}.{os.getpid()}.tmp'
+    with open(temp_path, 'w') as index_file:
+        json.dump(index, index_file, indent=1, sort_keys=True)
+    # readers never see a half written index
+    os.replace(temp_path, index_path)
+
+
+def remove_entry(library_dir, index, key):
+    """
+    Remove an entry and its file from the library, the library lock has to be held
+
+    :param library_dir: The library directory
+    :type library_dir: str
+    :param index: The library index
+    :type index: dict
+    :param key: The key of the entry to remove
+    :type key: str
+    """
+    entry = index['entries'].pop(key)
+    with contextlib.suppress(OSError):
+        os.remove(os.path.join(library_dir, entry['file']))
+
+
+def evict_entries(library_dir, index, max_size):
+    """
+    Remove the least recently used entries until the library fits into max_size
+
+    :param library_dir: The library directory
+    :type library_dir: str
+    :param index: The library index
+    :type index: dict
+    :param max_size: The maximum size of the library in bytes
+    :type max_size: int
+    """
+    entries = index['entries']
+    total_size = sum(entry['size'] for entry in entries.values())
+    keys_by_last_use = sorted(entries, key=lambda key: entries[key]['last_used'])
+
+    for key in keys_by_last_use:
+        if total_size <= max_size:
+            break
+        total_size -= entries[key]['size']
+        remove_entry(library_dir, index, key)
+
+
+def load_node_tree(library_dir, key, link=False):
+    """
+    Load a converted node tree from the library
+
+    :param library_dir: The library directory
+    :type library_dir: str
+    :param key: The key of the entry to load (see get_library_key)
+    :type key: str
+    :param link: Link the node tree instead of appending it, defaults to False
+    :type link: bool, optional
+    :return: The loaded node tree, None if the library has no such entry or it can't be read
+    :rtype: bpy.types.NodeTree or None
+    """
+    with library_lock(library_dir):
+        index = read_index(library_dir)
+        entry = index['entries'].get(key)
+        if entry is None:
+            return None
+
+        filepath = os.path.join(library_dir, entry['file'])
+        if not os.path.isfile(filepath):
+            remove_entry(library_dir, index, key)
+            write_index(library_dir, index)
+            return None
+
+        try:
+            with bpy.data.libraries.load(filepath, link=link) as (data_from, data_to):
+                data_to.node_groups = [entry['node_group']]
+        except OSError:
+            # a corrupt or truncated entry is dropped, the node tree is built and stored again
+            traceback.print_exc()
+            data_to = None
+
+        if data_to is None or data_to.node_groups[0] is None:
+            remove_entry(library_dir, index, key)
+            write_index(library_dir, index)
+            return None
+
+        entry['last_used'] = time.time()
+        write_index(library_dir, index)
+
+    return data_to.node_groups[0]
+
+
+def store_node_tree(library_dir, key, node_tree, max_size):
+    """
+    Store a converted node tree in the library
+
+    :param library_dir: The library directory
+    :type library_dir: str
+    :param key: The key of the entry to store (see get_library_key)
+    :type key: str
+    :param node_tree: The node tree to store
+    :type node_tree: bpy.types.NodeTree
+    :param max_size: The maximum size of the library in bytes
+    :type max_size: int
+    """
+    file_name = f'{key}.blend'
+    filepath = os.path.join(library_dir, file_name)
+
+    with library_lock(library_dir):
+        index = read_index(library_dir)
+        if key in index['entries']:
+            return
+
+        bpy.data.libraries.write(
+            filepath, {node_tree}, fake_user=True, compress=True)
+
+        index['entries'][key] = {
+            'file': file_name,
+            'node_group': node_tree.name,
+            'size': os.path.getsize(filepath),
+            'last_used': time.time(),
+        }
+        evict_entries(library_dir, index, max_size)
+        write_index(library_dir, index)
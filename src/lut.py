@@ -0,0 +1,293 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+# GPLv3 License
+#
+# ColorRampConverter
+# Copyright (C) 2022-2026, Mark Elek, David Elek
+#
+# ColorRampConverter is a Blender addon that generates
+# custom node groups from color ramp nodes,
+# making a few parameters more accessible.
+#
+# This file is a part of ColorRampConverter.
+# ColorRampConverter is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# ColorRampConverter is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ColorRampConverter. If not, see <http://www.gnu.org/licenses/>.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# <pep8 compliant>
+
+import bpy
+import numpy as np
+from .evaluator import evaluate_ramp_data
+from .functions import (get_addon_prefs,
+                        get_color_ramp_data,
+                        get_color_ramp_data_hash,
+                        get_color_ramp_name,
+                        apply_color_ramp_data,
+                        get_node_type,
+                        get_node_group_type,
+                        create_node,
+                        create_node_group_input,
+                        create_node_group_output,
+                        instantiate_node_group,
+                        auto_link_replacement_node,
+                        is_node_group,
+                        remove_excess_extra_nodes,
+                        remove_node,
+                        set_node_label,
+                        set_node_location,
+                        set_node_name,
+                        set_node_width,
+                        transfer_stop_animation,
+                        )
+
+
+def get_lut_pixels(ramp_data, resolution):
+    """
+    Evaluate a ramp definition at the pixel centers of a lookup texture
+
+    :param ramp_data: The ramp definition to evaluate (see get_color_ramp_data)
+    :type ramp_data: dict
+    :param resolution: The number of pixels of the lookup texture
+    :type resolution: int
+    :return: RGBA pixels of the lookup texture
+    :rtype: numpy.ndarray of shape (resolution, 4)
+    """
+    # sample the pixel centers, so a linear texture lookup at 'Fac' matches the ramp
+    fac = (np.arange(resolution, dtype=np.float32) + 0.5) / resolution
+    return evaluate_ramp_data(ramp_data, fac)
+
+
+def get_lut_name(ramp_hash, resolution):
+    """
+    Get the name of the lookup texture data of a ramp definition
+
+    :param ramp_hash: The content hash of the ramp definition
+    :type ramp_hash: str
+    :param resolution: The number of pixels of the lookup texture
+    :type resolution: int
+    :return: The name of the lookup texture image
+    :rtype: str
+    """
+    return f'ColorRampLUT_{ramp_hash[:16]}_{resolution}'
+
+
+def get_lut_node_tree_name(ramp_hash, resolution, node_tree):
+    """
+    Get the name of the lookup texture node group of a ramp definition
+
+    :param ramp_hash: The content hash of the ramp definition
+    :type ramp_hash: str
+    :param resolution: The number of pixels of the lookup texture
+    :type resolution: int
+    :param node_tree: The node tree the node group will be used in
+    :type node_tree: bpy.types.NodeTree
+    :return: The name of the lookup texture node group
+    :rtype: str
+    """
+    return f'{get_lut_name(ramp_hash, resolution)}_{get_node_group_type(node_tree)}'
+
+
+def get_or_create_lut_image(ramp_data, resolution):
+    """
+    Get the lookup texture image of a ramp definition, bake it if it doesn't exist yet.
+    Identical ramps share the same image.
+
+    :param ramp_data: The ramp definition to bake (see get_color_ramp_data)
+    :type ramp_data: dict
+    :param resolution: The number of pixels of the lookup texture
+    :type resolution: int
+    :return: The lookup texture image
+    :rtype: bpy.types.Image
+    """
+    ramp_hash = get_color_ramp_data_hash(ramp_data)
+    image_name = get_lut_name(ramp_hash, resolution)
+
+    image = bpy.data.images.get(image_name)
+    if image is not None:
+        return image
+
+    image = bpy.data.images.new(image_name, width=resolution, height=1,
+                                alpha=True, float_buffer=True, is_data=True)
+    # keep the alpha channel independent from the colors
+    image.alpha_mode = 'CHANNEL_PACKED'
+    image.pixels.foreach_set(get_lut_pixels(ramp_data, resolution).ravel())
+    image.update()
+
+    # generated images are lost on save otherwise
+    image.pack()
+    image['color_ramp_hash'] = ramp_hash
+    return image
+
+
+def get_or_create_lut_node_tree(ramp_data, resolution, node_tree):
+    """
+    Get the lookup texture node group of a ramp definition, create it if it doesn't exist yet.
+    Identical ramps share the same node group.
+
+    :param ramp_data: The ramp definition to bake (see get_color_ramp_data)
+    :type ramp_data: dict
+    :param resolution: The number of pixels of the lookup texture
+    :type resolution: int
+    :param node_tree: The node tree the node group will be used in
+    :type node_tree: bpy.types.NodeTree
+    :return: The lookup texture node group
+    :rtype: bpy.types.NodeTree
+    """
+    node_tree_type = get_node_type(node_tree)
+    node_group_type = get_node_group_type(node_tree)
+    node_group_name = get_lut_node_tree_name(get_color_ramp_data_hash(ramp_data), resolution, node_tree)
+
+    lut_node_group = bpy.data.node_groups.get(node_group_name)
+    if lut_node_group is not None:
+        return lut_node_group
+
+    image = get_or_create_lut_image(ramp_data, resolution)
+    interpolation = 'Closest' if ramp_data['interpolation'] == 'CONSTANT' else 'Linear'
+
+    lut_node_group = bpy.data.node_groups.new(
+        node_group_name, f'{node_group_type}NodeTree')
+
+    create_node_group_input(lut_node_group, 'NodeSocketFloat',
+                            'Fac', ramp_data['fac'])
+    create_node_group_output(lut_node_group, 'NodeSocketColor', 'Color')
+
+    node_group_input_node = lut_node_group.nodes.new('NodeGroupInput')
+    node_group_input_node.location = (-600, 0)
+    node_group_output_node = lut_node_group.nodes.new('NodeGroupOutput')
+    node_group_output_node.location = (400, 0)
+
+    # (Fac, 0.5) addresses the single row of the lookup texture
+    combine_node = create_node(lut_node_group, f'{node_tree_type}NodeCombineXYZ',
+                               'Combine XYZ', (-400, 0))
+    combine_node.inputs[1].default_value = 0.5
+    lut_node_group.links.new(
+        node_group_input_node.outputs['Fac'], combine_node.inputs[0])
+
+    if node_group_type == 'Compositor':
+        image_node = create_node(lut_node_group, 'CompositorNodeImage',
+                                 'LUT', (-200, 200))
+        image_node.image = image
+        map_uv_node = create_node(lut_node_group, 'CompositorNodeMapUV',
+                                  'Map UV', (0, 0))
+        lut_node_group.links.new(
+            image_node.outputs['Image'], map_uv_node.inputs['Image'])
+        lut_node_group.links.new(
+            combine_node.outputs[0], map_uv_node.inputs['UV'])
+        lut_node_group.links.new(
+            map_uv_node.outputs[0], node_group_output_node.inputs['Color'])
+    else:
+        create_node_group_output(lut_node_group, 'NodeSocketFloat', 'Alpha')
+
+        if node_group_type == 'Geometry':
+            texture_node = create_node(lut_node_group, 'GeometryNodeImageTexture',
+                                       'LUT', (-200, 0))
+            texture_node.inputs['Image'].default_value = image
+        else:
+            texture_node = create_node(lut_node_group, 'ShaderNodeTexImage',
+                                       'LUT', (-200, 0))
+            texture_node.image = image
+
+        texture_node.interpolation = interpolation
+        texture_node.extension = 'EXTEND'
+
+        lut_node_group.links.new(
+            combine_node.outputs[0], texture_node.inputs['Vector'])
+        lut_node_group.links.new(
+            texture_node.outputs['Color'], node_group_output_node.inputs['Color'])
+        lut_node_group.links.new(
+            texture_node.outputs['Alpha'], node_group_output_node.inputs['Alpha'])
+
+    # keep the ramp definition to be able to convert back to a color ramp
+    lut_node_group['color_ramp_data'] = ramp_data
+    return lut_node_group
+
+
+def bake_node(node, node_tree, resolution):
+    """
+    Replace a color ramp node or converted node group with a lookup texture node group
+
+    :param node: The color ramp node or converted node group to bake
+    :type node: [bpy.types.ShaderNodeValToRGB, bpy.types.CompositeNodeValToRGB, bpy.types.NodeGroup]
+    :param node_tree: The node tree the node is in
+    :type node_tree: bpy.types.NodeTree
+    :param resolution: The number of pixels of the lookup texture
+    :type resolution: int
+    :return: The lookup texture node group
+    :rtype: bpy.types.NodeGroup
+    """
+    addon_prefs = get_addon_prefs()
+    node_group_type = get_node_group_type(node_tree)
+
+    ramp_data = get_color_ramp_data(node)
+    color_ramp_name = get_color_ramp_name(node)
+
+    lut_node_group = get_or_create_lut_node_tree(
+        ramp_data, resolution, node_tree)
+    lut_node = instantiate_node_group(
+        lut_node_group, node_group_type, f'Baked{color_ramp_name}', node_tree)
+    lut_node.inputs['Fac'].default_value = ramp_data['fac']
+    lut_node.is_baked = True
+
+    auto_link_replacement_node(node, node_tree, lut_node)
+    if addon_prefs.copy_width:
+        set_node_width(lut_node, node.width)
+    set_node_location(lut_node, node.location)
+
+    # only the factor can stay animated, the stops are baked
+    transfer_stop_animation(node, lut_node, node_tree)
+
+    if is_node_group(node) and addon_prefs.remove_extra_nodes:
+        remove_excess_extra_nodes(node_tree.nodes, node.name)
+    remove_node(node, node_tree)
+
+    lut_node.select = True
+    node_tree.nodes.active = lut_node
+    return lut_node
+
+
+def convert_lut_node(lut_node, node_tree):
+    """
+    Convert a lookup texture node group back to a color ramp node
+
+    :param lut_node: The lookup texture node group to convert
+    :type lut_node: bpy.types.NodeGroup
+    :param node_tree: The node tree to add the color ramp to
+    :type node_tree: bpy.types.NodeTree
+    :return: The created color ramp node
+    :rtype: [bpy.types.ShaderNodeValToRGB, bpy.types.CompositeNodeValToRGB]
+    """
+    addon_prefs = get_addon_prefs()
+    node_tree_type = get_node_type(node_tree)
+    ramp_data = lut_node.node_tree['color_ramp_data'].to_dict()
+
+    color_ramp_name = get_color_ramp_name(lut_node)
+    color_ramp_node = node_tree.nodes.new(type=f'{node_tree_type}NodeValToRGB')
+    set_node_name(color_ramp_node, color_ramp_name)
+    set_node_label(color_ramp_node, color_ramp_name)
+
+    apply_color_ramp_data(color_ramp_node, ramp_data)
+    color_ramp_node.inputs[0].default_value = lut_node.inputs[0].default_value
+
+    auto_link_replacement_node(lut_node, node_tree, color_ramp_node)
+    if addon_prefs.copy_width:
+        set_node_width(color_ramp_node, lut_node.width)
+    set_node_location(color_ramp_node, lut_node.location)
+
+    transfer_stop_animation(lut_node, color_ramp_node, node_tree)
+    remove_node(lut_node, node_tree)
+
+    color_ramp_node.select = True
+    node_tree.nodes.active = color_ramp_node
+    return color_ramp_node
@@ -0,0 +1,331 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+# GPLv3 License
+#
+# ColorRampConverter
+# Copyright (C) 2022-2026, Mark Elek, David Elek
+#
+# ColorRampConverter is a Blender addon that generates
+# custom node groups from color ramp nodes,
+# making a few parameters more accessible.
+#
+# This file is a part of ColorRampConverter.
+# ColorRampConverter is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# ColorRampConverter is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ColorRampConverter. If not, see <http://www.gnu.org/licenses/>.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# <pep8 compliant>
+
+import bpy
+import hashlib
+from .functions import CONVERTED_METADATA_KEY
+from .functions import get_all_node_trees
+from .functions import has_converted_metadata
+from .functions import is_color_ramp
+from .functions import is_converter_node_tree
+from .functions import is_node_group
+
+
+# node properties that only affect the look of the node editor
+NODE_UI_PROPERTIES = {
+    'name', 'label', 'location', 'location_absolute', 'width', 'height', 'dimensions',
+    'select', 'hide', 'show_options', 'show_preview', 'show_texture',
+    'use_custom_color', 'color', 'color_tag', 'parent', 'warning_propagation',
+}
+
+# rough in-memory size of the DNA structs of node trees, in bytes
+NODE_TREE_SIZE = 2048
+NODE_SIZE = 512
+SOCKET_SIZE = 384
+LINK_SIZE = 64
+
+# node tree pointer -> (signature, statistics) of the node trees counted by get_file_statistics
+statistics_cache = {}
+# pointers of the node trees edited since they were counted
+dirty_node_trees = set()
+
+
+def get_rna_values(rna_struct, skip=()):
+    """
+    Get the values of the editable RNA properties of a struct (node, socket, interface item)
+
+    :param rna_struct: The struct to get the values of
+    :type rna_struct: bpy.types.bpy_struct
+    :param skip: The identifiers of the properties to skip, defaults to ()
+    :type skip: set of str, optional
+    :return: Identifier and value pairs, datablocks are referenced by name
+    :rtype: list of tuples (str, object)
+    """
+    values = []
+    for rna_property in rna_struct.bl_rna.properties:
+        identifier = rna_property.identifier
+        if identifier in skip or identifier == 'rna_type' or rna_property.is_readonly:
+            continue
+
+        value = getattr(rna_struct, identifier, None)
+        if rna_property.type == 'POINTER':
+            # images, node trees, ... of texture and group nodes
+            value = getattr(value, 'name', None)
+        elif rna_property.type == 'COLLECTION':
+            continue
+        elif getattr(rna_property, 'is_array', False):
+            value = tuple(value)
+        elif isinstance(value, set):
+            # enum flags
+            value = tuple(sorted(value))
+        values.append((identifier, value))
+
+    return values
+
+
+def get_node_tree_structure_hash(node_tree):
+    """
+    Hash a node tree by structure (interface, nodes, settings, links) and socket defaults,
+    ignoring names of the node tree itself and the node editor layout
+
+    :param node_tree: The node tree to hash
+    :type node_tree: bpy.types.NodeTree
+    :return: The hex digest of the structure hash
+    :rtype: str
+    """
+    parts = [node_tree.bl_idname]
+
+    # ID properties (metadata record, ramp definition of baked node trees)
+    parts += [(key, repr(node_tree[key].to_dict() if hasattr(node_tree[key], 'to_dict')
+                         else node_tree[key]))
+              for key in sorted(node_tree.keys())]
+
+    # check blender version
+    if bpy.app.version < (4, 0, 0):
+        interface_items = list(node_tree.inputs) + list(node_tree.outputs)
+    else:
+        # blender 4.0 and above
+        interface_items = node_tree.interface.items_tree
+    parts += [get_rna_values(item) for item in interface_items]
+
+    for node in sorted(node_tree.nodes, key=lambda node: node.name):
+        parts.append((node.name, node.bl_idname, get_rna_values(node, NODE_UI_PROPERTIES)))
+
+        color_ramp = getattr(node, 'color_ramp', None)
+        if color_ramp is not None:
+            parts.append((color_ramp.color_mode, color_ramp.interpolation, color_ramp.hue_interpolation,
+                          [(element.position, tuple(element.color)) for element in color_ramp.elements]))
+
+        for socket in list(node.inputs) + list(node.outputs):
+            default_value = getattr(socket, 'default_value', None)
+            if hasattr(default_value, '__len__') and not isinstance(default_value, str):
+                default_value = tuple(default_value)
+            parts.append((socket.identifier, socket.enabled, getattr(default_value, 'name', default_value)))
+
+    parts += sorted((link.from_node.name, link.from_socket.identifier,
+                     link.to_node.name, link.to_socket.identifier, link.is_muted)
+                    for link in node_tree.links)
+
+    return hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+
+
+def estimate_node_tree_size(node_tree):
+    """
+    Estimate the memory a node tree takes
+
+    :param node_tree: The node tree to estimate the size of
+    :type node_tree: bpy.types.NodeTree
+    :return: The estimated size in bytes
+    :rtype: int
+    """
+    socket_count = sum(len(node.inputs) + len(node.outputs) for node in node_tree.nodes)
+    return (NODE_TREE_SIZE
+            + len(node_tree.nodes) * NODE_SIZE
+            + socket_count * SOCKET_SIZE
+            + len(node_tree.links) * LINK_SIZE)
+
+
+def get_duplicate_node_trees():
+    """
+    Group the structurally identical node trees created by the addon
+
+    :return: Survivor and duplicates pairs, only groups with duplicates are returned
+    :rtype: list of tuples (bpy.types.NodeTree, list of bpy.types.NodeTree)
+    """
+    groups = {}
+    for node_tree in bpy.data.node_groups:
+        # linked node trees can't be removed from this file
+        if node_tree.library is not None or not is_converter_node_tree(node_tree):
+            continue
+        key = (node_tree.bl_idname, get_node_tree_structure_hash(node_tree))
+        groups.setdefault(key, []).append(node_tree)
+
+    duplicate_groups = []
+    for node_trees in groups.values():
+        if len(node_trees) < 2:
+            continue
+        # keep the one without (or with the lowest) name suffix
+        node_trees.sort(key=lambda node_tree: (len(node_tree.name), node_tree.name))
+        duplicate_groups.append((node_trees[0], node_trees[1:]))
+
+    return duplicate_groups
+
+
+def deduplicate_node_trees():
+    """
+    Remap the users of structurally identical node trees created by the addon
+    to a single survivor and remove the rest
+
+    :return: The number of removed node trees and their estimated size in bytes
+    :rtype: tuple (int, int)
+    """
+    removed_count = 0
+    saved_size = 0
+    for survivor, duplicates in get_duplicate_node_trees():
+        for duplicate in duplicates:
+            saved_size += estimate_node_tree_size(duplicate)
+            duplicate.user_remap(survivor)
+            bpy.data.node_groups.remove(duplicate)
+            removed_count += 1
+
+    return removed_count, saved_size
+
+
+def get_node_tree_stop_count(node_tree):
+    """
+    Get the number of color stops of a converted or baked node tree
+
+    :param node_tree: The converted or baked node tree
+    :type node_tree: bpy.types.NodeTree
+    :return: The number of color stops, the number of stop slots of node trees with editable stops
+    :rtype: int
+    """
+    if has_converted_metadata(node_tree):
+        # the stops in use can differ between the node groups of the node tree, its slots don't
+        metadata = node_tree[CONVERTED_METADATA_KEY]
+        return metadata.get('capacity', metadata['stop_count'])
+    if 'color_ramp_data' in node_tree:
+        return len(node_tree['color_ramp_data']['positions'])
+
+    # converted with an older version, one color input per stop
+    group_input_node = node_tree.nodes.get('Group Input')
+    if group_input_node is None:
+        return 0
+    return sum(output.name.startswith('Color') for output in group_input_node.outputs)
+
+
+def get_node_tree_statistics(node_tree):
+    """
+    Get the statistics of a node tree, counted again only if it changed since the last call
+
+    :param node_tree: The node tree to get the statistics of
+    :type node_tree: bpy.types.NodeTree
+    :return: Color ramp and converted node counts of regular node trees,
+        node, link, stop counts and estimated size of converted or baked node trees
+    :rtype: dict
+    """
+    key = node_tree.as_pointer()
+    signature = (node_tree.name_full, len(node_tree.nodes), len(node_tree.links))
+
+    cached = statistics_cache.get(key)
+    if cached is not None and cached[0] == signature and key not in dirty_node_trees:
+        return cached[1]
+    dirty_node_trees.discard(key)
+
+    if is_converter_node_tree(node_tree):
+        statistics = {
+            'is_converter': True,
+            'nodes': len(node_tree.nodes),
+            'links': len(node_tree.links),
+            'stops': get_node_tree_stop_count(node_tree),
+            'estimated_size': estimate_node_tree_size(node_tree),
+        }
+    else:
+        statistics = {
+            'is_converter': False,
+            'color_ramps': sum(is_color_ramp(node) for node in node_tree.nodes),
+            'converted_nodes': sum(is_node_group(node) for node in node_tree.nodes),
+        }
+
+    statistics_cache[key] = (signature, statistics)
+    return statistics
+
+
+def mark_statistics_dirty(id_data):
+    """
+    Mark a node tree (or the node tree of a material, world, light) as edited
+
+    :param id_data: The edited datablock
+    :type id_data: bpy.types.ID
+    """
+    node_tree = getattr(id_data, 'node_tree', None)
+    if node_tree is not None:
+        dirty_node_trees.add(node_tree.as_pointer())
+    if isinstance(id_data, bpy.types.NodeTree):
+        dirty_node_trees.add(id_data.as_pointer())
+
+
+def clear_statistics_cache():
+    """
+    Forget the counted statistics, e.g. after loading another file
+    """
+    statistics_cache.clear()
+    dirty_node_trees.clear()
+
+
+def get_file_statistics(largest_count=5):
+    """
+    Get the conversion statistics of the file.
+    Only the node trees that changed since the last call are counted again
+
+    :param largest_count: The number of largest converted node trees to list, defaults to 5
+    :type largest_count: int, optional
+    :return: Counts of color ramps ('color_ramps'), converted nodes ('converted_nodes'),
+        converted or baked node trees ('converted_trees') and the ones without users ('orphaned_trees'),
+        the nodes ('generated_nodes') and links ('generated_links') of these trees, their estimated
+        size in bytes ('estimated_size') and the largest ones by stop count ('largest', (stops, name) pairs)
+    :rtype: dict
+    """
+    file_statistics = {
+        'color_ramps': 0,
+        'converted_nodes': 0,
+        'converted_trees': 0,
+        'orphaned_trees': 0,
+        'generated_nodes': 0,
+        'generated_links': 0,
+        'estimated_size': 0,
+        'largest': [],
+    }
+
+    counted_keys = set()
+    for node_tree in get_all_node_trees():
+        counted_keys.add(node_tree.as_pointer())
+        statistics = get_node_tree_statistics(node_tree)
+
+        if not statistics['is_converter']:
+            file_statistics['color_ramps'] += statistics['color_ramps']
+            file_statistics['converted_nodes'] += statistics['converted_nodes']
+            continue
+
+        file_statistics['converted_trees'] += 1
+        file_statistics['generated_nodes'] += statistics['nodes']
+        file_statistics['generated_links'] += statistics['links']
+        file_statistics['estimated_size'] += statistics['estimated_size']
+        file_statistics['largest'].append((statistics['stops'], node_tree.name))
+
+        # users are not cached, they change without editing the node tree
+        if node_tree.users - node_tree.use_fake_user <= 0:
+            file_statistics['orphaned_trees'] += 1
+
+    # forget removed node trees
+    for key in set(statistics_cache) - counted_keys:
+        del statistics_cache[key]
+
+    file_statistics['largest'] = sorted(file_statistics['largest'], reverse=True)[:largest_count]
+    return file_statistics
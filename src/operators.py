@@ -29,8 +29,152 @@
 
 import bpy
 from bpy.types import Operator
+from bpy.props import BoolProperty
+from bpy.props import EnumProperty
+from bpy.props import FloatVectorProperty
+from bpy.props import IntProperty
+from bpy.props import StringProperty
+from bpy_extras.io_utils import ExportHelper
+from bpy_extras.io_utils import ImportHelper
+import time
 import traceback
-from .functions import *
+from . import handlers
+from .lazy import lazy_import
+
+# imported on first use (poll, execute), not while registering the addon
+attributes = lazy_import('.attributes', __package__)
+cost = lazy_import('.cost', __package__)
+functions = lazy_import('.functions', __package__)
+interchange = lazy_import('.interchange', __package__)
+layout = lazy_import('.layout', __package__)
+lut = lazy_import('.lut', __package__)
+maintenance = lazy_import('.maintenance', __package__)
+osl = lazy_import('.osl', __package__)
+quantize = lazy_import('.quantize', __package__)
+
+# same as interchange.FILE_EXTENSION, not imported from there to keep the startup lazy
+FILE_EXTENSION = '.crramp'
+
+# the number of batches the interactive conversion splits each slice into
+SLICE_BATCH_COUNT = 4
+
+
+def convert_node(self, context, node, node_tree, node_layout=None):
+    """
+    Convert a color ramp node to a custom node group alternative and vice versa
+
+    :param context: context
+    :type context: bpy.context
+    :param node: The color ramp, converted or baked node group or OSL script node to convert
+    :type node: bpy.types.Node
+    :param node_tree: The node tree the node is in
+    :type node_tree: bpy.types.NodeTree
+    :param node_layout: Layout of the node tree to place the new nodes without overlaps, defaults to None
+    :type node_layout: layout.NodeLayout, optional
+    """
+    if functions.is_color_ramp(node):
+        color_ramp = node
+        functions.convert_color_ramp(
+            self, context, color_ramp, node_tree, node_layout)
+
+    elif functions.is_node_group(node):
+        node_group = node
+        functions.convert_node_group(node_group, node_tree)
+
+    elif functions.is_baked_lut(node):
+        lut_node = node
+        lut.convert_lut_node(lut_node, node_tree)
+
+    elif functions.is_osl_ramp(node):
+        osl_node = node
+        osl.convert_osl_node(osl_node, node_tree)
+
+
+def convert_nested_color_ramps(self, context, node_trees):
+    """
+    Convert every color ramp of the given node trees to a custom node group alternative
+
+    :param context: context
+    :type context: bpy.context
+    :param node_trees: The node trees to convert the color ramps in (see get_nested_node_trees)
+    :type node_trees: list of bpy.types.NodeTree
+    :return: The number of converted color ramps
+    :rtype: int
+    """
+    converted_count = 0
+    for node_tree in node_trees:
+        # collect names first, converting removes the color ramps from the tree
+        color_ramp_names = [node.name for node in node_tree.nodes
+                            if functions.is_color_ramp(node) and functions.is_valid_node(node)]
+        node_layout = layout.NodeLayout(node_tree)
+        node_groups = functions.convert_color_ramps(
+            self, context, [node_tree.nodes[name] for name in color_ramp_names], node_tree, node_layout)
+        converted_count += sum(node_group is not None for node_group in node_groups)
+
+    return converted_count
+
+
+def convert_nodes(self, context, nodes, node_tree, node_layout=None):
+    """
+    Convert nodes of the same node tree, color ramps are converted in one batch
+    (see convert_color_ramps), other nodes one by one
+
+    :param context: context
+    :type context: bpy.context
+    :param nodes: The color ramps, converted or baked node groups to convert
+    :type nodes: list of bpy.types.Node
+    :param node_tree: The node tree the nodes are in
+    :type node_tree: bpy.types.NodeTree
+    :param node_layout: Layout of the node tree to place the new nodes without overlaps, defaults to None
+    :type node_layout: layout.NodeLayout, optional
+    :return: The number of converted nodes
+    :rtype: int
+    """
+    color_ramps = [node for node in nodes
+                   if functions.is_color_ramp(node) and functions.is_valid_node(node)]
+    other_nodes = [node for node in nodes
+                   if not functions.is_color_ramp(node) and functions.is_valid_node(node)]
+
+    converted_count = 0
+    for node in other_nodes:
+        convert_node(self, context, node, node_tree, node_layout)
+        converted_count += 1
+
+    if color_ramps:
+        node_groups = functions.convert_color_ramps(
+            self, context, color_ramps, node_tree, node_layout)
+        converted_count += sum(node_group is not None for node_group in node_groups)
+
+    return converted_count
+
+
+def report_conversion_estimates(self, estimates):
+    """
+    Print the estimate of each color ramp and the totals of each node tree to the console,
+    report the totals of all
+
+    :param estimates: The estimates and totals (see cost.estimate_conversions)
+    :type estimates: dict
+    """
+    for estimate in estimates['color_ramps']:
+        print(f'  {estimate["node_tree"]} / {estimate["name"]}: {estimate["layout"]} '
+              f'({estimate["map_range_interpolation"]}, {estimate["builder"]}), '
+              f'{estimate["stops"]} stops in {estimate["slots"]} slots, '
+              f'{estimate["nodes"]} nodes, {estimate["links"]} links, {estimate["sockets"]} sockets, '
+              f'{estimate["extra_nodes"]} extra nodes, '
+              f'SVM {estimate["svm_cost"]} (color ramp {estimate["color_ramp_svm_cost"]})')
+
+    for node_tree_name, totals in estimates['node_trees'].items():
+        print(f'{node_tree_name}: {totals["color_ramps"]} color ramp(s), '
+              f'{totals["nodes"]} nodes, {totals["links"]} links, {totals["extra_nodes"]} extra nodes, '
+              f'SVM {totals["svm_cost"]} (color ramps {totals["color_ramp_svm_cost"]}), '
+              f'about {totals["estimated_size"] / 1024:.1f} KiB')
+
+    total = estimates['total']
+    self.report({'INFO'}, f'Dry run: {total["color_ramps"]} color ramp(s) would add '
+                f'{total["nodes"]} nodes, {total["links"]} links, {total["extra_nodes"]} extra nodes, '
+                f'SVM {total["svm_cost"]} (color ramps {total["color_ramp_svm_cost"]}), '
+                f'about {total["estimated_size"] / 1024:.1f} KiB (see console)')
 
 
 class WM_OT_ColorRampConverter(Operator):
@@ -46,7 +190,7 @@ class WM_OT_ColorRampConverter(Operator):
         """
         Check if any selected node is a valid node to convert
         """
-        return any_valid_node(context.selected_nodes)
+        return functions.any_valid_node(context.selected_nodes)
 
     def execute(self, context):
         """
@@ -54,24 +198,779 @@ class WM_OT_ColorRampConverter(Operator):
         """
         # = context.active_object.active_material.node_tree
         active_node_tree = context.space_data.edit_tree
+        selected_nodes = list(context.selected_nodes)
+        material_update_count = handlers.material_update_stats['count']
+
+        try:
+            # built once, every converted node is placed without overlaps in O(1) amortised
+            node_layout = layout.NodeLayout(active_node_tree)
+            converted_count = convert_nodes(
+                self, context, selected_nodes, active_node_tree, node_layout)
+
+        # catch *all* exceptions
+        except Exception as err:
+            traceback.print_exc()
+            return {'CANCELLED'}
+
+        handlers.record_material_updates(
+            f'Converted {converted_count} node(s)', material_update_count)
+        return {'FINISHED'}
+
+
+class WM_OT_ColorRampConverterModal(Operator):
+    """
+    Operator that converts color ramp nodes to custom node group alternatives and vice versa
+    in time-sliced steps, keeping the interface responsive. Press ESC to cancel
+    """
+    bl_idname = "wm.color_ramp_converter_modal"
+    bl_label = "Convert Color Ramps (Interactive)"
+    bl_options = {'REGISTER', 'INTERNAL', 'UNDO'}
+
+    @classmethod
+    def poll(cls, context):
+        """
+        Check if any selected node is a valid node to convert
+        """
+        return functions.any_valid_node(context.selected_nodes)
+
+    def invoke(self, context, event):
+        """
+        Queue the selected nodes and start converting them on a timer
+        """
+        window_manager = context.window_manager
+
+        self.node_tree = context.space_data.edit_tree
+        # queue names, node references don't survive removing nodes from the tree
+        self.queue = [node.name for node in context.selected_nodes
+                      if functions.is_valid_node(node)]
+        self.total = len(self.queue)
+        self.node_layout = layout.NodeLayout(self.node_tree)
+        self.material_update_count = handlers.material_update_stats['count']
+        self.converted_count = 0
+        self.batch_size = 1
+        self.frame_time_budget = functions.get_addon_prefs().frame_time_budget / 1000.0
+
+        window_manager.progress_begin(0, self.total)
+        self.timer = window_manager.event_timer_add(0.001, window=context.window)
+        window_manager.modal_handler_add(self)
+        return {'RUNNING_MODAL'}
+
+    def modal(self, context, event):
+        """
+        Convert the next slice of queued nodes on every timer event
+        """
+        if event.type == 'ESC':
+            # every node is converted completely or not at all, the file stays consistent
+            self.finish(context)
+            self.report(
+                {'WARNING'}, f'Cancelled after converting {self.converted_count} of {self.total} node(s)')
+            return {'FINISHED'} if self.converted_count else {'CANCELLED'}
+
+        if event.type != 'TIMER' or event.timer != self.timer:
+            return {'PASS_THROUGH'}
+
+        try:
+            self.convert_slice(context)
+
+        # catch *all* exceptions
+        except Exception as err:
+            traceback.print_exc()
+            self.finish(context)
+            return {'CANCELLED'}
+
+        if not self.queue:
+            self.finish(context)
+            self.report({'INFO'}, f'Converted {self.converted_count} node(s)')
+            return {'FINISHED'}
+
+        return {'RUNNING_MODAL'}
+
+    def convert_slice(self, context):
+        """
+        Convert queued nodes in batches until the batch size or the frame time budget is reached,
+        then adapt the batch size to the measured conversion time
+        """
+        start_time = time.perf_counter()
+        processed_count = 0
+
+        # the nodes of a batch are converted at once, the node tree is updated once per batch.
+        # A slice has a few batches, so a mis-sized slice still stops at the frame time budget
+        build_batch_size = max(1, self.batch_size // SLICE_BATCH_COUNT)
+        while self.queue and processed_count < self.batch_size:
+            node_names = self.queue[:min(build_batch_size, self.batch_size - processed_count)]
+            del self.queue[:len(node_names)]
+            nodes = [self.node_tree.nodes.get(node_name) for node_name in node_names]
+            nodes = [node for node in nodes if node is not None]
+
+            self.converted_count += convert_nodes(
+                self, context, nodes, self.node_tree, self.node_layout)
+            processed_count += len(node_names)
+
+            if time.perf_counter() - start_time >= self.frame_time_budget:
+                break
+
+        elapsed_time = time.perf_counter() - start_time
+        time_per_node = elapsed_time / max(processed_count, 1)
+        self.batch_size = int(functions.clamp_value(
+            self.frame_time_budget / max(time_per_node, 1e-6), 1, 1000))
+
+        done = self.total - len(self.queue)
+        context.window_manager.progress_update(done)
+        context.workspace.status_text_set(
+            f'Converting color ramps: {done}/{self.total} (ESC to cancel)')
+
+    def finish(self, context):
+        """
+        Remove the timer and clear the progress indicators
+        """
+        window_manager = context.window_manager
+        window_manager.event_timer_remove(self.timer)
+        window_manager.progress_end()
+        context.workspace.status_text_set(None)
+
+        handlers.record_material_updates(
+            f'Converted {self.converted_count} node(s) interactively', self.material_update_count)
+
+
+class WM_OT_ConvertNestedColorRamps(Operator):
+    """
+    Operator that converts the color ramps of nested node groups,
+    converting node trees shared by several group nodes only once
+    """
+    bl_idname = "wm.convert_nested_color_ramps"
+    bl_label = "Convert Nested Color Ramps"
+    bl_options = {'REGISTER', 'INTERNAL', 'UNDO'}
+
+    scope: EnumProperty(
+        name="Scope",
+        description="Where to look for color ramps",
+        items=[
+            ('SELECTED', 'Selected', "Convert the selected color ramps and the color ramps "
+                                     "of every node group nested in the selected group nodes"),
+            ('FILE', 'File', "Convert the color ramps of every node tree of the file"),
+        ],
+        default='SELECTED',
+    )
+
+    @classmethod
+    def poll(cls, context):
+        """
+        Check if there is an active node tree
+        """
+        space_data = context.space_data
+        return getattr(space_data, 'edit_tree', None) is not None
+
+    def execute(self, context):
+        """
+        Convert the color ramps of the selected or all node trees, nested ones included,
+        and report the unique node trees compared with the group node references
+        """
+        if self.scope == 'SELECTED':
+            selected_nodes = list(context.selected_nodes or [])
+            node_trees, reference_count = functions.get_nested_node_trees(selected_nodes)
+        else:
+            selected_nodes = []
+            node_trees, reference_count = functions.get_nested_node_trees(
+                [], functions.get_all_node_trees())
+
+        try:
+            active_node_tree = context.space_data.edit_tree
+            node_layout = layout.NodeLayout(active_node_tree)
+            selected_color_ramps = [node for node in selected_nodes if functions.is_color_ramp(node)]
+            converted_count = convert_nodes(
+                self, context, selected_color_ramps, active_node_tree, node_layout)
+
+            converted_count += convert_nested_color_ramps(self, context, node_trees)
+
+        # catch *all* exceptions
+        except Exception as err:
+            traceback.print_exc()
+            return {'CANCELLED'}
+
+        self.report({'INFO'}, f'Converted {converted_count} color ramp(s) in {len(node_trees)} '
+                    f'unique node tree(s), {reference_count} group node reference(s) found')
+        return {'FINISHED'}
+
+
+class WM_OT_BakeColorRampLUT(Operator):
+    """
+    Operator that bakes color ramp nodes and converted node groups to lookup texture node groups
+    """
+    bl_idname = "wm.bake_color_ramp_lut"
+    bl_label = "Bake Color Ramp to Lookup Texture"
+    bl_options = {'REGISTER', 'INTERNAL', 'UNDO'}
+
+    @classmethod
+    def poll(cls, context):
+        """
+        Check if any selected node is a color ramp or converted node group
+        """
+        return (functions.any_color_ramp_node(context.selected_nodes)
+                or functions.any_converted_node_group(context.selected_nodes))
+
+    def execute(self, context):
+        """
+        Bake color ramp nodes and converted node groups to lookup texture node groups
+        """
+        active_node_tree = context.space_data.edit_tree
         selected_nodes = context.selected_nodes
+        resolution = int(context.scene.lut_resolution)
+
+        baked_count = 0
+        skipped_count = 0
+        try:
+            for selected_node in selected_nodes:
+                if functions.is_fused_node_group(selected_node):
+                    # a lookup texture holds a single color ramp
+                    skipped_count += 1
+                elif functions.is_color_ramp(selected_node) or functions.is_node_group(selected_node):
+                    lut.bake_node(selected_node, active_node_tree, resolution)
+                    baked_count += 1
+
+        # catch *all* exceptions
+        except Exception as err:
+            traceback.print_exc()
+            return {'CANCELLED'}
+
+        if skipped_count:
+            self.report({'WARNING'}, f'Baked {baked_count} node(s) to lookup textures, '
+                        f'{skipped_count} fused node group(s) skipped')
+            return {'FINISHED'}
+
+        self.report({'INFO'}, f'Baked {baked_count} node(s) to lookup textures')
+        return {'FINISHED'}
+
+
+class WM_OT_BakeColorRampAttribute(Operator):
+    """
+    Operator that bakes the active color ramp or converted node group to color attributes of the selected meshes
+    """
+    bl_idname = "wm.bake_color_ramp_attribute"
+    bl_label = "Bake Color Ramp to Color Attribute"
+    bl_options = {'REGISTER', 'INTERNAL', 'UNDO'}
+
+    source: StringProperty(
+        name="Fac",
+        description="The float attribute or vertex group of the meshes used as the factor",
+    )
+
+    attribute_name: StringProperty(
+        name="Color Attribute",
+        description="The name of the color attribute to write to",
+        default="ColorRamp",
+    )
+
+    domain: EnumProperty(
+        name="Domain",
+        description="The domain of the color attribute",
+        items=[
+            ('CORNER', "Face Corner", "A color for each face corner"),
+            ('POINT', "Vertex", "A color for each vertex"),
+        ],
+        default='CORNER',
+    )
+
+    data_type: EnumProperty(
+        name="Data Type",
+        description="The type of the color attribute",
+        items=[
+            ('FLOAT_COLOR', "Color", "32-bit floating point values"),
+            ('BYTE_COLOR', "Byte Color", "8-bit values, smaller for game export"),
+        ],
+        default='FLOAT_COLOR',
+    )
+
+    replace_node: BoolProperty(
+        name="Replace Node",
+        description="Replace the node with nodes reading the baked colors "
+                    "(color attribute nodes in shader, named attribute nodes in geometry node trees)",
+        default=False,
+    )
+
+    @classmethod
+    def poll(cls, context):
+        """
+        Check if the active node is a color ramp or converted node group and any mesh is selected
+        """
+        return (functions.is_valid_node(context.active_node)
+                and any(obj.type == 'MESH' for obj in context.selected_objects))
+
+    def invoke(self, context, event):
+        """
+        Show the settings
+        """
+        return context.window_manager.invoke_props_dialog(self)
+
+    def execute(self, context):
+        """
+        Bake the active color ramp or converted node group to color attributes of the selected meshes
+        """
+        active_node_tree = context.space_data.edit_tree
+        node = context.active_node
+        objects = [obj for obj in context.selected_objects if obj.type == 'MESH']
+
+        if self.replace_node and not attributes.can_replace_with_attribute_nodes(active_node_tree):
+            self.report({'ERROR'}, 'Replace Node only works in shader and geometry node trees')
+            return {'CANCELLED'}
+
+        start_time = time.perf_counter()
+        try:
+            attribute_names, mesh_count, value_count = attributes.bake_node_to_attributes(
+                node, objects, self.source, self.attribute_name, self.domain, self.data_type)
+            if self.replace_node:
+                attributes.replace_with_attribute_nodes(node, active_node_tree, attribute_names)
+
+        # catch *all* exceptions
+        except Exception as err:
+            traceback.print_exc()
+            self.report({'ERROR'}, str(err))
+            return {'CANCELLED'}
+
+        elapsed_time = time.perf_counter() - start_time
+        self.report({'INFO'}, f'Baked {len(attribute_names)} color attribute(s) on {mesh_count} mesh(es), '
+                    f'{value_count} value(s) in {elapsed_time*1000:.0f} ms')
+        return {'FINISHED'}
+
 
+class WM_OT_ConvertColorRampOSL(Operator):
+    """
+    Operator that replaces color ramp nodes and converted node groups with OSL script nodes
+    """
+    bl_idname = "wm.convert_color_ramp_osl"
+    bl_label = "Convert Color Ramp to OSL Script"
+    bl_options = {'REGISTER', 'INTERNAL', 'UNDO'}
+
+    @classmethod
+    def poll(cls, context):
+        """
+        Check if any selected node of a shader node tree is a color ramp or converted node group
+        """
+        edit_tree = context.space_data.edit_tree
+        return (edit_tree is not None and edit_tree.bl_idname == 'ShaderNodeTree'
+                and (functions.any_color_ramp_node(context.selected_nodes)
+                     or functions.any_converted_node_group(context.selected_nodes)))
+
+    def execute(self, context):
+        """
+        Replace color ramp nodes and converted node groups with OSL script nodes
+        """
+        active_node_tree = context.space_data.edit_tree
+        selected_nodes = list(context.selected_nodes)
+
+        converted_count = 0
+        failed_count = 0
         try:
             for selected_node in selected_nodes:
-                if is_color_ramp(selected_node):
-                    color_ramp = selected_node
-                    convert_color_ramp(
-                        self, context, color_ramp, active_node_tree)
+                if functions.is_fused_node_group(selected_node):
+                    # a script node holds a single color ramp
+                    failed_count += 1
+                elif functions.is_color_ramp(selected_node) or functions.is_node_group(selected_node):
+                    if osl.convert_to_osl_node(selected_node, active_node_tree) is None:
+                        failed_count += 1
+                    else:
+                        converted_count += 1
+
+        # catch *all* exceptions
+        except Exception as err:
+            traceback.print_exc()
+            return {'CANCELLED'}
+
+        if failed_count:
+            self.report({'WARNING'}, f'Converted {converted_count} node(s) to OSL scripts, '
+                        f'{failed_count} skipped (fused or not compiled)')
+        elif not osl.is_osl_enabled(context.scene):
+            self.report({'WARNING'}, f'Converted {converted_count} node(s) to OSL scripts, '
+                        'enable Open Shading Language (Cycles, CPU) to render them')
+        else:
+            self.report({'INFO'}, f'Converted {converted_count} node(s) to OSL scripts')
+        return {'FINISHED'}
+
+
+class WM_OT_VerifyColorRampConversion(Operator):
+    """
+    Operator that compares color ramps with the node groups they are (or would be) converted to
+    """
+    bl_idname = "wm.verify_color_ramp_conversion"
+    bl_label = "Verify Color Ramp Conversion"
+    bl_options = {'REGISTER', 'INTERNAL'}
+
+    scope: EnumProperty(
+        name="Scope",
+        description="The nodes to verify",
+        items=[
+            ('SELECTED', 'Selected', "Verify the selected nodes"),
+            ('FILE', 'File', "Verify every color ramp and converted node group of the file"),
+        ],
+        default='SELECTED',
+    )
+
+    def execute(self, context):
+        """
+        Verify the conversion of color ramps and converted node groups,
+        print the error of each node to the console and report the totals
+        """
+        addon_prefs = functions.get_addon_prefs()
+
+        if self.scope == 'SELECTED':
+            nodes = list(context.selected_nodes or [])
+        else:
+            nodes = [node for node_tree in functions.get_all_node_trees()
+                     if not node_tree.name.startswith('Converted')
+                     for node in node_tree.nodes]
+
+        try:
+            results = functions.verify_conversions(nodes)
+
+        # catch *all* exceptions
+        except Exception as err:
+            traceback.print_exc()
+            return {'CANCELLED'}
+
+        if not results:
+            self.report({'WARNING'}, 'No color ramps or converted node groups to verify')
+            return {'CANCELLED'}
+
+        above_threshold_count = 0
+        for name, conversion_layout, max_error, mean_error in results:
+            above_threshold = max_error > addon_prefs.max_conversion_error
+            above_threshold_count += above_threshold
+            print(f'{"!" if above_threshold else " "} {name}: {conversion_layout}, '
+                  f'max error {max_error:.5f}, mean error {mean_error:.5f}')
+
+        worst_error = max(result[2] for result in results)
+        self.report({'WARNING'} if above_threshold_count else {'INFO'},
+                    f'Verified {len(results)} node(s), worst max error {worst_error:.4f}, '
+                    f'{above_threshold_count} above the threshold (see console)')
+        return {'FINISHED'}
+
+
+class WM_OT_EstimateColorRampConversion(Operator):
+    """
+    Operator that estimates what converting color ramps would add, without changing anything
+    """
+    bl_idname = "wm.estimate_color_ramp_conversion"
+    bl_label = "Estimate Color Ramp Conversion"
+    bl_options = {'REGISTER', 'INTERNAL'}
+
+    scope: EnumProperty(
+        name="Scope",
+        description="The color ramps to estimate the conversion of",
+        items=[
+            ('SELECTED', 'Selected', "Estimate the selected color ramps"),
+            ('FILE', 'File', "Estimate every color ramp of the file"),
+        ],
+        default='SELECTED',
+    )
+
+    def execute(self, context):
+        """
+        Estimate the conversion of color ramps, print each estimate and the node tree totals
+        to the console and report the totals
+        """
+        try:
+            if self.scope == 'SELECTED':
+                estimates = cost.estimate_conversions(list(context.selected_nodes or []))
+            else:
+                estimates = cost.estimate_file_conversions()
+
+        # catch *all* exceptions
+        except Exception as err:
+            traceback.print_exc()
+            return {'CANCELLED'}
+
+        if not estimates['color_ramps']:
+            self.report({'WARNING'}, 'No color ramps to estimate')
+            return {'CANCELLED'}
+
+        report_conversion_estimates(self, estimates)
+        return {'FINISHED'}
+
+
+class WM_OT_DeduplicateConvertedNodeGroups(Operator):
+    """
+    Operator that merges structurally identical converted and baked node trees of the file
+    """
+    bl_idname = "wm.deduplicate_converted_node_groups"
+    bl_label = "Deduplicate Converted Node Groups"
+    bl_options = {'REGISTER', 'INTERNAL', 'UNDO'}
+
+    def execute(self, context):
+        """
+        Remap the users of identical node trees to a single node tree, remove the rest
+        and report the datablocks and memory saved
+        """
+        try:
+            removed_count, saved_size = maintenance.deduplicate_node_trees()
+
+        # catch *all* exceptions
+        except Exception as err:
+            traceback.print_exc()
+            return {'CANCELLED'}
 
-                elif is_node_group(selected_node):
-                    node_group = selected_node
-                    convert_node_group(node_group, active_node_tree)
+        if not removed_count:
+            self.report({'INFO'}, 'No duplicate node groups found')
+            return {'FINISHED'}
+
+        self.report({'INFO'}, f'Removed {removed_count} duplicate node group(s), '
+                    f'about {saved_size / 1024:.1f} KiB saved')
+        return {'FINISHED'}
+
+
+class WM_OT_ExportColorRamps(Operator, ExportHelper):
+    """
+    Operator that exports color ramps, converted and baked node groups to a color ramp file
+    """
+    bl_idname = "wm.export_color_ramps"
+    bl_label = "Export Color Ramps"
+    bl_options = {'REGISTER', 'INTERNAL'}
+
+    filename_ext = FILE_EXTENSION
+    filter_glob: StringProperty(default=f'*{FILE_EXTENSION}', options={'HIDDEN'})
+
+    scope: EnumProperty(
+        name="Scope",
+        description="The color ramps to export",
+        items=[
+            ('SELECTED', 'Selected', "Export the selected nodes"),
+            ('FILE', 'File', "Export every color ramp, converted and baked node group of the file"),
+        ],
+        default='SELECTED',
+    )
+
+    def execute(self, context):
+        """
+        Export color ramps, converted and baked node groups to a color ramp file
+        """
+        nodes = None
+        if self.scope == 'SELECTED':
+            nodes = [node for node in (context.selected_nodes or [])
+                     if interchange.is_exportable(node)]
+            if not nodes:
+                self.report({'WARNING'}, 'No color ramps or node groups selected')
+                return {'CANCELLED'}
+
+        try:
+            ramp_count = interchange.export_color_ramps(self.filepath, nodes)
+
+        # catch *all* exceptions
+        except Exception as err:
+            traceback.print_exc()
+            self.report({'ERROR'}, str(err))
+            return {'CANCELLED'}
+
+        self.report({'INFO'}, f'Exported {ramp_count} color ramp(s)')
+        return {'FINISHED'}
+
+
+class WM_OT_ImportColorRamps(Operator, ImportHelper):
+    """
+    Operator that imports the color ramps of a color ramp file to the active node tree
+    """
+    bl_idname = "wm.import_color_ramps"
+    bl_label = "Import Color Ramps"
+    bl_options = {'REGISTER', 'INTERNAL', 'UNDO'}
+
+    filename_ext = FILE_EXTENSION
+    filter_glob: StringProperty(default=f'*{FILE_EXTENSION}', options={'HIDDEN'})
+
+    as_node_groups: BoolProperty(
+        name="As Node Groups",
+        description="Create converted node groups instead of color ramp nodes",
+        default=False,
+    )
+
+    @classmethod
+    def poll(cls, context):
+        """
+        Check if there is an active node tree to import to
+        """
+        space_data = context.space_data
+        return getattr(space_data, 'edit_tree', None) is not None
+
+    def execute(self, context):
+        """
+        Import the color ramps of a color ramp file to the active node tree
+        """
+        active_node_tree = context.space_data.edit_tree
+
+        try:
+            ramp_count = interchange.import_color_ramps(self, context, self.filepath, active_node_tree,
+                                                        as_node_groups=self.as_node_groups,
+                                                        location=context.space_data.cursor_location)
+
+        # catch *all* exceptions
+        except Exception as err:
+            traceback.print_exc()
+            self.report({'ERROR'}, str(err))
+            return {'CANCELLED'}
+
+        self.report({'INFO'}, f'Imported {ramp_count} color ramp(s)')
+        return {'FINISHED'}
+
+
+class WM_OT_ColorRampFromImage(Operator):
+    """
+    Operator that creates a color ramp (or converted node group) from the quantised colors of an image
+    """
+    bl_idname = "wm.color_ramp_from_image"
+    bl_label = "Color Ramp from Image"
+    bl_options = {'REGISTER', 'INTERNAL', 'UNDO'}
+
+    image: StringProperty(
+        name="Image",
+        description="The image to take the colors from",
+    )
+
+    color_count: IntProperty(
+        name="Colors",
+        description="The most color stops of the color ramp",
+        default=8,
+        min=2,
+        max=32,
+    )
+
+    method: EnumProperty(
+        name="Method",
+        description="How the colors of the image are quantised",
+        items=[
+            ('KMEANS', "K-Means", "Cluster the colors, best fit"),
+            ('MEDIAN_CUT', "Median Cut", "Split the color space at the median, faster"),
+        ],
+        default='KMEANS',
+    )
+
+    order: EnumProperty(
+        name="Order",
+        description="How the colors are ordered along the color ramp",
+        items=[
+            ('LUMINANCE', "Luminance", "From dark to bright, evenly spaced"),
+            ('PATH', "Path", "Where the path through the image crosses the colors, "
+                             "colors the path doesn't cross are left out"),
+        ],
+        default='LUMINANCE',
+    )
+
+    interpolation: EnumProperty(
+        name="Interpolation",
+        description="The interpolation of the color ramp",
+        items=[
+            ('LINEAR', "Linear", "Blend the colors"),
+            ('CONSTANT', "Constant", "Palette of flat colors"),
+        ],
+        default='LINEAR',
+    )
+
+    region_min: FloatVectorProperty(
+        name="Region Min",
+        description="The lower left corner of the quantised region of the image",
+        size=2,
+        default=(0.0, 0.0),
+        min=0.0,
+        max=1.0,
+    )
+
+    region_max: FloatVectorProperty(
+        name="Region Max",
+        description="The upper right corner of the quantised region of the image",
+        size=2,
+        default=(1.0, 1.0),
+        min=0.0,
+        max=1.0,
+    )
+
+    path_start: FloatVectorProperty(
+        name="Path Start",
+        description="The start of the path through the image",
+        size=2,
+        default=(0.0, 0.5),
+        min=0.0,
+        max=1.0,
+    )
+
+    path_end: FloatVectorProperty(
+        name="Path End",
+        description="The end of the path through the image",
+        size=2,
+        default=(1.0, 0.5),
+        min=0.0,
+        max=1.0,
+    )
+
+    as_node_group: BoolProperty(
+        name="As Node Group",
+        description="Create a converted node group instead of a color ramp node",
+        default=False,
+    )
+
+    @classmethod
+    def poll(cls, context):
+        """
+        Check if there is an active node tree to create the color ramp in
+        """
+        space_data = context.space_data
+        return getattr(space_data, 'edit_tree', None) is not None
+
+    def invoke(self, context, event):
+        """
+        Use the image of the active image texture node, then show the settings
+        """
+        active_node = context.active_node
+        image = getattr(active_node, 'image', None)
+        if image is not None:
+            self.image = image.name
+        return context.window_manager.invoke_props_dialog(self)
+
+    def draw(self, context):
+        """
+        Draw the settings
+        """
+        layout = self.layout
+        layout.prop_search(self, 'image', bpy.data, 'images')
+        layout.prop(self, 'color_count')
+        layout.prop(self, 'method')
+        layout.prop(self, 'interpolation')
+        layout.prop(self, 'region_min')
+        layout.prop(self, 'region_max')
+        layout.prop(self, 'order')
+        if self.order == 'PATH':
+            layout.prop(self, 'path_start')
+            layout.prop(self, 'path_end')
+        layout.prop(self, 'as_node_group')
+
+    def execute(self, context):
+        """
+        Create a color ramp (or converted node group) from the quantised colors of an image
+        """
+        active_node_tree = context.space_data.edit_tree
+        image = bpy.data.images.get(self.image)
+        if image is None:
+            self.report({'ERROR'}, 'No image selected')
+            return {'CANCELLED'}
+
+        start_time = time.perf_counter()
+        try:
+            node, stop_count = quantize.create_color_ramp_from_image(
+                self, context, image, active_node_tree,
+                as_node_group=self.as_node_group,
+                location=context.space_data.cursor_location,
+                color_count=self.color_count,
+                method=self.method,
+                order=self.order,
+                interpolation=self.interpolation,
+                region_min=self.region_min,
+                region_max=self.region_max,
+                path_start=self.path_start,
+                path_end=self.path_end)
 
         # catch *all* exceptions
         except Exception as err:
             traceback.print_exc()
+            self.report({'ERROR'}, str(err))
             return {'CANCELLED'}
 
+        elapsed_time = time.perf_counter() - start_time
+        self.report({'INFO'}, f'Created "{node.name}" with {stop_count} color stop(s) '
+                    f'in {elapsed_time*1000:.0f} ms')
         return {'FINISHED'}
 
 
@@ -87,7 +986,7 @@ class WM_OT_ResetSettings(Operator):
         """
         Reset all addon preferences to default values
         """
-        addon_prefs = get_addon_prefs()
+        addon_prefs = functions.get_addon_prefs()
         props = addon_prefs.__annotations__.keys()
         for p in props:
             addon_prefs.property_unset(p)
@@ -102,6 +1001,17 @@ class WM_OT_ResetSettings(Operator):
 
 classes = [
     WM_OT_ColorRampConverter,
+    WM_OT_ColorRampConverterModal,
+    WM_OT_ConvertNestedColorRamps,
+    WM_OT_BakeColorRampLUT,
+    WM_OT_ConvertColorRampOSL,
+    WM_OT_BakeColorRampAttribute,
+    WM_OT_VerifyColorRampConversion,
+    WM_OT_EstimateColorRampConversion,
+    WM_OT_DeduplicateConvertedNodeGroups,
+    WM_OT_ExportColorRamps,
+    WM_OT_ImportColorRamps,
+    WM_OT_ColorRampFromImage,
     WM_OT_ResetSettings,
 
 ]
@@ -0,0 +1,364 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+# GPLv3 License
+#
+# ColorRampConverter
+# Copyright (C) 2022-2026, Mark Elek, David Elek
+#
+# ColorRampConverter is a Blender addon that generates
+# custom node groups from color ramp nodes,
+# making a few parameters more accessible.
+#
+# This file is a part of ColorRampConverter.
+# ColorRampConverter is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# ColorRampConverter is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ColorRampConverter. If not, see <http://www.gnu.org/licenses/>.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# <pep8 compliant>
+
+import bpy
+from .evaluator import CARDINAL_TENSION
+from .functions import (get_addon_prefs,
+                        get_color_ramp_data,
+                        get_color_ramp_data_hash,
+                        get_color_ramp_name,
+                        apply_color_ramp_data,
+                        get_node_type,
+                        auto_link_replacement_node,
+                        is_node_group,
+                        remove_excess_extra_nodes,
+                        remove_node,
+                        set_node_label,
+                        set_node_location,
+                        set_node_name,
+                        set_node_width,
+                        transfer_stop_animation,
+                        )
+
+
+# conditions to wrap the first (right) or the second (left) hue around, see evaluator.interpolate_hue
+HUE_WRAP_CONDITIONS = {
+    'NEAR': ('h1 < h2 && h2 - h1 > 0.5', 'h1 > h2 && h2 - h1 < -0.5'),
+    'FAR': ('h1 == h2 || (h1 < h2 && h2 - h1 < 0.5)', 'h1 > h2 && h2 - h1 > -0.5'),
+    'CCW': ('0', 'h1 > h2'),
+    'CW': ('h1 < h2', '0'),
+}
+
+# color spaces of the OSL color transformations
+OSL_COLOR_SPACES = {
+    'HSV': 'hsv',
+    'HSL': 'hsl',
+}
+
+OSL_TEMPLATE = '''\
+// Generated by Color Ramp Converter, changes are lost when the color ramp is converted again.
+// The segment of Fac is located with a binary search over the stop positions.
+
+float hue_mod(float h)
+{{
+    return h < 1.0 ? h : h - 1.0;
+}}
+
+shader {shader_name}(
+    float Fac = {fac},
+    output color Color = 0.0,
+    output float Alpha = 1.0)
+{{
+    float positions[{count}] = {{{positions}}};
+    color colors[{count}] = {{{colors}}};
+    float alphas[{count}] = {{{alphas}}};
+
+    // index of the first stop with a position greater than Fac
+    int low = 0;
+    int high = {count};
+    while (low < high) {{
+        int middle = (low + high) / 2;
+        if (positions[middle] > Fac)
+            high = middle;
+        else
+            low = middle + 1;
+    }}
+    int a = low;
+
+    // stops on the right and on the left of Fac,
+    // virtual stops at 0.0 and 1.0 before the first and after the last stop
+    int ri = min(a, {last});
+    int li = max(a - 1, 0);
+    float rp = a == {count} ? 1.0 : positions[ri];
+    float lp = a == 0 ? 0.0 : positions[li];
+
+    // factor from the right stop (0.0) to the left stop (1.0)
+    float span = lp - rp;
+    float t = span != 0.0 ? (Fac - rp) / span : (a == {count} ? 1.0 : 0.0);
+
+{interpolation}
+}}
+'''
+
+SPLINE_TEMPLATE = '''\
+    // the spline uses the neighbouring stops too
+    int next_index = a >= {last} ? ri : min(a + 1, {last});
+    int previous_index = a < 2 ? li : a - 2;
+
+    t = clamp(t, 0.0, 1.0);
+    float t2 = t * t;
+    float t3 = t2 * t;
+{weights}
+    Color = clamp(w3 * colors[previous_index] + w2 * colors[li] + w1 * colors[ri] + w0 * colors[next_index], 0.0, 1.0);
+    Alpha = clamp(w3 * alphas[previous_index] + w2 * alphas[li] + w1 * alphas[ri] + w0 * alphas[next_index], 0.0, 1.0);'''
+
+SPLINE_WEIGHTS = {
+    'B_SPLINE': '''\
+    float w0 = -1.0 / 6.0 * t3 + 0.5 * t2 - 0.5 * t + 1.0 / 6.0;
+    float w1 = 0.5 * t3 - t2 + 2.0 / 3.0;
+    float w2 = -0.5 * t3 + 0.5 * t2 + 0.5 * t + 1.0 / 6.0;
+    float w3 = 1.0 / 6.0 * t3;''',
+    'CARDINAL': '''\
+    float fc = {tension};
+    float w0 = -fc * t3 + 2.0 * fc * t2 - fc * t;
+    float w1 = (2.0 - fc) * t3 + (fc - 3.0) * t2 + 1.0;
+    float w2 = (fc - 2.0) * t3 + (3.0 - 2.0 * fc) * t2 + fc * t;
+    float w3 = fc * t3 - fc * t2;'''.format(tension=CARDINAL_TENSION),
+}
+
+MIX_TEMPLATE = '''\
+{ease}    float mfac = 1.0 - t;
+{mix}
+    Alpha = mfac * alphas[ri] + t * alphas[li];
+
+    // constant color after the last and before the first stop (the first stop takes precedence)
+    if (a == {count}) {{
+        Color = colors[{last}];
+        Alpha = alphas[{last}];
+    }}
+    if (Fac <= positions[0]) {{
+        Color = colors[0];
+        Alpha = alphas[0];
+    }}'''
+
+HUE_MIX_TEMPLATE = '''\
+    color c1 = transformc("{space}", colors[ri]);
+    color c2 = transformc("{space}", colors[li]);
+    color mixed = mfac * c1 + t * c2;
+
+    float h1 = hue_mod(c1[0]);
+    float h2 = hue_mod(c2[0]);
+    if ({wrap_first})
+        mixed[0] = hue_mod(mfac * (h1 + 1.0) + t * h2);
+    else if ({wrap_second})
+        mixed[0] = hue_mod(mfac * h1 + t * (h2 + 1.0));
+    else
+        mixed[0] = mfac * h1 + t * h2;
+    Color = transformc("{space}", "rgb", mixed);'''
+
+
+def format_osl_float(value):
+    """
+    Format a number as an OSL float literal
+
+    :param value: The number to format
+    :type value: float
+    :return: The float literal
+    :rtype: str
+    """
+    literal = f'{value:.9g}'
+    if not any(character in literal for character in '.en'):
+        literal += '.0'
+    return literal
+
+
+def get_osl_shader_name(ramp_hash):
+    """
+    Get the name of the OSL shader (and script text) of a ramp definition
+
+    :param ramp_hash: The content hash of the ramp definition
+    :type ramp_hash: str
+    :return: The name of the OSL shader
+    :rtype: str
+    """
+    return f'color_ramp_{ramp_hash[:16]}'
+
+
+def get_osl_source(ramp_data, shader_name='color_ramp'):
+    """
+    Generate the OSL source of a ramp definition, following blender's color band semantics
+    (see evaluator.evaluate). The stops are embedded as arrays
+
+    :param ramp_data: The ramp definition (see get_color_ramp_data)
+    :type ramp_data: dict
+    :param shader_name: The name of the shader, defaults to 'color_ramp'
+    :type shader_name: str, optional
+    :return: The OSL source
+    :rtype: str
+    """
+    positions = list(ramp_data['positions'])
+    colors = list(ramp_data['colors'])
+    count = len(positions)
+    last = count - 1
+    color_mode = ramp_data['color_mode']
+
+    # only RGB color ramps use the interpolation type, the others interpolate linearly
+    interpolation = ramp_data['interpolation'] if color_mode == 'RGB' else 'LINEAR'
+
+    if interpolation in SPLINE_WEIGHTS:
+        interpolation_source = SPLINE_TEMPLATE.format(
+            last=last, weights=SPLINE_WEIGHTS[interpolation])
+    else:
+        if interpolation == 'CONSTANT':
+            ease = '    t = 1.0;\n'
+        elif interpolation == 'EASE':
+            ease = '    t = t * t * (3.0 - 2.0 * t);\n'
+        else:
+            ease = ''
+
+        if color_mode == 'RGB':
+            mix = '    Color = mfac * colors[ri] + t * colors[li];'
+        else:
+            wrap_first, wrap_second = HUE_WRAP_CONDITIONS[ramp_data['hue_interpolation']]
+            mix = HUE_MIX_TEMPLATE.format(space=OSL_COLOR_SPACES[color_mode],
+                                          wrap_first=wrap_first, wrap_second=wrap_second)
+
+        interpolation_source = MIX_TEMPLATE.format(ease=ease, mix=mix, count=count, last=last)
+
+    return OSL_TEMPLATE.format(
+        shader_name=shader_name,
+        fac=format_osl_float(ramp_data.get('fac', 0.5)),
+        count=count,
+        last=last,
+        positions=', '.join(format_osl_float(position) for position in positions),
+        colors=', '.join(f'color({", ".join(format_osl_float(value) for value in colors[i*4:i*4 + 3])})'
+                         for i in range(count)),
+        alphas=', '.join(format_osl_float(colors[i*4 + 3]) for i in range(count)),
+        interpolation=interpolation_source,
+    )
+
+
+def get_or_create_osl_text(ramp_data):
+    """
+    Get the OSL script text of a ramp definition, generate it if it doesn't exist yet.
+    Identical ramps share the same text
+
+    :param ramp_data: The ramp definition (see get_color_ramp_data)
+    :type ramp_data: dict
+    :return: The script text
+    :rtype: bpy.types.Text
+    """
+    shader_name = get_osl_shader_name(get_color_ramp_data_hash(ramp_data))
+    text_name = f'{shader_name}.osl'
+
+    text = bpy.data.texts.get(text_name)
+    if text is not None:
+        return text
+
+    text = bpy.data.texts.new(text_name)
+    text.write(get_osl_source(ramp_data, shader_name))
+
+    # keep the ramp definition to be able to convert back to a color ramp
+    text['color_ramp_data'] = ramp_data
+    return text
+
+
+def is_osl_enabled(scene):
+    """
+    Check if a scene renders OSL script nodes: Cycles with Open Shading Language on the CPU
+
+    :param scene: The scene to check
+    :type scene: bpy.types.Scene
+    :return: Returns True if script nodes are rendered, False otherwise
+    :rtype: bool
+    """
+    return (scene.render.engine == 'CYCLES'
+            and scene.cycles.shading_system
+            and scene.cycles.device == 'CPU')
+
+
+def convert_to_osl_node(node, node_tree):
+    """
+    Replace a color ramp node or converted node group with an OSL script node
+
+    :param node: The color ramp node or converted node group to replace
+    :type node: [bpy.types.ShaderNodeValToRGB, bpy.types.NodeGroup]
+    :param node_tree: The shader node tree the node is in
+    :type node_tree: bpy.types.ShaderNodeTree
+    :return: The script node, None if the script couldn't be compiled
+    :rtype: bpy.types.ShaderNodeScript or None
+    """
+    addon_prefs = get_addon_prefs()
+
+    ramp_data = get_color_ramp_data(node)
+    color_ramp_name = get_color_ramp_name(node)
+
+    script_node = node_tree.nodes.new(type='ShaderNodeScript')
+    script_node.mode = 'INTERNAL'
+    # assigning the script compiles it and creates the sockets
+    script_node.script = get_or_create_osl_text(ramp_data)
+    if 'Fac' not in script_node.inputs:
+        node_tree.nodes.remove(script_node)
+        return None
+
+    set_node_name(script_node, f'OSL{color_ramp_name}')
+    set_node_label(script_node, script_node.name)
+    script_node.inputs['Fac'].default_value = ramp_data['fac']
+
+    auto_link_replacement_node(node, node_tree, script_node)
+    if addon_prefs.copy_width:
+        set_node_width(script_node, node.width)
+    set_node_location(script_node, node.location)
+
+    # only the factor can stay animated, the stops are in the script
+    transfer_stop_animation(node, script_node, node_tree)
+
+    if is_node_group(node) and addon_prefs.remove_extra_nodes:
+        remove_excess_extra_nodes(node_tree.nodes, node.name)
+    remove_node(node, node_tree)
+
+    script_node.select = True
+    node_tree.nodes.active = script_node
+    return script_node
+
+
+def convert_osl_node(osl_node, node_tree):
+    """
+    Convert an OSL script node back to a color ramp node
+
+    :param osl_node: The script node to convert
+    :type osl_node: bpy.types.ShaderNodeScript
+    :param node_tree: The node tree to add the color ramp to
+    :type node_tree: bpy.types.NodeTree
+    :return: The created color ramp node
+    :rtype: bpy.types.ShaderNodeValToRGB
+    """
+    addon_prefs = get_addon_prefs()
+    node_tree_type = get_node_type(node_tree)
+    ramp_data = get_color_ramp_data(osl_node)
+
+    color_ramp_name = get_color_ramp_name(osl_node)
+    color_ramp_node = node_tree.nodes.new(type=f'{node_tree_type}NodeValToRGB')
+    set_node_name(color_ramp_node, color_ramp_name)
+    set_node_label(color_ramp_node, color_ramp_name)
+
+    apply_color_ramp_data(color_ramp_node, ramp_data)
+    color_ramp_node.inputs[0].default_value = ramp_data['fac']
+
+    auto_link_replacement_node(osl_node, node_tree, color_ramp_node)
+    if addon_prefs.copy_width:
+        set_node_width(color_ramp_node, osl_node.width)
+    set_node_location(color_ramp_node, osl_node.location)
+
+    transfer_stop_animation(osl_node, color_ramp_node, node_tree)
+    remove_node(osl_node, node_tree)
+
+    color_ramp_node.select = True
+    node_tree.nodes.active = color_ramp_node
+    return color_ramp_node
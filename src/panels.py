@@ -29,10 +29,16 @@
 
 from bpy.utils import register_class, unregister_class
 from bpy.types import Panel
-from . functions import get_addon_prefs
-from . functions import any_converted_node_group
-from . functions import any_color_ramp_node
-from . functions import get_node_group_type
+from . lazy import lazy_import
+
+# imported on first draw, not while registering the addon
+functions = lazy_import('.functions', __package__)
+handlers = lazy_import('.handlers', __package__)
+maintenance = lazy_import('.maintenance', __package__)
+previews = lazy_import('.previews', __package__)
+
+# the most gradient previews drawn for the selected nodes
+MAX_PREVIEW_COUNT = 16
 
 
 class NODE_PT_convert(Panel):
@@ -50,18 +56,22 @@ class NODE_PT_convert(Panel):
         Draw panel layout
         """
         scene = context.scene
-        addon_prefs = get_addon_prefs()
+        addon_prefs = functions.get_addon_prefs()
 
         selected_nodes = context.selected_nodes
         num_selected_nodes = len(selected_nodes)
-        any_node_group_selected = any_converted_node_group(selected_nodes)
-        any_color_ramp_selected = any_color_ramp_node(selected_nodes)
+        any_node_group_selected = functions.any_converted_node_group(selected_nodes)
+        any_color_ramp_selected = functions.any_color_ramp_node(selected_nodes)
+        any_baked_lut_selected = functions.any_baked_lut(selected_nodes)
+        any_osl_ramp_selected = functions.any_osl_ramp(selected_nodes)
 
         layout = self.layout
         layout.operator('wm.color_ramp_converter',
                         text="CONVERT")
         if num_selected_nodes == 0 or not any((any_node_group_selected,
-                                               any_color_ramp_selected)):
+                                               any_color_ramp_selected,
+                                               any_baked_lut_selected,
+                                               any_osl_ramp_selected)):
             layout.label(text="No nodes selected")
             layout.label(text="Select Color Ramp(s)", icon='ERROR')
             layout.label(text="Select Converted Group(s)",
@@ -69,13 +79,29 @@ class NODE_PT_convert(Panel):
 
         if num_selected_nodes > 1:
             layout.label(text="Multiple nodes selected!", icon='INFO')
+            layout.operator('wm.color_ramp_converter_modal',
+                            text="CONVERT (Interactive)")
+            self.draw_previews(selected_nodes)
+
+        layout.label(text="Nested Groups:")
+        row = layout.row(align=True)
+        row.operator('wm.convert_nested_color_ramps',
+                     text="Selected").scope = 'SELECTED'
+        row.operator('wm.convert_nested_color_ramps',
+                     text="File").scope = 'FILE'
 
         if any_node_group_selected:
             layout.label(text="Node Group -> Color Ramp")
 
+        if any_baked_lut_selected:
+            layout.label(text="Baked LUT -> Color Ramp")
+
+        if any_osl_ramp_selected:
+            layout.label(text="OSL Script -> Color Ramp")
+
         if any_color_ramp_selected:
             active_node_tree = context.space_data.edit_tree
-            node_tree_type = get_node_group_type(active_node_tree)
+            node_tree_type = functions.get_node_group_type(active_node_tree)
 
             layout.label(text="Color Ramp -> Node Group")
 
@@ -93,8 +119,111 @@ class NODE_PT_convert(Panel):
                 layout.prop(scene, "extra_geometry_node_type", text="")
             layout.prop(addon_prefs, "create_extra_nodes", toggle=True)
 
+        if any_color_ramp_selected or any_node_group_selected:
+            layout.separator()
+            layout.label(text="Lookup Texture Resolution:")
+            layout.prop(scene, 'lut_resolution', text="")
+            layout.operator('wm.bake_color_ramp_lut', text="BAKE")
+            layout.operator('wm.convert_color_ramp_osl', text="OSL Script")
+            layout.operator('wm.bake_color_ramp_attribute', text="Bake to Mesh")
+
+        if any_color_ramp_selected or any_node_group_selected:
+            layout.operator('wm.verify_color_ramp_conversion', text="Verify")
+
+        layout.label(text="Dry Run:")
+        row = layout.row(align=True)
+        row.operator('wm.estimate_color_ramp_conversion',
+                     text="Selected").scope = 'SELECTED'
+        row.operator('wm.estimate_color_ramp_conversion',
+                     text="File").scope = 'FILE'
+
+        layout.separator()
+        row = layout.row(align=True)
+        row.operator('wm.export_color_ramps', text="Export", icon='EXPORT')
+        row.operator('wm.import_color_ramps', text="Import", icon='IMPORT')
+        layout.operator('wm.color_ramp_from_image', text="From Image", icon='IMAGE_DATA')
+
+        layout.separator()
+        layout.operator('wm.deduplicate_converted_node_groups', text="Deduplicate")
+
+        layout.separator()
+        layout.label(text="Render Substitution:")
+        layout.prop(scene, 'render_substitution', text="")
+
+        substitution_stats = handlers.last_substitution_stats
+        if substitution_stats['swapped']:
+            col = layout.column(align=True)
+            col.label(text=f"Last Render: {substitution_stats['swapped']} swapped "
+                           f"in {substitution_stats['swap_time']*1000:.2f} ms")
+            col.label(text=f"Restored: {substitution_stats['restored']} "
+                           f"in {substitution_stats['restore_time']*1000:.2f} ms")
+
+    def draw_previews(self, selected_nodes):
+        """
+        Draw a gradient preview of each selected color ramp, converted or baked node group and OSL script node.
+        Only cached previews are drawn, missing ones are created after the redraw
+        """
+        preview_nodes = [node for node in selected_nodes if functions.is_valid_node(node)]
+        if not preview_nodes:
+            return
+
+        col = self.layout.column(align=True)
+        for node in preview_nodes[:MAX_PREVIEW_COUNT]:
+            node_previews = previews.get_node_previews(node)
+            if node_previews is None:
+                col.label(text=functions.get_color_ramp_name(node), icon='TIME')
+                continue
+
+            for name, icon_id in node_previews:
+                col.label(text=name, icon_value=icon_id)
+
+        hidden_count = len(preview_nodes) - MAX_PREVIEW_COUNT
+        if hidden_count > 0:
+            col.label(text=f"... and {hidden_count} more")
+
+
+class NODE_PT_statistics(Panel):
+    """
+    The conversion statistics of the file
+    """
+    bl_space_type = 'NODE_EDITOR'
+    bl_region_type = 'UI'
+    bl_category = "Node"
+    bl_label = "Statistics"
+    bl_parent_id = 'NODE_PT_convert'
+    bl_options = {'DEFAULT_CLOSED'}
+
+    def draw(self, context):
+        """
+        Draw the (cached) statistics of the file
+        """
+        statistics = maintenance.get_file_statistics()
+
+        layout = self.layout
+        col = layout.column(align=True)
+        col.label(text=f"Color Ramps: {statistics['color_ramps']}")
+        col.label(text=f"Converted Nodes: {statistics['converted_nodes']}")
+        col.label(text=f"Converted Trees: {statistics['converted_trees']}")
+        col.label(text=f"Orphaned Trees: {statistics['orphaned_trees']}")
+        col.label(text=f"Generated Nodes: {statistics['generated_nodes']}")
+        col.label(text=f"Generated Links: {statistics['generated_links']}")
+        col.label(text=f"Memory (est.): {statistics['estimated_size'] / 1024:.1f} KiB")
+
+        material_update_stats = handlers.material_update_stats
+        col = layout.column(align=True)
+        col.label(text=f"Material Updates: {material_update_stats['count']}")
+        if material_update_stats['last_label']:
+            col.label(text=f"{material_update_stats['last_label']}: "
+                           f"{material_update_stats['last_count']} update(s)")
 
-classes = [NODE_PT_convert]
+        if statistics['largest']:
+            layout.label(text="Largest Converted Trees:")
+            col = layout.column(align=True)
+            for stop_count, name in statistics['largest']:
+                col.label(text=f"{name}: {stop_count} stops")
+
+
+classes = [NODE_PT_convert, NODE_PT_statistics]
 
 
 def register():
@@ -105,3 +234,6 @@ def register():
 def unregister():
     for cls in classes:
         unregister_class(cls)
+
+    if previews.is_loaded:
+        previews.remove_previews()
@@ -30,6 +30,10 @@
 import bpy
 from bpy.types import AddonPreferences
 from bpy.props import (BoolProperty,
+                       EnumProperty,
+                       FloatProperty,
+                       IntProperty,
+                       StringProperty,
                        )
 
 
@@ -56,10 +60,85 @@ class Preferences(AddonPreferences):
     
     legacy_const_ramp_conv: BoolProperty(
         name="Legacy Constant Ramp Conversion",
-        description="Uses color ramps instead of map range nodes.",
+        description="Uses color ramps instead of math nodes for constant interpolation.",
         default=False
     )
 
+    fuse_color_ramps: BoolProperty(
+        name="Fuse Color Ramps",
+        description="Convert color ramps driven by the same socket, with the same stop positions "
+                    "and settings, to one node group sharing the map range nodes, "
+                    "with a color output for each color ramp",
+        default=False
+    )
+
+    node_group_capacity: EnumProperty(
+        name="Stop Slots",
+        description="Number of stop slots of converted node groups. Slots after the last stop are "
+                    "inactive, stops can be added by editing the node group inputs without "
+                    "changing the node group's nodes",
+        items=[
+            ('0', "Exact", "As many slots as the color ramp has stops"),
+            ('8', "8", "8 slots, doubled until all stops fit"),
+            ('16', "16", "16 slots, doubled until all stops fit"),
+            ('32', "32", "32 slots, the most stops a color ramp can have"),
+        ],
+        default='0'
+    )
+
+    frame_time_budget: FloatProperty(
+        name="Frame Time Budget (ms)",
+        description="Time spent converting nodes between interface updates "
+                    "when converting interactively",
+        default=20.0,
+        min=1.0,
+        max=1000.0
+    )
+
+    verify_conversions: BoolProperty(
+        name="Verify Conversions",
+        description="Compare each color ramp with the node group it would be converted to, "
+                    "and don't convert it if the color error is above the threshold",
+        default=False
+    )
+
+    max_conversion_error: FloatProperty(
+        name="Max Color Error",
+        description="Maximum color error (per channel) of a verified conversion",
+        default=0.01,
+        min=0.0,
+        max=1.0,
+        precision=4
+    )
+
+    use_library: BoolProperty(
+        name="Use Node Group Library",
+        description="Reuse converted node groups from an on-disk library shared between sessions, "
+                    "instead of creating them again",
+        default=False
+    )
+
+    library_path: StringProperty(
+        name="Library Directory",
+        description="Directory of the node group library, leave empty to use the user config directory",
+        subtype='DIR_PATH',
+        default=""
+    )
+
+    library_link: BoolProperty(
+        name="Link From Library",
+        description="Link node groups from the library instead of appending them. "
+                    "Linked node groups go missing when their library entry is evicted",
+        default=False
+    )
+
+    library_max_size: IntProperty(
+        name="Library Size (MB)",
+        description="Maximum size of the library, least recently used node groups are removed first",
+        default=256,
+        min=1
+    )
+
     def draw(self, context):
         layout = self.layout
 
@@ -72,6 +151,12 @@ class Preferences(AddonPreferences):
         row = box.row()
         row.prop(self, "remove_extra_nodes")
         row.enabled = self.create_extra_nodes
+        row = box.row()
+        row.prop(self, "fuse_color_ramps")
+        row = box.row()
+        row.prop(self, "node_group_capacity")
+        row = box.row()
+        row.prop(self, "frame_time_budget")
         
         box = layout.box()
         row = box.row()
@@ -79,6 +164,21 @@ class Preferences(AddonPreferences):
         warning_row = box.row()
         warning_row.label(text="Does NOT generate position inputs for constant interpolation node groups!", icon='ERROR')
 
+        box = layout.box()
+        row = box.row()
+        row.prop(self, "verify_conversions")
+        row = box.row()
+        row.prop(self, "max_conversion_error")
+
+        box = layout.box()
+        row = box.row()
+        row.prop(self, "use_library")
+        col = box.column()
+        col.enabled = self.use_library
+        col.prop(self, "library_path")
+        col.prop(self, "library_link")
+        col.prop(self, "library_max_size")
+
         row = layout.row()
         row.scale_y = 1.5
         row.operator_context = 'INVOKE_DEFAULT'
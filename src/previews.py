@@ -0,0 +1,189 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+# GPLv3 License
+#
+# ColorRampConverter
+# Copyright (C) 2022-2026, Mark Elek, David Elek
+#
+# ColorRampConverter is a Blender addon that generates
+# custom node groups from color ramp nodes,
+# making a few parameters more accessible.
+#
+# This file is a part of ColorRampConverter.
+# ColorRampConverter is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# ColorRampConverter is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ColorRampConverter. If not, see <http://www.gnu.org/licenses/>.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# <pep8 compliant>
+
+import bpy
+import bpy.utils.previews
+import numpy as np
+from .evaluator import evaluate_ramp_data
+from .functions import get_all_color_ramp_data
+from .functions import get_color_ramp_data_hash
+
+
+# width and height of the gradient previews, in pixels
+PREVIEW_SIZE = 32
+
+# gradient previews by the content hash of their ramp definition, created on first use
+preview_collection = None
+# node tree pointer -> node name -> (color ramp name, content hash) pairs of the node's color ramps,
+# fused node groups have several
+node_preview_keys = {}
+# (node tree, node name) pairs waiting for their previews
+pending_nodes = []
+
+
+def get_preview_pixels(ramp_data, size=PREVIEW_SIZE):
+    """
+    Evaluate a ramp definition into the pixels of a square gradient preview
+
+    :param ramp_data: The ramp definition to evaluate (see get_color_ramp_data)
+    :type ramp_data: dict
+    :param size: The width and height of the preview, defaults to PREVIEW_SIZE
+    :type size: int, optional
+    :return: Flat RGBA pixels of the preview, rows of the same gradient
+    :rtype: numpy.ndarray of shape (size * size * 4,)
+    """
+    fac = (np.arange(size, dtype=np.float32) + 0.5) / size
+    row = evaluate_ramp_data(ramp_data, fac)
+    # opaque, the icon has no checkerboard behind it
+    row[:, 3] = 1.0
+    return np.tile(row, (size, 1)).ravel()
+
+
+def get_or_create_preview(ramp_data):
+    """
+    Get the gradient preview of a ramp definition, create it if it doesn't exist yet.
+    Identical ramps share the same preview
+
+    :param ramp_data: The ramp definition (see get_color_ramp_data)
+    :type ramp_data: dict
+    :return: The content hash of the ramp definition, the key of the preview
+    :rtype: str
+    """
+    global preview_collection
+
+    if preview_collection is None:
+        preview_collection = bpy.utils.previews.new()
+
+    ramp_hash = get_color_ramp_data_hash(ramp_data)
+    if ramp_hash in preview_collection:
+        return ramp_hash
+
+    preview = preview_collection.new(ramp_hash)
+    pixels = get_preview_pixels(ramp_data)
+    preview.image_size = (PREVIEW_SIZE, PREVIEW_SIZE)
+    preview.image_pixels_float.foreach_set(pixels)
+    preview.icon_size = (PREVIEW_SIZE, PREVIEW_SIZE)
+    preview.icon_pixels_float.foreach_set(pixels)
+    return ramp_hash
+
+
+def get_node_previews(node):
+    """
+    Get the cached gradient previews of a node, for drawing.
+    Nothing is evaluated here, missing previews are requested and created by a timer
+
+    :param node: The color ramp, converted or baked node group or OSL script node
+    :type node: bpy.types.Node
+    :return: The color ramp name and icon id of each color ramp of the node, None until the previews exist
+    :rtype: list of tuples (str, int) or None
+    """
+    keys = node_preview_keys.get(node.id_data.as_pointer(), {}).get(node.name)
+    if keys is None:
+        request_previews(node)
+        return None
+
+    return [(name, preview_collection[ramp_hash].icon_id) for name, ramp_hash in keys]
+
+
+def request_previews(node):
+    """
+    Create the gradient previews of a node soon, outside of drawing
+
+    :param node: The color ramp, converted or baked node group or OSL script node
+    :type node: bpy.types.Node
+    """
+    if not pending_nodes:
+        bpy.app.timers.register(create_pending_previews, first_interval=0.0)
+
+    request = (node.id_data, node.name)
+    if request not in pending_nodes:
+        pending_nodes.append(request)
+
+
+def create_pending_previews():
+    """
+    Create the requested gradient previews, then redraw the node editors (timer callback)
+    """
+    for node_tree, node_name in pending_nodes:
+        try:
+            node = node_tree.nodes.get(node_name)
+        except ReferenceError:
+            # the node tree was removed since the request
+            continue
+        if node is None:
+            continue
+
+        node_preview_keys.setdefault(node_tree.as_pointer(), {})[node_name] = [
+            (name, get_or_create_preview(ramp_data))
+            for name, ramp_data in get_all_color_ramp_data(node)]
+
+    pending_nodes.clear()
+
+    for window in bpy.context.window_manager.windows:
+        for area in window.screen.areas:
+            if area.type == 'NODE_EDITOR':
+                area.tag_redraw()
+
+    # don't repeat
+    return None
+
+
+def mark_previews_dirty(id_data):
+    """
+    Forget which previews the nodes of an edited node tree (or the node tree of a material, world, light) have,
+    they are looked up again on the next draw. The previews themselves are kept, they are keyed by content
+
+    :param id_data: The edited datablock
+    :type id_data: bpy.types.ID
+    """
+    node_tree = getattr(id_data, 'node_tree', None)
+    if node_tree is not None:
+        node_preview_keys.pop(node_tree.as_pointer(), None)
+    if isinstance(id_data, bpy.types.NodeTree):
+        node_preview_keys.pop(id_data.as_pointer(), None)
+
+
+def clear_previews():
+    """
+    Forget the previews of the nodes, e.g. when another file is loaded
+    """
+    node_preview_keys.clear()
+    pending_nodes.clear()
+
+
+def remove_previews():
+    """
+    Remove every gradient preview, when the addon is unregistered
+    """
+    global preview_collection
+
+    clear_previews()
+    if preview_collection is not None:
+        bpy.utils.previews.remove(preview_collection)
+        preview_collection = None
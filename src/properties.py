@@ -107,57 +107,97 @@ def node_group_interpolation_items(self, context):
     ]
 
 
+def lut_resolution_items(self, context):
+    """
+    Returns a list of lookup texture resolutions to pick from for baking
+
+    :param context: context
+    :type context: bpy.types.Context
+    :return: list of lookup texture resolutions to pick from
+    :rtype: list of tuples (string, string, string)
+    """
+    return [
+        ('1024', '1024 px', "Lookup texture with 1024 pixels"),
+        ('256', '256 px', "Lookup texture with 256 pixels"),
+        ('4096', '4096 px', "Lookup texture with 4096 pixels"),
+    ]
+
+
+def render_substitution_items(self, context):
+    """
+    Returns a list of render substitutes to pick from for converted node groups
+
+    :param context: context
+    :type context: bpy.types.Context
+    :return: list of render substitutes to pick from
+    :rtype: list of tuples (string, string, string)
+    """
+    return [
+        ('NONE', 'None', "Render the converted node groups"),
+        ('LUT', 'Lookup Texture',
+         "Swap converted node groups for baked lookup textures while rendering"),
+        ('COLOR_RAMP', 'Color Ramp',
+         "Swap converted node groups for color ramp nodes while rendering"),
+    ]
+
+
+# node group types the converted node group properties are registered on
+NODE_GROUP_TYPES = ('ShaderNodeGroup', 'GeometryNodeGroup', 'CompositorNodeGroup')
+
+# enum items of the color ramp settings, built once and shared by every node group type
+color_ramp_enum_items = {}
+
+
+def get_color_ramp_enum_items(property_name):
+    """
+    Returns the enum items of a color ramp setting, read from the RNA only once
+
+    :param property_name: The name of the color ramp setting
+    :type property_name: str in ['interpolation', 'hue_interpolation', 'color_mode']
+    :return: list of enum items of the color ramp setting
+    :rtype: list of tuples (string, string, string, int)
+    """
+    items = color_ramp_enum_items.get(property_name)
+    if items is None:
+        enum_items = bpy.types.ColorRamp.bl_rna.properties[property_name].enum_items
+        items = [(item.identifier, item.name, item.description, item.value)
+                 for item in enum_items]
+        color_ramp_enum_items[property_name] = items
+    return items
+
+
 def register():
 
-    interpolation_types = bpy.types.ColorRamp.bl_rna.properties['interpolation'].enum_items
-    hue_interpolation_types = bpy.types.ColorRamp.bl_rna.properties[
-        'hue_interpolation'].enum_items
-    color_mode_types = bpy.types.ColorRamp.bl_rna.properties['color_mode'].enum_items
-
-    bpy.types.ShaderNodeGroup.interpolation = bpy.props.EnumProperty(
-        name="Interpolation",
-        items=[(it.identifier, it.name, it.description, it.value)
-               for it in interpolation_types])
-
-    bpy.types.ShaderNodeGroup.hue_interpolation = bpy.props.EnumProperty(
-        name="Hue Interpolation",
-        items=[(hit.identifier, hit.name, hit.description, hit.value)
-               for hit in hue_interpolation_types])
-
-    bpy.types.ShaderNodeGroup.color_mode = bpy.props.EnumProperty(
-        name="Color Mode",
-        items=[(cmt.identifier, cmt.name, cmt.description, cmt.value)
-               for cmt in color_mode_types])
-
-    bpy.types.GeometryNodeGroup.interpolation = bpy.props.EnumProperty(
-        name="Interpolation",
-        items=[(it.identifier, it.name, it.description, it.value)
-               for it in interpolation_types])
-
-    bpy.types.GeometryNodeGroup.hue_interpolation = bpy.props.EnumProperty(
-        name="Hue Interpolation",
-        items=[(hit.identifier, hit.name, hit.description, hit.value)
-               for hit in hue_interpolation_types])
-
-    bpy.types.GeometryNodeGroup.color_mode = bpy.props.EnumProperty(
-        name="Color Mode",
-        items=[(cmt.identifier, cmt.name, cmt.description, cmt.value)
-               for cmt in color_mode_types])
-
-    bpy.types.CompositorNodeGroup.interpolation = bpy.props.EnumProperty(
-        name="Interpolation",
-        items=[(it.identifier, it.name, it.description, it.value)
-               for it in interpolation_types])
-
-    bpy.types.CompositorNodeGroup.hue_interpolation = bpy.props.EnumProperty(
-        name="Hue Interpolation",
-        items=[(hit.identifier, hit.name, hit.description, hit.value)
-               for hit in hue_interpolation_types])
-
-    bpy.types.CompositorNodeGroup.color_mode = bpy.props.EnumProperty(
-        name="Color Mode",
-        items=[(cmt.identifier, cmt.name, cmt.description, cmt.value)
-               for cmt in color_mode_types])
+    interpolation_items = get_color_ramp_enum_items('interpolation')
+    hue_interpolation_items = get_color_ramp_enum_items('hue_interpolation')
+    color_mode_items = get_color_ramp_enum_items('color_mode')
+
+    for node_group_type in NODE_GROUP_TYPES:
+        node_group_class = getattr(bpy.types, node_group_type)
+
+        node_group_class.interpolation = EnumProperty(
+            name="Interpolation",
+            items=interpolation_items)
+
+        node_group_class.hue_interpolation = EnumProperty(
+            name="Hue Interpolation",
+            items=hue_interpolation_items)
+
+        node_group_class.color_mode = EnumProperty(
+            name="Color Mode",
+            items=color_mode_items)
+
+        node_group_class.is_converted = BoolProperty(
+            name="Is Converted",
+            description="Is this a converted color ramp node group?",
+            default=False,
+        )
+
+        node_group_class.is_baked = BoolProperty(
+            name="Is Baked",
+            description="Is this a color ramp baked to a lookup texture node group?",
+            default=False,
+        )
 
     # TODO implement driver based implementation
     bpy.types.Scene.use_drivers = BoolProperty(
@@ -166,23 +206,6 @@ def register():
         default=False,
     )
 
-    bpy.types.ShaderNodeGroup.is_converted = BoolProperty(
-        name="Is Converted",
-        description="Is this a converted color ramp node group?",
-        default=False,
-    )
-
-    bpy.types.CompositorNodeGroup.is_converted = BoolProperty(
-        name="Is Converted",
-        description="Is this a converted color ramp node group?",
-        default=False,
-    )
-    bpy.types.GeometryNodeGroup.is_converted = BoolProperty(
-        name="Is Converted",
-        description="Is this a converted color ramp node group?",
-        default=False,
-    )
-
     bpy.types.Node.is_excess = BoolProperty(
         name="Is Excess",
         description="Is this an excess node from color ramp conversion?",
@@ -219,28 +242,36 @@ def register():
         items=node_group_interpolation_items,
     )
 
+    bpy.types.Scene.lut_resolution = EnumProperty(
+        name="LUT Resolution",
+        description="The number of pixels of baked lookup textures",
+        items=lut_resolution_items,
+    )
 
-def unregister():
+    bpy.types.Scene.render_substitution = EnumProperty(
+        name="Render Substitution",
+        description="Swap converted node groups for cheaper nodes while rendering, "
+                    "the node groups are restored after rendering",
+        items=render_substitution_items,
+    )
 
-    del bpy.types.ShaderNodeGroup.interpolation
-    del bpy.types.ShaderNodeGroup.hue_interpolation
-    del bpy.types.ShaderNodeGroup.color_mode
 
-    del bpy.types.GeometryNodeGroup.interpolation
-    del bpy.types.GeometryNodeGroup.hue_interpolation
-    del bpy.types.GeometryNodeGroup.color_mode
+def unregister():
 
-    del bpy.types.CompositorNodeGroup.interpolation
-    del bpy.types.CompositorNodeGroup.hue_interpolation
-    del bpy.types.CompositorNodeGroup.color_mode
+    for node_group_type in NODE_GROUP_TYPES:
+        node_group_class = getattr(bpy.types, node_group_type)
+        del node_group_class.interpolation
+        del node_group_class.hue_interpolation
+        del node_group_class.color_mode
+        del node_group_class.is_converted
+        del node_group_class.is_baked
 
     del bpy.types.Scene.use_drivers
-    del bpy.types.ShaderNodeGroup.is_converted
-    del bpy.types.CompositorNodeGroup.is_converted
-    del bpy.types.GeometryNodeGroup.is_converted
     del bpy.types.Node.is_excess
     del bpy.types.Node.linked_node_group_name
     del bpy.types.Scene.extra_shader_node_type
     del bpy.types.Scene.extra_compositor_node_type
     del bpy.types.Scene.extra_geometry_node_type
     del bpy.types.Scene.node_group_interpolation
+    del bpy.types.Scene.lut_resolution
+    del bpy.types.Scene.render_substitution
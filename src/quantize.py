@@ -0,0 +1,396 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+# GPLv3 License
+#
+# ColorRampConverter
+# Copyright (C) 2022-2026, Mark Elek, David Elek
+#
+# ColorRampConverter is a Blender addon that generates
+# custom node groups from color ramp nodes,
+# making a few parameters more accessible.
+#
+# This file is a part of ColorRampConverter.
+# ColorRampConverter is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# ColorRampConverter is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ColorRampConverter. If not, see <http://www.gnu.org/licenses/>.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# <pep8 compliant>
+
+import numpy as np
+from .evaluator import LUMINANCE_WEIGHTS
+from .functions import (convert_color_ramp,
+                        create_color_ramp_node,
+                        set_node_location,
+                        )
+
+
+# the most color stops a color ramp can have
+MAX_COLOR_COUNT = 32
+
+# the most pixels quantised, larger images (or regions) are sampled randomly
+MAX_SAMPLE_COUNT = 65536
+
+# the number of pixels sampled along the path of PATH ordering
+PATH_SAMPLE_COUNT = 256
+
+
+def srgb_to_linear(rgb):
+    """
+    Convert sRGB encoded colors to linear
+
+    :param rgb: sRGB encoded colors
+    :type rgb: numpy.ndarray
+    :return: Linear colors
+    :rtype: numpy.ndarray
+    """
+    return np.where(rgb <= 0.04045, rgb / 12.92, ((rgb + 0.055) / 1.055) ** 2.4)
+
+
+def get_image_pixels(image):
+    """
+    Get all pixels of an image at once
+
+    :param image: The image to read
+    :type image: bpy.types.Image
+    :return: RGB pixels of the image, bottom row first (like the image's UV space)
+    :rtype: numpy.ndarray of shape (height, width, 3)
+    """
+    width, height = image.size
+    channels = image.channels
+    if width == 0 or height == 0:
+        raise ValueError(f'The image "{image.name}" has no pixels')
+
+    pixels = np.empty(width * height * channels, dtype=np.float32)
+    image.pixels.foreach_get(pixels)
+    pixels = pixels.reshape(height, width, channels)
+
+    if channels < 3:
+        return np.repeat(pixels[:, :, :1], 3, axis=2)
+    return pixels[:, :, :3]
+
+
+def get_region_pixels(pixels, region_min=(0.0, 0.0), region_max=(1.0, 1.0)):
+    """
+    Get the pixels of a region of an image, without copying them
+
+    :param pixels: RGB pixels of the image (see get_image_pixels)
+    :type pixels: numpy.ndarray of shape (height, width, 3)
+    :param region_min: The lower left corner of the region in UV space, defaults to (0.0, 0.0)
+    :type region_min: float array of 2 items in [0, 1], optional
+    :param region_max: The upper right corner of the region in UV space, defaults to (1.0, 1.0)
+    :type region_max: float array of 2 items in [0, 1], optional
+    :return: RGB pixels of the region
+    :rtype: numpy.ndarray of shape (region height, region width, 3)
+    """
+    height, width = pixels.shape[:2]
+    x_min, x_max = (int(round(value * width)) for value in (region_min[0], region_max[0]))
+    y_min, y_max = (int(round(value * height)) for value in (region_min[1], region_max[1]))
+
+    region = pixels[max(y_min, 0):min(y_max, height), max(x_min, 0):min(x_max, width)]
+    if region.size == 0:
+        raise ValueError('The image region is empty')
+    return region
+
+
+def sample_pixels(pixels, max_sample_count=MAX_SAMPLE_COUNT, seed=0):
+    """
+    Sample pixels randomly, all of them if there are fewer than max_sample_count
+
+    :param pixels: RGB pixels
+    :type pixels: numpy.ndarray of shape (..., 3)
+    :param max_sample_count: The most pixels to sample, defaults to MAX_SAMPLE_COUNT
+    :type max_sample_count: int, optional
+    :param seed: Seed of the random sampling, defaults to 0
+    :type seed: int, optional
+    :return: The sampled RGB pixels
+    :rtype: numpy.ndarray of shape (N, 3)
+    """
+    pixel_count = pixels.size // 3
+    if pixel_count <= max_sample_count:
+        return pixels.reshape(-1, 3).copy()
+
+    rng = np.random.default_rng(seed)
+    indices = rng.integers(pixel_count, size=max_sample_count)
+    # index the rows and columns, a (cropped) region can't be flattened without copying
+    width = pixels.shape[1]
+    return pixels[indices // width, indices % width]
+
+
+def sample_path(pixels, path_start, path_end, sample_count=PATH_SAMPLE_COUNT):
+    """
+    Sample pixels along a straight path
+
+    :param pixels: RGB pixels of the image (see get_image_pixels)
+    :type pixels: numpy.ndarray of shape (height, width, 3)
+    :param path_start: The start of the path in UV space
+    :type path_start: float array of 2 items in [0, 1]
+    :param path_end: The end of the path in UV space
+    :type path_end: float array of 2 items in [0, 1]
+    :param sample_count: The number of pixels to sample, defaults to PATH_SAMPLE_COUNT
+    :type sample_count: int, optional
+    :return: The sampled RGB pixels, from the start to the end of the path
+    :rtype: numpy.ndarray of shape (sample_count, 3)
+    """
+    height, width = pixels.shape[:2]
+    t = np.linspace(0.0, 1.0, sample_count)
+    x = path_start[0] + t * (path_end[0] - path_start[0])
+    y = path_start[1] + t * (path_end[1] - path_start[1])
+    columns = np.clip((x * width).astype(np.int64), 0, width - 1)
+    rows = np.clip((y * height).astype(np.int64), 0, height - 1)
+    return pixels[rows, columns]
+
+
+def get_nearest_colors(colors, palette):
+    """
+    Get the nearest palette color of each color
+
+    :param colors: RGB colors
+    :type colors: numpy.ndarray of shape (N, 3)
+    :param palette: RGB palette colors
+    :type palette: numpy.ndarray of shape (K, 3)
+    :return: The index of the nearest palette color of each color
+    :rtype: numpy.ndarray of shape (N,)
+    """
+    # |c - p|² without the |c|² term, it's the same for every palette color
+    distances = (palette ** 2).sum(axis=1) - 2.0 * (colors @ palette.T)
+    return distances.argmin(axis=1)
+
+
+def get_cluster_means(colors, labels, cluster_count):
+    """
+    Get the mean color and size of each cluster
+
+    :param colors: RGB colors
+    :type colors: numpy.ndarray of shape (N, 3)
+    :param labels: The cluster of each color
+    :type labels: numpy.ndarray of shape (N,)
+    :param cluster_count: The number of clusters
+    :type cluster_count: int
+    :return: The mean color (nan for empty clusters) and the number of colors of each cluster
+    :rtype: tuple of (numpy.ndarray of shape (K, 3), numpy.ndarray of shape (K,))
+    """
+    counts = np.bincount(labels, minlength=cluster_count)
+    sums = np.stack([np.bincount(labels, weights=colors[:, channel], minlength=cluster_count)
+                     for channel in range(3)], axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return sums / counts[:, None], counts
+
+
+def kmeans_colors(colors, color_count, iterations=16, seed=0):
+    """
+    Quantise colors to a palette with k-means (k-means++ seeding)
+
+    :param colors: RGB colors to quantise
+    :type colors: numpy.ndarray of shape (N, 3)
+    :param color_count: The number of palette colors
+    :type color_count: int
+    :param iterations: The most k-means iterations, defaults to 16
+    :type iterations: int, optional
+    :param seed: Seed of the seeding, defaults to 0
+    :type seed: int, optional
+    :return: The palette colors and the number of colors of each, empty clusters are left out
+    :rtype: tuple of (numpy.ndarray of shape (K, 3), numpy.ndarray of shape (K,))
+    """
+    rng = np.random.default_rng(seed)
+    colors = colors.astype(np.float64)
+    color_count = min(color_count, len(colors))
+
+    palette = np.empty((color_count, 3))
+    palette[0] = colors[rng.integers(len(colors))]
+    distances = ((colors - palette[0]) ** 2).sum(axis=1)
+    for index in range(1, color_count):
+        total = distances.sum()
+        if total > 0.0:
+            palette[index] = colors[rng.choice(len(colors), p=distances / total)]
+        else:
+            # every color is already in the palette
+            palette[index] = palette[0]
+        distances = np.minimum(distances, ((colors - palette[index]) ** 2).sum(axis=1))
+
+    for _ in range(iterations):
+        means, counts = get_cluster_means(colors, get_nearest_colors(colors, palette), color_count)
+        # empty clusters keep their color
+        means[counts == 0] = palette[counts == 0]
+        converged = np.allclose(means, palette, atol=1e-5)
+        palette = means
+        if converged:
+            break
+
+    labels = get_nearest_colors(colors, palette)
+    counts = np.bincount(labels, minlength=color_count)
+    return palette[counts > 0], counts[counts > 0]
+
+
+def median_cut_colors(colors, color_count):
+    """
+    Quantise colors to a palette with median cut
+
+    :param colors: RGB colors to quantise
+    :type colors: numpy.ndarray of shape (N, 3)
+    :param color_count: The number of palette colors
+    :type color_count: int
+    :return: The palette colors and the number of colors of each
+    :rtype: tuple of (numpy.ndarray of shape (K, 3), numpy.ndarray of shape (K,))
+    """
+    boxes = [colors.astype(np.float64)]
+    while len(boxes) < color_count:
+        # split the box with the widest channel, weighted by its number of colors
+        extents = [np.ptp(box, axis=0) for box in boxes]
+        scores = [extent.max() * len(box) for extent, box in zip(extents, boxes)]
+        index = int(np.argmax(scores))
+        if scores[index] <= 0.0:
+            # every box has a single color
+            break
+
+        box = boxes.pop(index)
+        channel = extents[index].argmax()
+        half = len(box) // 2
+        order = np.argpartition(box[:, channel], half)
+        boxes += [box[order[:half]], box[order[half:]]]
+
+    palette = np.array([box.mean(axis=0) for box in boxes])
+    counts = np.array([len(box) for box in boxes])
+    return palette, counts
+
+
+def order_by_luminance(palette):
+    """
+    Order palette colors from dark to bright, evenly spaced
+
+    :param palette: RGB palette colors
+    :type palette: numpy.ndarray of shape (K, 3)
+    :return: The positions and colors of the stops
+    :rtype: tuple of (numpy.ndarray of shape (K,), numpy.ndarray of shape (K, 3))
+    """
+    order = np.argsort(palette @ np.array(LUMINANCE_WEIGHTS), kind='stable')
+    positions = np.linspace(0.0, 1.0, len(palette)) if len(palette) > 1 else np.zeros(1)
+    return positions, palette[order]
+
+
+def order_by_path(palette, path_colors):
+    """
+    Order palette colors along a path, each at the mean position of the path colors nearest to it.
+    Palette colors the path doesn't cross are left out
+
+    :param palette: RGB palette colors
+    :type palette: numpy.ndarray of shape (K, 3)
+    :param path_colors: RGB colors sampled along the path (see sample_path)
+    :type path_colors: numpy.ndarray of shape (N, 3)
+    :return: The positions and colors of the stops
+    :rtype: tuple of (numpy.ndarray, numpy.ndarray of shape (M, 3))
+    """
+    t = np.linspace(0.0, 1.0, len(path_colors))
+    labels = get_nearest_colors(path_colors.astype(np.float64), palette)
+    counts = np.bincount(labels, minlength=len(palette))
+    sums = np.bincount(labels, weights=t, minlength=len(palette))
+
+    crossed = counts > 0
+    positions = sums[crossed] / counts[crossed]
+    order = np.argsort(positions, kind='stable')
+    return positions[order], palette[crossed][order]
+
+
+def get_image_ramp_data(image, color_count=8, method='KMEANS', order='LUMINANCE', interpolation='LINEAR',
+                        region_min=(0.0, 0.0), region_max=(1.0, 1.0),
+                        path_start=(0.0, 0.5), path_end=(1.0, 0.5)):
+    """
+    Quantise an image (or a region of it) to a ramp definition
+
+    :param image: The image to quantise
+    :type image: bpy.types.Image
+    :param color_count: The most color stops, defaults to 8
+    :type color_count: int in [2, 32], optional
+    :param method: The quantisation method, defaults to 'KMEANS'
+    :type method: str in ['KMEANS', 'MEDIAN_CUT'], optional
+    :param order: How the colors are ordered, by luminance or along a path, defaults to 'LUMINANCE'
+    :type order: str in ['LUMINANCE', 'PATH'], optional
+    :param interpolation: The interpolation of the color ramp, defaults to 'LINEAR'
+    :type interpolation: str in ['EASE', 'CARDINAL', 'LINEAR', 'B_SPLINE', 'CONSTANT'], optional
+    :param region_min: The lower left corner of the quantised region in UV space, defaults to (0.0, 0.0)
+    :type region_min: float array of 2 items in [0, 1], optional
+    :param region_max: The upper right corner of the quantised region in UV space, defaults to (1.0, 1.0)
+    :type region_max: float array of 2 items in [0, 1], optional
+    :param path_start: The start of the path of PATH ordering in UV space, defaults to (0.0, 0.5)
+    :type path_start: float array of 2 items in [0, 1], optional
+    :param path_end: The end of the path of PATH ordering in UV space, defaults to (1.0, 0.5)
+    :type path_end: float array of 2 items in [0, 1], optional
+    :return: Ramp definition (see functions.get_color_ramp_data)
+    :rtype: dict
+    """
+    pixels = get_image_pixels(image)
+    colors = sample_pixels(get_region_pixels(pixels, region_min, region_max))
+    path_colors = sample_path(pixels, path_start, path_end) if order == 'PATH' else None
+
+    # byte images are read sRGB encoded, color stops are linear
+    if not image.is_float and image.colorspace_settings.name == 'sRGB':
+        colors = srgb_to_linear(colors)
+        if path_colors is not None:
+            path_colors = srgb_to_linear(path_colors)
+
+    color_count = min(color_count, MAX_COLOR_COUNT)
+    if method == 'MEDIAN_CUT':
+        palette, _counts = median_cut_colors(colors, color_count)
+    else:
+        palette, _counts = kmeans_colors(colors, color_count)
+
+    if path_colors is not None:
+        positions, palette = order_by_path(palette, path_colors)
+    else:
+        positions, palette = order_by_luminance(palette)
+
+    stop_colors = np.ones((len(palette), 4))
+    stop_colors[:, :3] = palette
+    return {
+        'positions': positions.tolist(),
+        'colors': stop_colors.ravel().tolist(),
+        'color_mode': 'RGB',
+        'interpolation': interpolation,
+        'hue_interpolation': 'NEAR',
+        'fac': 0.5,
+    }
+
+
+def create_color_ramp_from_image(self, context, image, node_tree, as_node_group=False,
+                                 location=(0.0, 0.0), **kwargs):
+    """
+    Create a color ramp node (or converted node group) from the quantised colors of an image
+
+    :param context: context
+    :type context: bpy.context
+    :param image: The image to quantise
+    :type image: bpy.types.Image
+    :param node_tree: The node tree to create the node in
+    :type node_tree: bpy.types.NodeTree
+    :param as_node_group: Create a converted node group instead of a color ramp node, defaults to False
+    :type as_node_group: bool, optional
+    :param location: The location of the created node
+    :type location: float array of 2 items in [-100000, 100000], default (0.0, 0.0)
+    :param kwargs: Quantisation settings (see get_image_ramp_data)
+    :return: The created node and its number of color stops
+    :rtype: tuple of (bpy.types.Node, int)
+    """
+    ramp_data = get_image_ramp_data(image, **kwargs)
+    stop_count = len(ramp_data['positions'])
+
+    # the stops are written at once (see functions.set_color_ramp_stops)
+    color_ramp_node = create_color_ramp_node(image.name, node_tree, ramp_data)
+    set_node_location(color_ramp_node, location)
+
+    # a single color (e.g. a plain image) can't be converted
+    if as_node_group and stop_count > 1:
+        node_group = convert_color_ramp(self, context, color_ramp_node, node_tree)
+        if node_group is not None:
+            return node_group, stop_count
+
+    return color_ramp_node, stop_count
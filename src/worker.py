@@ -0,0 +1,204 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+# GPLv3 License
+#
+# ColorRampConverter
+# Copyright (C) 2022-2026, Mark Elek, David Elek
+#
+# ColorRampConverter is a Blender addon that generates
+# custom node groups from color ramp nodes,
+# making a few parameters more accessible.
+#
+# This file is a part of ColorRampConverter.
+# ColorRampConverter is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# ColorRampConverter is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ColorRampConverter. If not, see <http://www.gnu.org/licenses/>.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# <pep8 compliant>
+
+# Long-lived worker for conversion jobs, run in background blender (see tools/worker.py).
+# Jobs are JSON lines sent over a local UNIX socket, each answered with a JSON line:
+#
+#   {"action": "CONVERT", "filepath": "/path/file.blend", "output": "/path/converted.blend"}
+#   {"ok": true, "result": {"converted": 12, "reverted": 0, "node_trees": 5, ...}}
+
+import json
+import os
+import socket
+import time
+
+import bpy
+from .functions import (get_all_node_trees,
+                        get_nested_node_trees,
+                        is_baked_lut,
+                        is_node_group,
+                        is_osl_ramp,
+                        )
+from .maintenance import get_file_statistics
+from .operators import convert_nested_color_ramps, convert_node
+
+ACTIONS = ('CONVERT', 'REVERT', 'PING', 'SHUTDOWN')
+
+
+class JobReporter:
+    """
+    Stands in for the operator the conversion functions report to, the reports are sent back with the result
+    """
+
+    def __init__(self):
+        self.reports = []
+
+    def report(self, level, message):
+        self.reports.append(f'{", ".join(sorted(level))}: {message}')
+
+
+def revert_node_trees(self, context, node_trees):
+    """
+    Convert every converted or baked node group and OSL script node of the given node trees back to color ramps
+
+    :param context: context
+    :type context: bpy.context
+    :param node_trees: The node trees to revert
+    :type node_trees: list of bpy.types.NodeTree
+    :return: The number of reverted nodes
+    :rtype: int
+    """
+    reverted_count = 0
+    for node_tree in node_trees:
+        # collect names first, reverting removes the nodes from the tree
+        node_names = [node.name for node in node_tree.nodes
+                      if is_node_group(node) or is_baked_lut(node) or is_osl_ramp(node)]
+        for node_name in node_names:
+            convert_node(self, context, node_tree.nodes[node_name], node_tree)
+        reverted_count += len(node_names)
+
+    return reverted_count
+
+
+def run_job(job):
+    """
+    Open a file, convert its color ramps or revert its converted nodes, then save it
+
+    :param job: The action ('CONVERT' or 'REVERT'), the file to open ('filepath')
+        and the file to save to ('output', the opened file if not given)
+    :type job: dict
+    :return: The number of converted and reverted nodes ('converted', 'reverted'), of node trees ('node_trees'),
+        the file statistics after the job ('statistics', see maintenance.get_file_statistics),
+        the conversion reports ('reports') and the time the job took in seconds ('time')
+    :rtype: dict
+    """
+    start_time = time.perf_counter()
+    action = job['action']
+    filepath = job['filepath']
+    output = job.get('output') or filepath
+
+    bpy.ops.wm.open_mainfile(filepath=filepath, load_ui=False)
+    context = bpy.context
+    reporter = JobReporter()
+
+    node_trees, _reference_count = get_nested_node_trees([], get_all_node_trees())
+    converted_count = 0
+    reverted_count = 0
+    if action == 'CONVERT':
+        converted_count = convert_nested_color_ramps(reporter, context, node_trees)
+    else:
+        reverted_count = revert_node_trees(reporter, context, node_trees)
+
+    bpy.ops.wm.save_as_mainfile(filepath=output)
+
+    return {
+        'converted': converted_count,
+        'reverted': reverted_count,
+        'node_trees': len(node_trees),
+        'statistics': get_file_statistics(),
+        'reports': reporter.reports,
+        'time': time.perf_counter() - start_time,
+    }
+
+
+def handle_job(job):
+    """
+    Run a job and wrap its result or error in a reply
+
+    :param job: The job to run (see run_job)
+    :type job: dict
+    :return: The reply, 'ok' with the 'result' of the job or the 'error' it raised
+    :rtype: dict
+    """
+    action = job.get('action') if isinstance(job, dict) else None
+    if action not in ACTIONS:
+        return {'ok': False, 'error': f'Unknown action: {action}, expected one of {", ".join(ACTIONS)}'}
+    if action in ('PING', 'SHUTDOWN'):
+        return {'ok': True, 'result': {'pid': os.getpid()}}
+
+    try:
+        return {'ok': True, 'result': run_job(job)}
+
+    # catch *all* exceptions, a failed job doesn't stop the worker
+    except Exception as err:
+        return {'ok': False, 'error': f'{type(err).__name__}: {err}'}
+
+
+def handle_connection(connection):
+    """
+    Answer the jobs of a client until it disconnects or asks the worker to shut down
+
+    :param connection: The connected client
+    :type connection: socket.socket
+    :return: False if the worker was asked to shut down, True otherwise
+    :rtype: bool
+    """
+    with connection.makefile('rb') as reader:
+        for line in reader:
+            try:
+                job = json.loads(line)
+            except ValueError as err:
+                reply = {'ok': False, 'error': f'Invalid job: {err}'}
+            else:
+                reply = handle_job(job)
+
+            connection.sendall(json.dumps(reply).encode() + b'\n')
+            if reply['ok'] and job.get('action') == 'SHUTDOWN':
+                return False
+
+    return True
+
+
+def serve(socket_path):
+    """
+    Answer jobs on a UNIX socket until a client asks the worker to shut down.
+    The addon (and blender) is loaded once, each job only pays for opening and saving its file
+
+    :param socket_path: The path of the socket to listen on
+    :type socket_path: str
+    """
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        server.bind(socket_path)
+        server.listen()
+        print(f'ColorRampConverter: worker {os.getpid()} listening on {socket_path}', flush=True)
+
+        running = True
+        while running:
+            connection, _address = server.accept()
+            with connection:
+                running = handle_connection(connection)
+
+    finally:
+        server.close()
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
@@ -0,0 +1,90 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+# GPLv3 License
+#
+# ColorRampConverter
+# Copyright (C) 2022-2026, Mark Elek, David Elek
+#
+# ColorRampConverter is a Blender addon that generates
+# custom node groups from color ramp nodes,
+# making a few parameters more accessible.
+#
+# This file is a part of ColorRampConverter.
+# ColorRampConverter is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# ColorRampConverter is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ColorRampConverter. If not, see <http://www.gnu.org/licenses/>.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# <pep8 compliant>
+
+# Background blender worker answering conversion jobs on a UNIX socket, started by tools/worker_client.py:
+#
+#   blender --background --factory-startup --python tools/worker.py -- --socket /tmp/color-ramp-worker.sock
+
+import argparse
+import importlib
+import importlib.util
+import os
+import sys
+
+import bpy
+
+ADDON_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# the name the addon preferences are registered under
+MODULE_NAME = 'color-ramp-converter'
+
+
+def get_args():
+    """
+    Parse the arguments passed to the script after '--'
+
+    :return: The parsed arguments
+    :rtype: argparse.Namespace
+    """
+    argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+    parser = argparse.ArgumentParser(description="Color ramp conversion worker")
+    parser.add_argument('--socket', required=True,
+                        help="Path of the UNIX socket to listen on")
+    return parser.parse_args(argv)
+
+
+def enable_addon():
+    """
+    Import and register the addon from the repository, the directory name doesn't have to be a valid module name
+
+    :return: The addon module
+    :rtype: module
+    """
+    spec = importlib.util.spec_from_file_location(
+        MODULE_NAME, os.path.join(ADDON_DIR, '__init__.py'),
+        submodule_search_locations=[ADDON_DIR])
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[MODULE_NAME] = module
+    spec.loader.exec_module(module)
+    module.register()
+
+    # what enabling the addon in the preferences does, so the addon preferences exist
+    bpy.context.preferences.addons.new().module = MODULE_NAME
+    return module
+
+
+def main():
+    args = get_args()
+    enable_addon()
+
+    worker = importlib.import_module(f'{MODULE_NAME}.src.worker')
+    worker.serve(args.socket)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,383 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+# GPLv3 License
+#
+# ColorRampConverter
+# Copyright (C) 2022-2026, Mark Elek, David Elek
+#
+# ColorRampConverter is a Blender addon that generates
+# custom node groups from color ramp nodes,
+# making a few parameters more accessible.
+#
+# This file is a part of ColorRampConverter.
+# ColorRampConverter is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# ColorRampConverter is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ColorRampConverter. If not, see <http://www.gnu.org/licenses/>.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# <pep8 compliant>
+
+# Client of the background blender workers (see src/worker.py), doesn't depend on bpy.
+# Starts the workers once, then balances the jobs across them:
+#
+#   python tools/worker_client.py --workers 4 --blender /path/to/blender convert a.blend b.blend
+#
+#   with WorkerPool(worker_count=4) as pool:
+#       results = pool.map([{'action': 'CONVERT', 'filepath': path} for path in paths])
+
+import argparse
+import json
+import os
+import queue
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'worker.py')
+
+
+class WorkerError(Exception):
+    """
+    A job failed in the worker, or the worker is gone
+    """
+
+
+class WorkerConnectionError(WorkerError):
+    """
+    The connection to the worker is lost, e.g. the worker crashed on a job
+    """
+
+
+class Worker:
+    """
+    A background blender process answering jobs on a UNIX socket
+    """
+
+    def __init__(self, blender, socket_path, startup_timeout=60.0):
+        """
+        Start the worker and connect to it once it's listening
+
+        :param blender: The blender executable
+        :type blender: str
+        :param socket_path: The path of the socket the worker listens on
+        :type socket_path: str
+        :param startup_timeout: The most seconds to wait for the worker to listen, defaults to 60.0
+        :type startup_timeout: float, optional
+        """
+        self.socket_path = socket_path
+        self.process = subprocess.Popen(
+            [blender, '--background', '--factory-startup', '--python', WORKER_SCRIPT,
+             '--', '--socket', socket_path])
+
+        deadline = time.monotonic() + startup_timeout
+        while True:
+            try:
+                self.connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                self.connection.connect(socket_path)
+                break
+            except OSError:
+                self.connection.close()
+                if self.process.poll() is not None:
+                    raise WorkerError(f'Worker exited with code {self.process.returncode} while starting')
+                if time.monotonic() > deadline:
+                    self.process.kill()
+                    raise WorkerError(f'Worker not listening on {socket_path} after {startup_timeout} s')
+                time.sleep(0.1)
+
+        self.reader = self.connection.makefile('rb')
+
+    def run(self, job):
+        """
+        Send a job and wait for its result
+
+        :param job: The job (see src/worker.py run_job)
+        :type job: dict
+        :return: The result of the job
+        :rtype: dict
+        :raises WorkerConnectionError: The connection to the worker is lost
+        :raises WorkerError: The job failed in the worker
+        """
+        try:
+            self.connection.sendall(json.dumps(job).encode() + b'\n')
+            line = self.reader.readline()
+        except OSError as err:
+            raise WorkerConnectionError(f'Worker {self.process.pid} lost the connection: {err}') from err
+        if not line:
+            raise WorkerConnectionError(f'Worker {self.process.pid} closed the connection')
+
+        reply = json.loads(line)
+        if not reply['ok']:
+            raise WorkerError(reply['error'])
+        return reply['result']
+
+    def kill(self):
+        """
+        Close the connection and kill the worker, e.g. after the connection is lost
+        """
+        self.reader.close()
+        self.connection.close()
+        self.process.kill()
+        self.process.wait()
+
+    def close(self, timeout=10.0):
+        """
+        Ask the worker to shut down, kill it if it doesn't
+
+        :param timeout: The most seconds to wait for the worker to exit, defaults to 10.0
+        :type timeout: float, optional
+        """
+        try:
+            self.run({'action': 'SHUTDOWN'})
+        except (OSError, WorkerError):
+            pass
+        self.reader.close()
+        self.connection.close()
+
+        try:
+            self.process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+
+class WorkerPool:
+    """
+    Background blender workers sharing a job queue, each idle worker takes the next job
+    """
+
+    def __init__(self, worker_count=2, blender='blender', socket_dir=None, startup_timeout=60.0):
+        """
+        Start the workers, they load blender and the addon once
+
+        :param worker_count: The number of workers, defaults to 2
+        :type worker_count: int, optional
+        :param blender: The blender executable, defaults to 'blender'
+        :type blender: str, optional
+        :param socket_dir: The directory of the worker sockets, defaults to a temporary directory
+        :type socket_dir: str, optional
+        :param startup_timeout: The most seconds to wait for each worker to listen, defaults to 60.0
+        :type startup_timeout: float, optional
+        """
+        self.blender = blender
+        self.startup_timeout = startup_timeout
+        self.temporary_dir = None
+        if socket_dir is None:
+            self.temporary_dir = tempfile.TemporaryDirectory(prefix='color-ramp-worker-')
+            socket_dir = self.temporary_dir.name
+
+        self.jobs = queue.Queue()
+        self.workers = []
+        self.threads = []
+        try:
+            for index in range(worker_count):
+                socket_path = os.path.join(socket_dir, f'worker-{os.getpid()}-{index}.sock')
+                self.workers.append(Worker(blender, socket_path, startup_timeout))
+        except Exception:
+            self.close()
+            raise
+
+        # workers that couldn't be restarted after a crash stop taking jobs
+        self.lock = threading.Lock()
+        self.running_count = len(self.workers)
+
+        for index in range(len(self.workers)):
+            thread = threading.Thread(target=self.work, args=(index,), daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def work(self, index):
+        """
+        Run the queued jobs on a worker until the pool is closed (thread target).
+        A worker that crashes on a job is restarted, the job fails
+
+        :param index: The index of the worker to run the jobs on
+        :type index: int
+        """
+        worker = self.workers[index]
+        while True:
+            item = self.jobs.get()
+            if item is None:
+                return
+
+            job, future = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(worker.run(job))
+            except WorkerConnectionError as err:
+                future.set_exception(err)
+
+                # every later job would fail on the lost connection. The crashed process
+                # might not have exited yet (e.g. still in its crash handler), it's killed
+                worker.kill()
+                try:
+                    worker = self.workers[index] = Worker(self.blender, worker.socket_path, self.startup_timeout)
+                except (OSError, WorkerError):
+                    self.stop_worker()
+                    return
+            except Exception as err:
+                future.set_exception(err)
+
+    def stop_worker(self):
+        """
+        Stop counting a worker that couldn't be restarted,
+        fail the queued jobs if no worker is left to run them
+        """
+        with self.lock:
+            self.running_count -= 1
+            if self.running_count:
+                return
+
+        while True:
+            try:
+                item = self.jobs.get_nowait()
+            except queue.Empty:
+                return
+            if item is not None and item[1].set_running_or_notify_cancel():
+                item[1].set_exception(WorkerError('No worker left to run the job'))
+
+    def submit(self, job):
+        """
+        Queue a job
+
+        :param job: The job (see src/worker.py run_job)
+        :type job: dict
+        :return: The future result of the job
+        :rtype: concurrent.futures.Future
+        """
+        future = Future()
+        if not self.running_count:
+            future.set_exception(WorkerError('No worker left to run the job'))
+            return future
+
+        self.jobs.put((job, future))
+        return future
+
+    def convert(self, filepath, output=None):
+        """
+        Queue the conversion of the color ramps of a file
+
+        :param filepath: The file to convert
+        :type filepath: str
+        :param output: The file to save to, defaults to the converted file
+        :type output: str, optional
+        :return: The future result of the job
+        :rtype: concurrent.futures.Future
+        """
+        return self.submit({'action': 'CONVERT', 'filepath': filepath, 'output': output})
+
+    def revert(self, filepath, output=None):
+        """
+        Queue the conversion of the converted nodes of a file back to color ramps
+
+        :param filepath: The file to revert
+        :type filepath: str
+        :param output: The file to save to, defaults to the reverted file
+        :type output: str, optional
+        :return: The future result of the job
+        :rtype: concurrent.futures.Future
+        """
+        return self.submit({'action': 'REVERT', 'filepath': filepath, 'output': output})
+
+    def map(self, jobs):
+        """
+        Run jobs across the workers and wait for them
+
+        :param jobs: The jobs to run
+        :type jobs: list of dict
+        :return: The results of the jobs, in order
+        :rtype: list of dict
+        """
+        futures = [self.submit(job) for job in jobs]
+        return [future.result() for future in futures]
+
+    def close(self):
+        """
+        Finish the queued jobs, then shut the workers down
+        """
+        for _ in self.threads:
+            self.jobs.put(None)
+        for thread in self.threads:
+            thread.join()
+        for worker in self.workers:
+            worker.close()
+
+        self.threads.clear()
+        self.workers.clear()
+        if self.temporary_dir is not None:
+            self.temporary_dir.cleanup()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def get_args():
+    """
+    Parse the command line arguments
+
+    :return: The parsed arguments
+    :rtype: argparse.Namespace
+    """
+    parser = argparse.ArgumentParser(description="Convert blend files with background blender workers")
+    parser.add_argument('action', choices=['convert', 'revert'],
+                        help="Convert the color ramps, or revert the converted nodes to color ramps")
+    parser.add_argument('files', nargs='+',
+                        help="The blend files to convert, saved in place unless --output-dir is given")
+    parser.add_argument('--output-dir',
+                        help="Directory to save the converted files to")
+    parser.add_argument('--workers', type=int, default=2,
+                        help="Number of background blender workers")
+    parser.add_argument('--blender', default='blender',
+                        help="The blender executable")
+    return parser.parse_args()
+
+
+def main():
+    args = get_args()
+
+    jobs = []
+    for filepath in args.files:
+        output = None
+        if args.output_dir:
+            output = os.path.join(os.path.abspath(args.output_dir), os.path.basename(filepath))
+        jobs.append({'action': args.action.upper(), 'filepath': os.path.abspath(filepath), 'output': output})
+
+    start_time = time.perf_counter()
+    failed_count = 0
+    with WorkerPool(args.workers, args.blender) as pool:
+        futures = [pool.submit(job) for job in jobs]
+        for job, future in zip(jobs, futures):
+            try:
+                result = future.result()
+            except WorkerError as err:
+                failed_count += 1
+                print(f'{job["filepath"]}: failed, {err}')
+                continue
+
+            print(f'{job["filepath"]}: {result["converted"]} converted, {result["reverted"]} reverted '
+                  f'in {result["node_trees"]} node tree(s), {result["time"]*1000:.0f} ms')
+
+    print(f'{len(jobs)} file(s), {failed_count} failed, {time.perf_counter() - start_time:.2f} s '
+          f'with {args.workers} worker(s)')
+    return 1 if failed_count else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())